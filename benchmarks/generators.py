@@ -0,0 +1,68 @@
+# benchmarks/generators.py
+from __future__ import annotations
+from typing import Callable, Dict, List, Tuple
+import numpy as np
+
+Observation = Tuple[str, str, int]
+
+
+def _state_names(n_states: int) -> np.ndarray:
+    return np.array([f"s{i}" for i in range(n_states)], dtype=object)
+
+
+def _to_observations(names: np.ndarray, origins: np.ndarray, dests: np.ndarray,
+                     counts: np.ndarray) -> List[Observation]:
+    return list(zip(names[origins].tolist(), names[dests].tolist(), counts.tolist()))
+
+
+def random_sparse(n_states: int, avg_degree: int = 4, seed: int = 0) -> List[Observation]:
+    """Cadeia esparsa aleatória: cada estado tem `avg_degree` destinos uniformes."""
+    rng = np.random.default_rng(seed)
+    origins = np.repeat(np.arange(n_states), avg_degree)
+    dests = rng.integers(0, n_states, len(origins))
+    counts = rng.integers(1, 200, len(origins))
+    return _to_observations(_state_names(n_states), origins, dests, counts)
+
+
+def grid(n_states: int, seed: int = 0, drop: float = 0.1) -> List[Observation]:
+    """
+    Malha viária: estados em uma grade quase quadrada, ligados aos 4 vizinhos.
+    Uma fração `drop` das ligações é removida para imitar ruas de mão única.
+    """
+    rng = np.random.default_rng(seed)
+    side = max(int(np.sqrt(n_states)), 2)
+    cells = np.arange(side * side).reshape(side, side)
+    pairs = [(cells[:, :-1], cells[:, 1:]), (cells[:, 1:], cells[:, :-1]),
+             (cells[:-1], cells[1:]), (cells[1:], cells[:-1])]
+    origins = np.concatenate([a.ravel() for a, _ in pairs])
+    dests = np.concatenate([b.ravel() for _, b in pairs])
+    keep = rng.random(len(origins)) >= drop
+    counts = rng.integers(1, 500, int(keep.sum()))
+    return _to_observations(_state_names(side * side), origins[keep], dests[keep], counts)
+
+
+def power_law(n_states: int, exponent: float = 2.2, max_degree: int = 1000, seed: int = 0) -> List[Observation]:
+    """Grau de saída com cauda pesada (Zipf): poucos estados concentram muitas transições."""
+    rng = np.random.default_rng(seed)
+    degrees = np.minimum(rng.zipf(exponent, n_states), min(max_degree, n_states))
+    origins = np.repeat(np.arange(n_states), degrees)
+    dests = rng.integers(0, n_states, len(origins))
+    counts = rng.integers(1, 100, len(origins))
+    return _to_observations(_state_names(n_states), origins, dests, counts)
+
+
+def dense(n_states: int, seed: int = 0) -> List[Observation]:
+    """Cadeia pequena e densa: todas as transições entre todos os pares de estados."""
+    rng = np.random.default_rng(seed)
+    origins = np.repeat(np.arange(n_states), n_states)
+    dests = np.tile(np.arange(n_states), n_states)
+    counts = rng.integers(1, 50, len(origins))
+    return _to_observations(_state_names(n_states), origins, dests, counts)
+
+
+GENERATORS: Dict[str, Callable[..., List[Observation]]] = {
+    "random": random_sparse,
+    "grid": grid,
+    "power_law": power_law,
+    "dense": dense,
+}
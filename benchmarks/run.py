@@ -0,0 +1,159 @@
+# benchmarks/run.py
+"""
+Suíte de benchmarks do modelo de Markov.
+
+Mede tempo, pico de memória e vazão das operações principais sobre cadeias sintéticas
+e grava os resultados em JSON, para acompanhar regressões e comparar backends.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.run --generators grid random --sizes 1000 10000 --output resultados.json
+"""
+from __future__ import annotations
+from typing import Callable, Dict, List, Optional, Tuple
+import argparse
+import datetime
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+from src.markov_model.graph import Graph
+from .generators import GENERATORS
+
+BACKENDS = ("objects", "compact")
+# Em cadeias densas a busca exaustiva visita n^profundidade ramos e o número de transições
+# cresce com n², então a profundidade e o tamanho delas são limitados.
+DEPTH_LIMITS = {"dense": 3}
+SIZE_LIMITS = {"dense": 100}
+
+
+def measure(operation: Callable[[], object], repeat: int = 3,
+            setup: Optional[Callable[[], None]] = None) -> Tuple[float, int, object]:
+    """
+    Mede uma operação: melhor tempo entre `repeat` execuções e pico de memória de uma execução
+    extra (feita à parte, pois o `tracemalloc` distorce o tempo).
+    Returns:
+        Tuple[float, int, object]: (segundos, pico de bytes alocados, resultado da última execução).
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        result = operation()
+        best = min(best, time.perf_counter() - started)
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak, result
+
+
+def _record(results: List[Dict], base: Dict, operation: str, seconds: float, peak: int,
+            work: int, unit: str):
+    results.append(dict(base, operation=operation, seconds=seconds, peak_bytes=peak,
+                        throughput=work / seconds if seconds > 0 else None, unit=unit))
+
+
+def run_case(generator: str, size: int, backend: str, repeat: int = 3, n_paths: int = 1000,
+             path_length: int = 8, max_depth: int = 5, n_queries: int = 5, n_walkers: int = 10000,
+             n_steps: int = 100, seed: int = 0) -> List[Dict]:
+    """Executa todas as medições para uma combinação (gerador, tamanho, backend)."""
+    observations = GENERATORS[generator](size, seed=seed)
+    compact = backend == "compact"
+    results: List[Dict] = []
+
+    holder: Dict[str, Graph] = {}
+
+    def fresh_graph():
+        holder["graph"] = Graph(compact=compact)
+
+    seconds, peak, _ = measure(lambda: holder["graph"].build_from_observations(observations),
+                               repeat, setup=fresh_graph)
+    graph = holder["graph"]
+    chain = graph.compile()
+    base = {"generator": generator, "size": size, "backend": backend,
+            "n_states": chain.n_states, "n_edges": chain.n_edges}
+    _record(results, base, "build_from_observations", seconds, peak, len(observations), "observations/s")
+
+    seconds, peak, _ = measure(graph.validate_probabilities, repeat)
+    _record(results, base, "validate_probabilities", seconds, peak, chain.n_edges, "edges/s")
+
+    # Trajetos reais da própria cadeia, para que as consultas percorram transições existentes.
+    walks = graph.simulate(n_paths, path_length - 1, seed=seed).trajectories.T
+    paths = [[chain.names[state] for state in walk] for walk in walks]
+
+    seconds, peak, _ = measure(lambda: [graph.calculate_path_probability(path) for path in paths], repeat)
+    _record(results, base, "calculate_path_probability", seconds, peak, len(paths), "paths/s")
+
+    seconds, peak, _ = measure(lambda: graph.calculate_path_probabilities(paths), repeat)
+    _record(results, base, "calculate_path_probabilities", seconds, peak, len(paths), "paths/s")
+
+    max_depth = min(max_depth, DEPTH_LIMITS.get(generator, max_depth))
+    pairs = [(path[0], path[min(max_depth, len(path)) - 1]) for path in paths[:n_queries]]
+    seconds, peak, _ = measure(lambda: [graph.find_all_paths(start, end, max_depth) for start, end in pairs], repeat)
+    _record(results, base, "find_all_paths", seconds, peak, len(pairs), "queries/s")
+
+    seconds, peak, _ = measure(lambda: graph.simulate(n_walkers, n_steps, seed=seed, record=False), repeat)
+    _record(results, base, "simulate", seconds, peak, n_walkers * n_steps, "transitions/s")
+    return results
+
+
+def format_row(row: Dict) -> str:
+    """Linha do resumo impresso; a vazão é None quando a medição não registrou tempo algum."""
+    throughput = "-" if row["throughput"] is None else f"{row['throughput']:.1f}"
+    return (f"{row['generator']:>10} {row['size']:>8} {row['backend']:>8} {row['operation']:>28} "
+            f"{row['seconds']:10.4f}s {row['peak_bytes'] / 1e6:9.2f}MB {throughput:>14} {row['unit']}")
+
+
+def environment() -> Dict[str, str]:
+    """Informações do ambiente, gravadas junto com os resultados."""
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmarks do modelo de Markov.")
+    parser.add_argument("--generators", nargs="+", default=["random", "grid", "power_law", "dense"],
+                        choices=sorted(GENERATORS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000])
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-depth", type=int, default=5)
+    parser.add_argument("--walkers", type=int, default=10000)
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args(argv)
+
+    results: List[Dict] = []
+    for generator in args.generators:
+        sizes = sorted({min(size, SIZE_LIMITS.get(generator, size)) for size in args.sizes})
+        for size in sizes:
+            for backend in args.backends:
+                case = run_case(generator, size, backend, repeat=args.repeat, max_depth=args.max_depth,
+                                n_walkers=args.walkers, n_steps=args.steps, seed=args.seed)
+                for row in case:
+                    print(format_row(row))
+                results.extend(case)
+
+    with open(args.output, "w", encoding="utf-8") as handle:
+        json.dump({"environment": environment(), "results": results}, handle, indent=2)
+    print(f"\nResultados gravados em '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
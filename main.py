@@ -9,9 +9,11 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__))))
 
 # Agora a importação correta para sua estrutura:
 from src.markov_model.graph import Graph
+from src.markov_model.instrumentation import enable_logging
 
 def main():
     print("Iniciando a aplicação de Modelo de Markov.")
+    enable_logging() # Exibe as mensagens de construção e validação do modelo
 
     # 1. Instanciar o grafo
     markov_model = Graph()
@@ -0,0 +1,65 @@
+# server.py
+"""
+Serviço local de consultas (HTTP/JSON) sobre uma única cadeia de Markov compilada.
+
+Uso (a partir da raiz do repositório):
+    python server.py --chain modelo.mkv --port 8080
+    python server.py --observations data/processed/exemplo.csv
+
+Exemplo de consulta:
+    curl -X POST localhost:8080/path_probability -d '{"path": ["A", "B", "D"]}'
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__))))
+
+from src.markov_model.graph import Graph
+from src.markov_model.instrumentation import enable_logging
+from src.markov_model.service import QueryService
+
+
+def load(args) -> Graph:
+    """Abre a cadeia gravada com `Graph.save` ou a constrói a partir de um arquivo de observações."""
+    if args.chain:
+        return Graph.load(args.chain)
+    from src.utils.data_loader import load_graph
+    return load_graph(args.observations, graph=Graph(compact=True))
+
+
+async def serve(args):
+    graph = load(args)
+    service = QueryService(graph.compile(), window=args.window_ms / 1000.0, max_batch=args.max_batch,
+                           max_pending=args.max_pending)
+    server = await service.start(args.host, args.port)
+    address = server.sockets[0].getsockname()
+    print(f"Servindo {service.chain!r} em http://{address[0]}:{address[1]}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serviço local de consultas à cadeia de Markov.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--chain", help="Arquivo binário gravado com Graph.save().")
+    source.add_argument("--observations", help="Arquivo de observações (CSV ou JSON lines).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--window-ms", type=float, default=2.0, help="Janela de agrupamento das requisições.")
+    parser.add_argument("--max-batch", type=int, default=512)
+    parser.add_argument("--max-pending", type=int, default=4096)
+    args = parser.parse_args()
+    enable_logging()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
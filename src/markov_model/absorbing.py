@@ -0,0 +1,135 @@
+# src/markov_model/absorbing.py
+from __future__ import annotations
+from typing import Dict, List, Sequence
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.csgraph as csgraph
+import scipy.sparse.linalg as spla
+from .compiled import CompiledChain
+
+
+def absorbing_mask(chain: CompiledChain) -> np.ndarray:
+    """Estados absorventes: sem transições de saída ou com laço de probabilidade 1."""
+    mask = chain.terminal_states().copy()
+    loops = (chain.rows == chain.indices) & np.isclose(chain.data, 1.0)
+    mask[chain.rows[loops]] = True
+    return mask
+
+
+def _reaches_absorption(chain: CompiledChain, absorbing: np.ndarray) -> np.ndarray:
+    """Marca os estados a partir dos quais algum estado absorvente é alcançável."""
+    n = chain.n_states
+    # Busca em largura no grafo reverso, a partir de um nó virtual ligado a todos os absorventes.
+    reverse = chain.to_scipy().transpose().tocsr()
+    sources = np.flatnonzero(absorbing)
+    virtual = sp.csr_matrix((np.ones(len(sources)), (np.full(len(sources), n), sources)), shape=(n + 1, n + 1))
+    extended = sp.bmat([[reverse, None], [None, sp.csr_matrix((1, 1))]], format="csr") + virtual
+    order = csgraph.breadth_first_order(extended, n, directed=True, return_predecessors=False)
+    reached = np.zeros(n + 1, dtype=bool)
+    reached[order] = True
+    return reached[:n]
+
+
+class AbsorbingAnalysis:
+    """Análise de uma cadeia absorvente a partir da forma canônica P = [[Q, R], [0, I]].
+
+    A matriz fundamental N = (I - Q)^-1 nunca é formada: (I - Q) é fatorada uma única vez
+    com LU esparsa e cada consulta vira uma solução triangular. Consultas por origem usam
+    o sistema transposto, (I - Q)^T y = e_i, cuja solução é a linha i de N.
+
+    Atributos:
+        transient (np.ndarray): Índices (na cadeia compilada) dos estados transientes.
+        absorbing (np.ndarray): Índices dos estados absorventes.
+        transient_names (List[str]): Nomes dos estados transientes.
+        absorbing_names (List[str]): Nomes dos estados absorventes.
+    """
+    def __init__(self, chain: CompiledChain):
+        self.chain = chain
+        mask = absorbing_mask(chain)
+        if not mask.any():
+            raise ValueError("A cadeia não tem estados absorventes.")
+        stuck = ~mask & ~_reaches_absorption(chain, mask)
+        if stuck.any():
+            examples = ", ".join(chain.names[i] for i in np.flatnonzero(stuck)[:5])
+            raise ValueError(f"Há estados que nunca alcançam um estado absorvente (ex.: {examples}); "
+                             "a matriz I - Q é singular.")
+
+        self._mask = mask
+        self.absorbing = np.flatnonzero(mask)
+        self.transient = np.flatnonzero(~mask)
+        self.absorbing_names: List[str] = [chain.names[i] for i in self.absorbing]
+        self.transient_names: List[str] = [chain.names[i] for i in self.transient]
+        # Posição de cada estado dentro do seu bloco (transiente ou absorvente).
+        self._position = np.zeros(chain.n_states, dtype=np.int64)
+        self._position[self.transient] = np.arange(len(self.transient))
+        self._position[self.absorbing] = np.arange(len(self.absorbing))
+
+        matrix = chain.to_scipy()
+        self.Q = matrix[self.transient][:, self.transient].tocsc()
+        self.R = matrix[self.transient][:, self.absorbing].tocsr()
+        self._lu = spla.splu((sp.identity(len(self.transient), format="csc") - self.Q).tocsc()) \
+            if len(self.transient) else None
+        self._expected_steps = None
+
+    def _rhs(self, starts: Sequence[str]) -> np.ndarray:
+        """Monta as colunas e_i (uma por origem transiente) do sistema transposto."""
+        rhs = np.zeros((len(self.transient), len(starts)))
+        for column, name in enumerate(starts):
+            state = self.chain.index_of(name)
+            if not self.is_absorbing(state):
+                rhs[self._position[state], column] = 1.0
+        return rhs
+
+    def is_absorbing(self, state: int) -> bool:
+        """Indica se o estado de índice `state` é absorvente."""
+        return bool(self._mask[state])
+
+    def fundamental_rows(self, starts: Sequence[str]) -> np.ndarray:
+        """
+        Linhas de N para as origens dadas: visitas esperadas a cada estado transiente.
+        Returns:
+            np.ndarray: Matriz (len(starts), n_transient); linhas de origens absorventes são zero.
+        """
+        if self._lu is None:
+            return np.zeros((len(starts), 0))
+        return self._lu.solve(self._rhs(starts), trans="T").T
+
+    def absorption_matrix(self, starts: Sequence[str]) -> np.ndarray:
+        """
+        Probabilidades de absorção B = N R para várias origens de uma vez.
+        Returns:
+            np.ndarray: Matriz (len(starts), n_absorbing), alinhada com `absorbing_names`.
+        """
+        result = np.asarray(self.R.T @ self.fundamental_rows(starts).T).T if len(self.transient) \
+            else np.zeros((len(starts), len(self.absorbing)))
+        for row, name in enumerate(starts):
+            state = self.chain.index_of(name)
+            if self.is_absorbing(state):
+                result[row] = 0.0
+                result[row, self._position[state]] = 1.0
+        return result
+
+    def absorption_probabilities(self, start: str) -> Dict[str, float]:
+        """Probabilidade de ser absorvido em cada estado absorvente, partindo de `start`."""
+        return dict(zip(self.absorbing_names, self.absorption_matrix([start])[0].tolist()))
+
+    def expected_visits(self, start: str) -> Dict[str, float]:
+        """Número esperado de visitas a cada estado transiente antes da absorção, partindo de `start`."""
+        return dict(zip(self.transient_names, self.fundamental_rows([start])[0].tolist()))
+
+    def expected_steps_all(self) -> np.ndarray:
+        """Número esperado de passos até a absorção a partir de cada estado transiente (t = N 1)."""
+        if self._expected_steps is None:
+            self._expected_steps = self._lu.solve(np.ones(len(self.transient))) if self._lu is not None \
+                else np.zeros(0)
+        return self._expected_steps
+
+    def expected_steps(self, start: str) -> float:
+        """Número esperado de passos até a absorção, partindo de `start` (0 se já for absorvente)."""
+        state = self.chain.index_of(start)
+        if self.is_absorbing(state):
+            return 0.0
+        return float(self.expected_steps_all()[self._position[state]])
+
+    def __repr__(self) -> str:
+        return f"AbsorbingAnalysis(transient={len(self.transient)}, absorbing={len(self.absorbing)})"
@@ -0,0 +1,156 @@
+# src/markov_model/cache.py
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+
+class CacheStats:
+    """Estatísticas de uso de um `QueryCache`, para dimensionar o cache.
+    Atributos:
+        hits (int): Consultas respondidas pelo cache.
+        misses (int): Consultas que precisaram ser calculadas.
+        evictions (int): Entradas descartadas por falta de espaço.
+        invalidations (int): Quantas vezes o cache foi esvaziado porque a cadeia mudou.
+    """
+    __slots__ = ("hits", "misses", "evictions", "invalidations")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fração das consultas respondidas pelo cache (0.0 se ainda não houve consultas)."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        """Retorna as estatísticas como dicionário (útil para exportar em JSON)."""
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "invalidations": self.invalidations, "hit_rate": self.hit_rate}
+
+    def __repr__(self) -> str:
+        return (f"CacheStats(hits={self.hits}, misses={self.misses}, evictions={self.evictions}, "
+                f"invalidations={self.invalidations}, hit_rate={self.hit_rate:.2%})")
+
+
+class QueryCache:
+    """Cache LRU de resultados de consultas, versionado pela cadeia de origem.
+
+    Cada entrada tem um tamanho (ex.: número de nós dos caminhos guardados); as entradas
+    menos usadas recentemente são descartadas quando o número de entradas ou o tamanho
+    total passa dos limites. O cache guarda a versão do grafo em que os resultados foram
+    calculados e se esvazia sozinho em `sync` quando essa versão muda.
+
+    Sequências que compartilham prefixos (ex.: caminhos) podem ser guardadas como uma trie
+    (`walk` e `extend`): cada prefixo é uma entrada (namespace, nó pai, elemento) -> (nó,
+    valor), de tamanho constante, então consultar ou guardar uma sequência de comprimento L
+    custa O(L) em tempo e memória, em vez de uma chave por prefixo com L elementos cada.
+
+    Atributos:
+        max_entries (int): Número máximo de entradas.
+        max_size (Optional[int]): Tamanho total máximo; sem limite se None.
+        size (int): Tamanho total atual.
+        version (int): Versão do grafo à qual os resultados pertencem.
+        stats (CacheStats): Estatísticas de acertos, falhas e descartes.
+    """
+    def __init__(self, max_entries: int = 10000, max_size: Optional[int] = None):
+        if max_entries < 1:
+            raise ValueError("O cache deve comportar pelo menos uma entrada.")
+        if max_size is not None and max_size < 1:
+            raise ValueError("O tamanho máximo do cache deve ser positivo.")
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.size = 0
+        self.version: Optional[int] = None
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[Hashable, Tuple[object, int]]" = OrderedDict()
+        self._last_node = 0 # Identificadores dos nós da trie; nunca reutilizados
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def sync(self, version: int):
+        """Esvazia o cache se os resultados guardados pertencem a outra versão do grafo."""
+        if self.version != version:
+            if self._entries:
+                self.stats.invalidations += 1
+            self.clear()
+            self.version = version
+
+    def get(self, key: Hashable, default=None):
+        """Retorna o valor de `key` (marcando-o como recém-usado) ou `default`, contando acerto ou falha."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry[0]
+
+    def peek(self, key: Hashable, default=None):
+        """Como `get`, mas sem alterar a ordem LRU nem as estatísticas."""
+        entry = self._entries.get(key)
+        return default if entry is None else entry[0]
+
+    def put(self, key: Hashable, value, size: int = 1):
+        """Guarda `value` em `key`, descartando as entradas mais antigas se preciso."""
+        if self.max_size is not None and size > self.max_size:
+            return # Nunca caberia: não vale a pena esvaziar o cache por ela
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size -= old[1]
+        self._entries[key] = (value, size)
+        self.size += size
+        while len(self._entries) > self.max_entries or (self.max_size is not None and self.size > self.max_size):
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.size -= evicted_size
+            self.stats.evictions += 1
+
+    def walk(self, namespace: Hashable, sequence: Sequence[Hashable],
+             absorbing: object = None) -> Tuple[int, Optional[int], object]:
+        """
+        Desce pela trie guardada sob `namespace` seguindo `sequence`, elemento por elemento.
+        Conta um acerto se a sequência inteira estava guardada (ou se um prefixo guardado
+        tem o valor `absorbing`, que já determina o resultado) e uma falha caso contrário.
+        Os prefixos percorridos são marcados como recém-usados, os mais curtos por último,
+        para que o LRU descarte as folhas antes dos seus ancestrais.
+        Returns:
+            Tuple[int, Optional[int], object]: O comprimento do maior prefixo guardado, o seu
+                                               nó (None se nenhum) e o seu valor.
+        """
+        node: Optional[int] = None
+        value = None
+        path: List[Hashable] = []
+        for item in sequence:
+            key = (namespace, node, item)
+            entry = self._entries.get(key)
+            if entry is None:
+                break
+            path.append(key)
+            node, value = entry[0]
+            if absorbing is not None and value == absorbing:
+                break
+        for key in reversed(path):
+            self._entries.move_to_end(key)
+        if path and (len(path) == len(sequence) or (absorbing is not None and value == absorbing)):
+            self.stats.hits += 1
+        else:
+            self.stats.misses += 1
+        return len(path), node, value
+
+    def extend(self, namespace: Hashable, parent: Optional[int], item: Hashable, value) -> int:
+        """Guarda o prefixo formado pelo nó `parent` (None na raiz) seguido de `item`; retorna o novo nó."""
+        self._last_node += 1
+        self.put((namespace, parent, item), (self._last_node, value))
+        return self._last_node
+
+    def clear(self):
+        """Remove todas as entradas (as estatísticas são mantidas)."""
+        self._entries.clear()
+        self.size = 0
+
+    def __repr__(self) -> str:
+        return f"QueryCache(entries={len(self)}, size={self.size}, version={self.version}, {self.stats!r})"
@@ -0,0 +1,375 @@
+# src/markov_model/compact.py
+from __future__ import annotations
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional
+import sys
+import numpy as np
+from .instrumentation import instrumentation
+
+_COUNT_EPSILON = 1e-9 # Mesmo critério de `Node.add_count` para descartar contagens nulas
+_INDEX_THRESHOLD = 32 # Grau a partir do qual uma linha ganha um índice destino -> posição
+
+
+class CompactStore:
+    """Armazenamento compacto de uma cadeia baseada em contagens.
+
+    Cada estado é identificado por um inteiro; os nomes ficam internados em uma tabela.
+    As transições de saída de cada estado são guardadas em dois buffers planos do módulo
+    `array` (destinos como inteiros de 32 bits e contagens como double), sem um objeto
+    Python por transição: cerca de 12 bytes por aresta. Linhas com pelo menos
+    `_INDEX_THRESHOLD` transições ganham também um dicionário destino -> posição, para que
+    a busca de uma transição seja O(1) mesmo em estados com milhares de saídas; nas demais,
+    a varredura do buffer é mais barata que o dicionário. `NodeView` e `EdgeView` expõem
+    esses dados com a mesma interface de `Node` e `Edge`.
+
+    Atributos:
+        names (List[str]): Nome de cada estado, indexado pelo identificador.
+        index (Dict[str, int]): Mapeia o nome de cada estado para seu identificador.
+    """
+    __slots__ = ("names", "index", "_targets", "_counts", "_totals", "_positions")
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+        self._targets: List[array] = []
+        self._counts: List[array] = []
+        self._totals = array("d")
+        self._positions: List[Optional[Dict[int, int]]] = []
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def get_or_create(self, name: str) -> int:
+        """Retorna o identificador do estado, criando-o se ainda não existir."""
+        if not name:
+            raise ValueError("O nome do nó não pode ser vazio.")
+        if not isinstance(name, str):
+            raise TypeError("O nome do nó deve ser uma string.")
+        name = sys.intern(name.lower())
+        state = self.index.get(name)
+        if state is None:
+            state = len(self.names)
+            self.names.append(name)
+            self.index[name] = state
+            self._targets.append(array("I"))
+            self._counts.append(array("d"))
+            self._totals.append(0.0)
+            self._positions.append(None)
+            instrumentation.count("nodes_created")
+        return state
+
+    def add_count(self, source: int, target: int, count: float) -> bool:
+        """
+        Soma `count` à transição source -> target, criando-a ou removendo-a quando necessário.
+        Returns:
+            bool: True se a transição existe após a operação.
+        """
+        targets, counts = self._targets[source], self._counts[source]
+        pos = self._position(source, target)
+        if pos < 0:
+            if count <= 0:
+                return False
+            positions = self._positions[source]
+            if positions is not None:
+                positions[target] = len(targets)
+            targets.append(target)
+            counts.append(count)
+            self._totals[source] += count
+            instrumentation.count("edges_created")
+            return True
+        counts[pos] += count
+        self._totals[source] += count
+        if counts[pos] <= _COUNT_EPSILON * max(1.0, abs(count)):
+            self._totals[source] -= counts[pos]
+            del targets[pos]
+            del counts[pos]
+            positions = self._positions[source]
+            if positions is not None:
+                # A remoção preserva a ordem das demais transições, como em `Node`.
+                del positions[target]
+                positions.update(zip(targets[pos:], range(pos, len(targets))))
+            return False
+        return True
+
+    def _position(self, source: int, target: int, hint: int = -1) -> int:
+        """Posição da transição source -> target nos buffers da linha, ou -1 se ela não existir."""
+        targets = self._targets[source]
+        if 0 <= hint < len(targets) and targets[hint] == target:
+            return hint
+        positions = self._positions[source]
+        if positions is None:
+            if len(targets) < _INDEX_THRESHOLD:
+                try:
+                    return targets.index(target)
+                except ValueError:
+                    return -1
+            positions = self._positions[source] = {state: pos for pos, state in enumerate(targets)}
+        return positions.get(target, -1)
+
+    def count(self, source: int, target: int, hint: int = -1) -> Optional[float]:
+        """
+        Contagem da transição source -> target, ou None se ela não existir.
+        `hint` é a posição provável da transição na linha (ex.: obtida ao percorrê-la).
+        """
+        pos = self._position(source, target, hint)
+        return self._counts[source][pos] if pos >= 0 else None
+
+    def total(self, source: int) -> float:
+        """Soma das contagens de saída de `source`."""
+        return self._totals[source]
+
+    def targets(self, source: int) -> array:
+        """Buffer com os destinos das transições de saída de `source`."""
+        return self._targets[source]
+
+    def rescale(self, factor: float):
+        """Multiplica todas as contagens por `factor`."""
+        for counts in self._counts:
+            for pos in range(len(counts)):
+                counts[pos] *= factor
+        for state in range(len(self._totals)):
+            self._totals[state] *= factor
+
+    def to_csr(self):
+        """
+        Concatena os buffers em vetores CSR (indptr, indices, data) sem criar objetos por aresta.
+        As probabilidades são as contagens divididas pelo total de saída de cada estado.
+        """
+        degrees = np.fromiter((len(targets) for targets in self._targets), dtype=np.int64, count=len(self.names))
+        indices = np.frombuffer(b"".join(targets.tobytes() for targets in self._targets), dtype=np.uint32)
+        counts = np.frombuffer(b"".join(counts.tobytes() for counts in self._counts), dtype=np.float64)
+        totals = np.frombuffer(self._totals.tobytes(), dtype=np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            data = np.nan_to_num(counts / np.repeat(totals, degrees))
+        return degrees, indices, data
+
+
+class FrozenStore:
+    """Armazenamento somente leitura sobre uma `CompiledChain` (ex.: carregada via mmap).
+
+    Oferece a mesma interface de leitura de `CompactStore`, de modo que `NodeView` e
+    `EdgeView` funcionam sem copiar os vetores CSR. As contagens são reconstruídas como
+    probabilidade * total de saída quando os totais estão disponíveis.
+    """
+    __slots__ = ("chain", "totals")
+
+    def __init__(self, chain, totals: Optional[np.ndarray] = None):
+        self.chain = chain
+        self.totals = totals
+
+    @property
+    def names(self) -> List[str]:
+        return self.chain.names
+
+    @property
+    def index(self) -> Dict[str, int]:
+        return self.chain.index
+
+    def __len__(self) -> int:
+        return self.chain.n_states
+
+    def get_or_create(self, name: str) -> int:
+        state = self.chain.index.get(name.lower())
+        if state is None:
+            raise ValueError("A cadeia carregada é somente leitura; não é possível criar estados.")
+        return state
+
+    def add_count(self, source: int, target: int, count: float) -> bool:
+        raise ValueError("A cadeia carregada é somente leitura.")
+
+    def rescale(self, factor: float):
+        raise ValueError("A cadeia carregada é somente leitura.")
+
+    def total(self, source: int) -> float:
+        if self.totals is not None and self.totals[source] > 0:
+            return float(self.totals[source])
+        return 1.0
+
+    def count(self, source: int, target: int, hint: int = -1) -> Optional[float]:
+        cols, probs = self.chain.row(source)
+        pos = hint if 0 <= hint < len(cols) and cols[hint] == target else int(np.searchsorted(cols, target))
+        if pos < len(cols) and cols[pos] == target:
+            return float(probs[pos]) * self.total(source)
+        return None
+
+    def targets(self, source: int) -> List[int]:
+        return self.chain.row(source)[0].tolist()
+
+    def to_csr(self):
+        return np.diff(self.chain.indptr), self.chain.indices, self.chain.data
+
+    def thaw(self) -> CompactStore:
+        """Copia a cadeia para um `CompactStore` mutável, preservando as contagens."""
+        store = CompactStore()
+        for name in self.chain.names:
+            store.get_or_create(name)
+        for source in range(self.chain.n_states):
+            cols, probs = self.chain.row(source)
+            total = self.total(source)
+            for target, prob in zip(cols.tolist(), probs.tolist()):
+                store.add_count(source, target, prob * total)
+        return store
+
+
+class EdgeView:
+    """Visão leve de uma transição guardada em um `CompactStore`, com a interface de `Edge`."""
+    __slots__ = ("_store", "_source", "_target", "_hint")
+
+    def __init__(self, store: CompactStore, source: int, target: int, hint: int = -1):
+        self._store = store
+        self._source = source
+        self._target = target
+        self._hint = hint # Posição da transição na linha quando a visão foi criada
+
+    @property
+    def count(self) -> Optional[float]:
+        return self._store.count(self._source, self._target, self._hint)
+
+    @property
+    def weight(self) -> float:
+        return self.get_weight()
+
+    def get_to_state(self) -> NodeView:
+        """Retorna o estado de destino da transição."""
+        return NodeView(self._store, self._target)
+
+    def get_from_state(self) -> NodeView:
+        """Retorna o estado de origem da transição."""
+        return NodeView(self._store, self._source)
+
+    def get_count(self) -> Optional[float]:
+        """Retorna a contagem de observações da transição."""
+        return self.count
+
+    def get_weight(self) -> float:
+        """Retorna a probabilidade da transição (contagem / total de saída da origem)."""
+        total = self._store.total(self._source)
+        count = self.count
+        return count / total if count is not None and total > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return f"Edge({self._store.names[self._source]} -> {self._store.names[self._target]}, W={self.weight:.2f})"
+
+    def __str__(self) -> str:
+        return (f"{self._store.names[self._source].capitalize()} -> "
+                f"{self._store.names[self._target].capitalize()} (Prob: {self.weight:.2f})")
+
+
+class TransitionsView(Mapping):
+    """Mapeamento nome_do_destino -> EdgeView das transições de saída de um estado."""
+    __slots__ = ("_store", "_source")
+
+    def __init__(self, store: CompactStore, source: int):
+        self._store = store
+        self._source = source
+
+    def __getitem__(self, name: str) -> EdgeView:
+        target = self._store.index.get(name)
+        if target is None or self._store.count(self._source, target) is None:
+            raise KeyError(name)
+        return EdgeView(self._store, self._source, target)
+
+    def __iter__(self) -> Iterator[str]:
+        names = self._store.names
+        return (names[target] for target in self._store.targets(self._source))
+
+    def __len__(self) -> int:
+        return len(self._store.targets(self._source))
+
+    def values(self):
+        store, source = self._store, self._source
+        return [EdgeView(store, source, target, pos) for pos, target in enumerate(store.targets(source))]
+
+
+class NodeView:
+    """Visão leve de um estado guardado em um `CompactStore`, com a interface de `Node`."""
+    __slots__ = ("_store", "_id")
+
+    def __init__(self, store: CompactStore, state: int):
+        self._store = store
+        self._id = state
+
+    @property
+    def name(self) -> str:
+        return self._store.names[self._id]
+
+    @property
+    def transitions(self) -> TransitionsView:
+        return TransitionsView(self._store, self._id)
+
+    @property
+    def total_count(self) -> float:
+        return self._store.total(self._id)
+
+    def get_name(self) -> str:
+        """Retorna o nome do nó."""
+        return self.name
+
+    def get_total_count(self) -> float:
+        """Retorna a soma das contagens das transições de saída."""
+        return self.total_count
+
+    def _state_of(self, node) -> int:
+        if isinstance(node, NodeView) and node._store is self._store:
+            return node._id
+        return self._store.get_or_create(node.get_name())
+
+    def add_count(self, to_state, count: float) -> Optional[EdgeView]:
+        """Soma `count` observações à transição para `to_state` (ver `Node.add_count`)."""
+        target = self._state_of(to_state)
+        if self._store.add_count(self._id, target, count):
+            return EdgeView(self._store, self._id, target)
+        return None
+
+    def add_edge(self, edge) -> None:
+        """Adiciona uma transição baseada em contagens; contagens repetidas são somadas."""
+        if edge is None:
+            raise ValueError("A transição não pode ser nula.")
+        if edge.get_count() is None:
+            raise ValueError("O armazenamento compacto guarda apenas transições baseadas em contagens.")
+        self.add_count(edge.get_to_state(), edge.get_count())
+
+    def get_transition_probability(self, to_node: str) -> float:
+        """Retorna a probabilidade de transição para um nó específico."""
+        if to_node is None:
+            raise ValueError("O nome do nó de destino não pode ser nulo.")
+        target = self._store.index.get(to_node.lower())
+        if target is None:
+            return 0.0
+        return EdgeView(self._store, self._id, target).get_weight()
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, NodeView) and other._store is self._store and other._id == self._id
+
+    def __hash__(self) -> int:
+        return hash((id(self._store), self._id))
+
+    def __repr__(self) -> str:
+        return f"Node('{self.name}')"
+
+    def __str__(self) -> str:
+        return f"Estado: {self.name.capitalize()}"
+
+
+class NodeMap(Mapping):
+    """Mapeamento nome -> NodeView usado como `Graph.nodes` no modo compacto."""
+    __slots__ = ("_store",)
+
+    def __init__(self, store: CompactStore):
+        self._store = store
+
+    def __getitem__(self, name: str) -> NodeView:
+        state = self._store.index.get(name)
+        if state is None:
+            raise KeyError(name)
+        return NodeView(self._store, state)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.names)
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __contains__(self, name) -> bool:
+        return name in self._store.index
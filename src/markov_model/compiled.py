@@ -0,0 +1,216 @@
+# src/markov_model/compiled.py
+from __future__ import annotations
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import scipy.sparse as sp
+
+
+def _index_dtype(size: int) -> np.dtype:
+    """Escolhe o menor tipo inteiro capaz de indexar `size` posições."""
+    return np.dtype(np.int32) if size < np.iinfo(np.int32).max else np.dtype(np.int64)
+
+
+class CompiledChain:
+    """Forma compilada (congelada) de uma cadeia de Markov.
+
+    A matriz de transição é armazenada no formato CSR (Compressed Sparse Row):
+    a linha `i` corresponde ao estado de origem `names[i]` e suas transições
+    ocupam o intervalo `indptr[i]:indptr[i+1]` dos vetores `indices` (destinos)
+    e `data` (probabilidades). Os destinos de cada linha ficam ordenados.
+
+    Atributos:
+        names (List[str]): Nomes dos estados (em minúsculas), na ordem dos índices.
+        index (Dict[str, int]): Mapeia o nome de cada estado para seu índice.
+        indptr (np.ndarray): Ponteiros de início de linha (tamanho n_states + 1).
+        indices (np.ndarray): Índice do estado de destino de cada transição.
+        data (np.ndarray): Probabilidade de cada transição.
+        version (int): Versão do grafo de origem no momento da compilação.
+    """
+    def __init__(self, names: Sequence[str], indptr: np.ndarray, indices: np.ndarray,
+                 data: np.ndarray, version: int = 0):
+        """Inicializa a cadeia compilada a partir de vetores CSR já montados."""
+        indptr = np.asarray(indptr)
+        indices = np.asarray(indices)
+        data = np.asarray(data, dtype=np.float64)
+
+        if indptr.ndim != 1 or len(indptr) != len(names) + 1:
+            raise ValueError("O vetor indptr deve ter tamanho igual ao número de estados + 1.")
+        if len(indices) != len(data) or len(indices) != int(indptr[-1]):
+            raise ValueError("Os vetores indices e data devem ter o tamanho indicado por indptr.")
+
+        self.names: List[str] = list(names)
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.indptr: np.ndarray = indptr
+        self.indices: np.ndarray = indices
+        self.data: np.ndarray = data
+        self.version: int = version
+        self._rows: Optional[np.ndarray] = None
+        self._transposed: Optional[sp.csr_matrix] = None
+        self._costs: Optional[np.ndarray] = None
+        self._keys: Optional[np.ndarray] = None
+        # Estruturas derivadas (fatorações, decomposições) reaproveitadas enquanto a cadeia não muda.
+        self.cache: Dict[str, object] = {}
+
+    @classmethod
+    def from_graph(cls, graph) -> CompiledChain:
+        """
+        Congela os nós e arestas de um `Graph` em vetores CSR.
+        Args:
+            graph (Graph): O grafo de origem.
+        Returns:
+            CompiledChain: A cadeia compilada.
+        """
+        store = getattr(graph, "_store", None)
+        version = getattr(graph, "_version", 0)
+        if store is not None:
+            degrees, indices, data = store.to_csr()
+            return cls._from_rows(store.names, degrees, indices.astype(_index_dtype(len(store.names))), data, version)
+
+        names = list(graph.nodes.keys())
+        index = {name: i for i, name in enumerate(names)}
+        n_states = len(names)
+        nodes = [graph.nodes[name] for name in names]
+
+        degrees = np.fromiter((len(node.transitions) for node in nodes), dtype=np.int64, count=n_states)
+        nnz = int(degrees.sum())
+        indices = np.fromiter(
+            (index[dest_name] for node in nodes for dest_name in node.transitions),
+            dtype=_index_dtype(n_states), count=nnz)
+        data = np.fromiter(
+            (edge.get_weight() for node in nodes for edge in node.transitions.values()),
+            dtype=np.float64, count=nnz)
+        return cls._from_rows(names, degrees, indices, data, version)
+
+    @classmethod
+    def _from_rows(cls, names: Sequence[str], degrees: np.ndarray, indices: np.ndarray,
+                   data: np.ndarray, version: int) -> CompiledChain:
+        """Monta o CSR a partir das transições agrupadas por linha, ordenando os destinos."""
+        n_states = len(names)
+        indptr = np.zeros(n_states + 1, dtype=np.int64)
+        np.cumsum(degrees, out=indptr[1:])
+        # Ordena os destinos dentro de cada linha (forma canônica do CSR).
+        rows = np.repeat(np.arange(n_states, dtype=indices.dtype), degrees)
+        order = np.lexsort((indices, rows))
+        return cls(names, indptr, indices[order], data[order], version=version)
+
+    @property
+    def n_states(self) -> int:
+        """Número de estados da cadeia."""
+        return len(self.names)
+
+    @property
+    def n_edges(self) -> int:
+        """Número de transições armazenadas."""
+        return len(self.data)
+
+    @property
+    def rows(self) -> np.ndarray:
+        """Índice do estado de origem de cada transição (calculado sob demanda)."""
+        if self._rows is None:
+            self._rows = np.repeat(np.arange(self.n_states, dtype=self.indices.dtype),
+                                   np.diff(self.indptr))
+        return self._rows
+
+    @property
+    def costs(self) -> np.ndarray:
+        """Custo -log(p) de cada transição (calculado sob demanda); p = 0 vira infinito."""
+        if self._costs is None:
+            with np.errstate(divide="ignore"):
+                self._costs = -np.log(self.data)
+        return self._costs
+
+    def out_degree(self) -> np.ndarray:
+        """Retorna o número de transições de saída de cada estado."""
+        return np.diff(self.indptr)
+
+    def row_sums(self) -> np.ndarray:
+        """Retorna a soma das probabilidades de saída de cada estado."""
+        return np.bincount(self.rows, weights=self.data, minlength=self.n_states)
+
+    def terminal_states(self) -> np.ndarray:
+        """Retorna uma máscara booleana dos estados sem transições de saída."""
+        return self.out_degree() == 0
+
+    def index_of(self, name: str) -> int:
+        """
+        Obtém o índice de um estado pelo nome.
+        Args:
+            name (str): Nome do estado (a caixa é ignorada).
+        Returns:
+            int: O índice do estado.
+        """
+        idx = self.index.get(name.lower())
+        if idx is None:
+            raise ValueError(f"Estado '{name}' não encontrado na cadeia.")
+        return idx
+
+    def indices_of(self, names: Sequence[str]) -> np.ndarray:
+        """Converte uma sequência de nomes em um vetor de índices."""
+        return np.fromiter((self.index_of(name) for name in names), dtype=np.int64, count=len(names))
+
+    def row(self, i: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Retorna (destinos, probabilidades) das transições de saída do estado `i`."""
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return self.indices[start:end], self.data[start:end]
+
+    def transition_probability(self, i: int, j: int) -> float:
+        """Retorna P[i, j] usando busca binária na linha `i`."""
+        cols, probs = self.row(i)
+        pos = int(np.searchsorted(cols, j))
+        if pos < len(cols) and cols[pos] == j:
+            return float(probs[pos])
+        return 0.0
+
+    def lookup(self, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        """
+        Busca vetorizada de P[sources, targets] para vetores de índices de mesmo formato.
+        Como o CSR é canônico (linhas e destinos ordenados), a chave origem * n + destino
+        é crescente em todo o vetor e uma única busca binária resolve todos os pares.
+        Índices negativos ou fora do intervalo resultam em probabilidade 0.
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        n = self.n_states
+        if self._keys is None:
+            self._keys = self.rows.astype(np.int64) * n + self.indices
+        in_range = (sources >= 0) & (sources < n) & (targets >= 0) & (targets < n)
+        query = np.where(in_range, sources * n + targets, -1)
+        pos = np.minimum(np.searchsorted(self._keys, query), max(self.n_edges - 1, 0))
+        if self.n_edges == 0:
+            return np.zeros(query.shape)
+        found = in_range & (self._keys[pos] == query)
+        return np.where(found, self.data[pos], 0.0)
+
+    def propagate(self, x: np.ndarray) -> np.ndarray:
+        """
+        Avança uma ou mais distribuições um passo na cadeia: retorna x @ P.
+        Args:
+            x (np.ndarray): Vetor (n_states,) com a massa de probabilidade atual, ou
+                            matriz (n_states, k) com k distribuições nas colunas.
+        Returns:
+            np.ndarray: A(s) distribuição(ões) após uma transição, com o mesmo formato de `x`.
+        """
+        return self.transposed() @ x
+
+    def to_scipy(self) -> sp.csr_matrix:
+        """Retorna a matriz de transição como `scipy.sparse.csr_matrix` (sem copiar os vetores)."""
+        return sp.csr_matrix((self.data, self.indices, self.indptr),
+                             shape=(self.n_states, self.n_states), copy=False)
+
+    def transposed(self) -> sp.csr_matrix:
+        """
+        Retorna P^T em CSR (em cache). Multiplicar P^T por um vetor coluna equivale
+        a propagar uma distribuição (vetor linha) um passo: (x @ P)^T = P^T @ x^T.
+        """
+        if self._transposed is None:
+            self._transposed = self.to_scipy().transpose().tocsr()
+        return self._transposed
+
+    def to_dense(self) -> np.ndarray:
+        """Retorna a matriz de transição densa (apenas para cadeias pequenas)."""
+        matrix = np.zeros((self.n_states, self.n_states), dtype=np.float64)
+        matrix[self.rows, self.indices] = self.data
+        return matrix
+
+    def __repr__(self) -> str:
+        return f"CompiledChain(n_states={self.n_states}, n_edges={self.n_edges}, version={self.version})"
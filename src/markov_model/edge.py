@@ -4,29 +4,52 @@ from typing import Any, Dict, List, Optional, Union
 
 class Edge:
     """Classe que representa uma transição entre estados em um grafo.
+    A transição pode ter um peso fixo ou ser baseada em contagens: neste caso a
+    probabilidade é calculada sob demanda como count / total de saída da origem,
+    de modo que novas observações alteram os pesos sem reconstruir o grafo.
     Atributos:
         from_state (Node): Estado de origem da transição.
         to_state (Node): Estado de destino da transição.
-        weight (float): Peso da transição, representando sua probabilidade, entre 0 e 1."""
-    
-    def __init__(self, from_state: Node, to_state: Node, weight: float):
+        weight (float): Peso da transição, representando sua probabilidade, entre 0 e 1.
+        count (Optional[float]): Número de observações da transição, se ela for baseada em contagens."""
+    __slots__ = ("from_state", "to_state", "_weight", "count")
+
+    def __init__(self, from_state: Node, to_state: Node, weight: Optional[float] = None,
+                 count: Optional[float] = None):
         
-        if weight < 0 or weight > 1:
+        if weight is None and count is None:
+            raise ValueError("Informe o peso ou a contagem da transição.")
+        if weight is not None and (weight < 0 or weight > 1):
             raise ValueError("O peso da transição deve estar entre 0 e 1.")
+        if count is not None and count < 0:
+            raise ValueError("A contagem da transição não pode ser negativa.")
         if from_state is None or to_state is None:
             raise ValueError("Os estados de origem e destino não podem ser nulos.")
         
         self.from_state = from_state
         self.to_state = to_state
-        self.weight = weight
+        self._weight = weight
+        self.count = count
+
+    @property
+    def weight(self) -> float:
+        """Peso (probabilidade) atual da transição."""
+        return self.get_weight()
 
     def get_to_state(self) -> Node:
         """Retorna o estado de destino da transição."""
         return self.to_state
 
     def get_weight(self) -> float:
-        """Retorna o peso da transição."""
-        return self.weight
+        """Retorna o peso da transição, recalculado a partir das contagens quando houver."""
+        if self.count is not None:
+            total = self.from_state.get_total_count()
+            return self.count / total if total > 0 else 0.0
+        return self._weight
+
+    def get_count(self) -> Optional[float]:
+        """Retorna a contagem de observações da transição (None se o peso for fixo)."""
+        return self.count
     
     def get_from_state(self) -> Node:
         """Retorna o estado de origem da transição."""
@@ -1,20 +1,56 @@
 # src/markov_model/graph.py
-from typing import List, Tuple, Dict, Optional
+from typing import Deque, Iterable, Iterator, List, Tuple, Dict, Optional
+from collections import deque
 from .node import Node # Importação relativa continua correta
 from .edge import Edge # Importação relativa continua correta
+from .compiled import CompiledChain
+from .compact import CompactStore, FrozenStore, NodeMap, NodeView
+from .persistence import load_chain, save_chain
+from .instrumentation import instrumentation, logger
+from .absorbing import AbsorbingAnalysis
+from .structure import ChainStructure
+from .higher_order import HigherOrderEstimator
+from .lumping import LumpedChain, lump
+from .stationary import StationaryResult, stationary_distribution
+from .convergence import ConvergenceReport, convergence_report
+from .simulation import SimulationResult, simulate
+from .parallel import run_batch
+from .cache import CacheStats, QueryCache
+from .paths import PathBatchResult, ReachResult, iter_paths, path_probabilities, reach_probability, top_k_paths
 import math
+import numpy as np
+
+_MAX_COUNT_SCALE = 1e100 # Limite do fator de escala das contagens antes de renormalizar
 
 class Graph:
     """Classe que representa uma cadeia de Markov.
     Gerencia os nós (estados) e as arestas (transições com probabilidades) da cadeia.
 
+    No modo compacto (`Graph(compact=True)`), os estados e transições ficam em buffers
+    planos de um `CompactStore` e `nodes` devolve visões leves com a mesma interface de
+    `Node` e `Edge`; nesse modo só são aceitas transições baseadas em contagens.
+
     Atributos:
         nodes (Dict[str, Node]): Dicionário que mapeia nomes de nós (em minúsculas)
                                  para instâncias da classe Node.
     """
-    def __init__(self):
-        """Inicializa uma instância vazia de Graph (Cadeia de Markov)."""
-        self.nodes: Dict[str, Node] = {}
+    def __init__(self, compact: bool = False):
+        """Inicializa uma instância vazia de Graph (Cadeia de Markov).
+        Args:
+            compact (bool): Usa o armazenamento compacto em vez de objetos Node/Edge.
+        """
+        self._store: Optional[CompactStore] = CompactStore() if compact else None
+        self.nodes: Dict[str, Node] = NodeMap(self._store) if compact else {}
+        self._version: int = 0 # Incrementado a cada alteração estrutural da cadeia
+        self._compiled: Optional[CompiledChain] = None
+        self._last_stationary: Optional[StationaryResult] = None
+        # Política de atualização incremental (ver `set_update_policy`).
+        self._decay: Optional[float] = None
+        self._window: Optional[int] = None
+        self._window_batches: Deque[Dict[Tuple[str, str], float]] = deque()
+        # As contagens guardadas nas arestas valem (contagem real) * _count_scale.
+        self._count_scale: float = 1.0
+        self._cache: Optional[QueryCache] = None # Cache de consultas opcional (ver `enable_cache`)
 
     def _get_or_create_node(self, name: str) -> Node:
         """
@@ -25,6 +61,9 @@ class Graph:
         Returns:
             Node: O objeto Node, seja ele novo ou já existente.
         """
+        if self._store is not None:
+            self._ensure_mutable()
+            return NodeView(self._store, self._store.get_or_create(name))
         name_lower = name.lower()
         if name_lower not in self.nodes:
             self.nodes[name_lower] = Node(name_lower)
@@ -41,37 +80,266 @@ class Graph:
         name_lower = name.lower()
         return self.nodes.get(name_lower)
 
-    def build_from_observations(self, observations: List[Tuple[str, str, int]]):
+    @instrumentation.timed("build")
+    def build_from_observations(self, observations: Iterable[Tuple[str, str, int]]):
         """
         Este método crucial transforma dados brutos de observações em um grafo de cadeia de Markov.
         Ele calcula as probabilidades de transição com base na frequência das observações.
+        As observações são percorridas uma única vez, então qualquer iterável serve
+        (inclusive geradores que leem de arquivo, ver `utils.data_loader`); observações
+        repetidas do mesmo par (origem, destino) têm suas contagens somadas.
 
         Args:
-            observations: Uma lista de tuplas. Cada tupla é uma observação de tráfego.
+            observations: Um iterável de tuplas. Cada tupla é uma observação de tráfego.
                           Formato: (nome_da_origem, nome_do_destino, numero_de_carros)
                           Exemplo: [('A', 'B', 120), ('A', 'C', 80)]
         """
-        print("\n--- Construindo grafo a partir das observações ---")
-
-        origin_totals: Dict[str, int] = {}
-        for origin, _, count in observations:
-            origin_lower = origin.lower()
-            origin_totals[origin_lower] = origin_totals.get(origin_lower, 0) + count
-
-        for origin_name, dest_name, count in observations:
+        logger.info("Construindo grafo a partir das observações.")
+
+        # Passada única: agrega as contagens por par.
+        # A memória usada cresce com o número de transições distintas, não de observações.
+        pair_counts: Dict[Tuple[str, str], int] = {}
+        for origin, dest, count in observations:
+            if count < 0:
+                raise ValueError("A contagem de uma observação não pode ser negativa.")
+            key = (origin.lower(), dest.lower())
+            pair_counts[key] = pair_counts.get(key, 0) + count
+
+        for (origin_name, dest_name), count in pair_counts.items():
             origin_node = self._get_or_create_node(origin_name)
             dest_node = self._get_or_create_node(dest_name)
 
-            total_out_from_origin = origin_totals.get(origin_name.lower(), 0)
-            probability = count / total_out_from_origin if total_out_from_origin > 0 else 0.0
+            # A aresta guarda a contagem bruta; a probabilidade (contagem / total de saída
+            # da origem) é calculada sob demanda, o que permite atualizações incrementais.
+            origin_node.add_count(dest_node, count * self._count_scale)
+
+        self._version += 1
+        logger.info("Grafo construído com sucesso a partir das observações.")
+        self.validate_probabilities() # Valida as probabilidades após a construção
 
-            edge = Edge(from_state=origin_node, to_state=dest_node, weight=probability)
+    def add_edge(self, origin_name: str, dest_name: str, weight: Optional[float] = None,
+                 count: Optional[float] = None):
+        """
+        Adiciona uma transição entre dois estados, criando-os se necessário (ver `Node.add_edge`).
+        Ao contrário de chamar `Node.add_edge` diretamente, atualiza a versão do grafo, o que
+        invalida a forma compilada e o cache de consultas.
+        Args:
+            origin_name (str): Nome do estado de origem.
+            dest_name (str): Nome do estado de destino.
+            weight (Optional[float]): Probabilidade fixa da transição.
+            count (Optional[float]): Número de observações da transição.
+        """
+        origin_node = self._get_or_create_node(origin_name)
+        dest_node = self._get_or_create_node(dest_name)
+        if count is not None:
+            count *= self._count_scale
+        origin_node.add_edge(Edge(from_state=origin_node, to_state=dest_node, weight=weight, count=count))
+        self._version += 1
+
+    def enable_cache(self, max_entries: int = 10000, max_size: Optional[int] = None) -> QueryCache:
+        """
+        Ativa o cache de `calculate_path_probability` e `find_all_paths`.
+        As probabilidades de caminho são guardadas por prefixo, então um caminho novo que
+        estende um já consultado só multiplica os passos restantes; as buscas de caminhos são
+        guardadas por (início, destino, max_depth). O cache é esvaziado automaticamente
+        quando a cadeia muda (ex.: `build_from_observations`, `add_edge`).
+        Args:
+            max_entries (int): Número máximo de entradas (descarte LRU).
+            max_size (Optional[int]): Limite do tamanho total guardado (nós dos caminhos
+                                      encontrados, mais um por prefixo de probabilidade).
+        Returns:
+            QueryCache: O cache criado (ver `cache_stats` para as estatísticas).
+        """
+        self._cache = QueryCache(max_entries, max_size)
+        return self._cache
 
-            origin_node.add_edge(edge)
+    def disable_cache(self):
+        """Desativa e descarta o cache de consultas."""
+        self._cache = None
 
-        print("Grafo construído com sucesso a partir das observações.")
-        self.validate_probabilities() # Valida as probabilidades após a construção
+    def cache_stats(self) -> Optional[CacheStats]:
+        """Retorna as estatísticas de acertos e falhas do cache, ou None se ele estiver desativado."""
+        return self._cache.stats if self._cache is not None else None
+
+    @classmethod
+    def from_trajectories(cls, trajectories: Iterable[List[str]], order: int = 2, compact: bool = True,
+                          separator: str = "|") -> Tuple["Graph", HigherOrderEstimator]:
+        """
+        Estima uma cadeia de ordem `order` a partir de trajetórias brutas (sequências de estados),
+        em vez de contagens (origem, destino) já agregadas. A cadeia é expandida em primeira
+        ordem sobre estados de contexto, como "a|b" (ver `HigherOrderEstimator`), então todas
+        as consultas do grafo funcionam sobre ela.
+        Args:
+            trajectories: Iterável de trajetórias, cada uma uma sequência de nomes de estados.
+            order (int): Número de estados anteriores que determinam a próxima transição.
+            compact (bool): Usa o armazenamento compacto.
+            separator (str): Separador dos estados nos nomes dos contextos.
+        Returns:
+            Tuple[Graph, HigherOrderEstimator]: O grafo expandido e o estimador, que converte
+                                                 estados em contextos e resultados de volta.
+        """
+        estimator = HigherOrderEstimator(order=order, separator=separator)
+        estimator.add_trajectories(trajectories)
+        return estimator.build(cls(compact=compact)), estimator
+
+    def set_update_policy(self, decay: Optional[float] = None, window: Optional[int] = None):
+        """
+        Configura como `update_observations` combina novos dados com os antigos.
+        Args:
+            decay (Optional[float]): Fator λ em (0, 1]. A cada lote, as contagens anteriores
+                                     passam a valer λ vezes o que valiam (decaimento exponencial).
+            window (Optional[int]): Mantém apenas os últimos `window` lotes (janela deslizante);
+                                    as contagens do lote mais antigo são descontadas.
+        """
+        if decay is not None and not 0.0 < decay <= 1.0:
+            raise ValueError("O fator de decaimento deve estar em (0, 1].")
+        if window is not None and window < 1:
+            raise ValueError("A janela deve conter pelo menos um lote.")
+        self._decay = decay
+        self._window = window
+        self._window_batches.clear()
+
+    def update_observations(self, batch: Iterable[Tuple[str, str, int]]):
+        """
+        Incorpora um novo lote de observações às contagens existentes, em O(tamanho do lote).
+        Nada é reconstruído: as arestas guardam contagens e as probabilidades são recalculadas
+        sob demanda. A forma compilada é invalidada e refeita na próxima consulta.
+
+        O decaimento exponencial é aplicado sem percorrer o grafo: em vez de multiplicar
+        todas as contagens antigas por λ, as novas são multiplicadas por 1/λ (as probabilidades
+        só dependem das razões entre contagens). Quando esse fator acumulado fica grande
+        demais, as contagens são renormalizadas uma única vez.
+
+        Args:
+            batch: Iterável de tuplas (nome_da_origem, nome_do_destino, numero_de_carros).
+        """
+        self._ensure_mutable()
+        if self._decay is not None and self._decay < 1.0:
+            self._count_scale /= self._decay
+            if self._count_scale > _MAX_COUNT_SCALE:
+                self._rescale_counts(1.0 / self._count_scale)
+
+        increments: Dict[Tuple[str, str], float] = {}
+        for origin, dest, count in batch:
+            if count < 0:
+                raise ValueError("A contagem de uma observação não pode ser negativa.")
+            origin_node = self._get_or_create_node(origin)
+            dest_node = self._get_or_create_node(dest)
+            scaled = count * self._count_scale
+            origin_node.add_count(dest_node, scaled)
+            if self._window is not None:
+                key = (origin_node.get_name(), dest_node.get_name())
+                increments[key] = increments.get(key, 0.0) + scaled
+
+        if self._window is not None:
+            self._window_batches.append(increments)
+            while len(self._window_batches) > self._window:
+                for (origin_name, dest_name), scaled in self._window_batches.popleft().items():
+                    self.nodes[origin_name].add_count(self.nodes[dest_name], -scaled)
+        self._version += 1
+
+    def get_transition_count(self, origin_name: str, dest_name: str) -> float:
+        """
+        Retorna a contagem atual (já com decaimento) de uma transição, ou 0.0 se ela não existir.
+        """
+        origin_node = self.get_node(origin_name)
+        if origin_node is None:
+            return 0.0
+        edge = origin_node.transitions.get(dest_name.lower())
+        if edge is None or edge.get_count() is None:
+            return 0.0
+        return edge.get_count() / self._count_scale
+
+    def _rescale_counts(self, factor: float):
+        """Multiplica todas as contagens guardadas por `factor` (usado pelo decaimento)."""
+        if self._store is not None:
+            self._store.rescale(factor)
+        else:
+            for node in self.nodes.values():
+                node.total_count *= factor
+                for edge in node.transitions.values():
+                    if edge.count is not None:
+                        edge.count *= factor
+        for increments in self._window_batches:
+            for key in increments:
+                increments[key] *= factor
+        self._count_scale *= factor
+
+    def save(self, path: str):
+        """
+        Grava a cadeia compilada em um arquivo binário versionado (ver `persistence`), com os
+        totais de observações por estado para que as contagens possam ser retomadas.
+        Args:
+            path (str): Caminho do arquivo.
+        """
+        chain = self.compile()
+        if isinstance(self._store, FrozenStore):
+            totals = self._store.totals
+        else:
+            totals = np.fromiter((self.nodes[name].get_total_count() for name in chain.names),
+                                 dtype=np.float64, count=chain.n_states) / self._count_scale
+        save_chain(chain, path, totals)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "Graph":
+        """
+        Abre uma cadeia gravada com `save`. Nenhum objeto por nó ou aresta é criado: o grafo
+        usa diretamente os vetores do arquivo (mapeados em memória se `mmap=True`) e `nodes`
+        devolve visões leves. Na primeira alteração (ex.: `update_observations`), a cadeia
+        é copiada para o armazenamento compacto mutável.
+        Args:
+            path (str): Caminho do arquivo.
+            mmap (bool): Mapeia o arquivo em memória em vez de lê-lo por completo.
+        Returns:
+            Graph: O grafo carregado.
+        """
+        chain, totals = load_chain(path, mmap=mmap)
+        return cls.from_compiled(chain, totals)
+
+    @classmethod
+    def from_compiled(cls, chain: CompiledChain, totals: Optional[np.ndarray] = None) -> "Graph":
+        """
+        Cria um grafo somente leitura sobre uma cadeia já compilada, sem copiar os vetores CSR
+        (ver `load`).
+        Args:
+            chain (CompiledChain): A cadeia compilada.
+            totals (Optional[np.ndarray]): Total de observações de saída de cada estado.
+        Returns:
+            Graph: O grafo.
+        """
+        graph = cls()
+        graph._store = FrozenStore(chain, totals)
+        graph.nodes = NodeMap(graph._store)
+        chain.version = graph._version
+        graph._compiled = chain
+        return graph
+
+    def _ensure_mutable(self):
+        """Converte uma cadeia carregada (somente leitura) em armazenamento compacto mutável."""
+        if isinstance(self._store, FrozenStore):
+            self._store = self._store.thaw()
+            self.nodes = NodeMap(self._store)
+            self._version += 1
+
+    def compile(self, force: bool = False) -> CompiledChain:
+        """
+        Congela a cadeia em uma matriz de transição CSR indexada por inteiros.
+        O resultado fica em cache até a próxima alteração feita pelo grafo
+        (ex.: `build_from_observations`).
+        Args:
+            force (bool): Recompila mesmo que o cache esteja atualizado. Útil quando
+                          os nós foram alterados diretamente via `Node.add_edge`; também
+                          avança a versão do grafo, invalidando o cache de consultas.
+        Returns:
+            CompiledChain: A cadeia compilada.
+        """
+        if force:
+            self._version += 1
+        if force or self._compiled is None or self._compiled.version != self._version:
+            self._compiled = CompiledChain.from_graph(self)
+        return self._compiled
 
+    @instrumentation.timed("validate")
     def validate_probabilities(self, tolerance: float = 1e-9) -> bool:
         """
         Valida se a soma das probabilidades de saída de cada nó é aproximadamente 1.0.
@@ -80,10 +348,9 @@ class Graph:
         Returns:
             bool: True se todas as somas forem válidas, False caso contrário.
         """
-        print("\n--- Validando Probabilidades ---")
         is_valid = True
         if not self.nodes:
-            print("Grafo vazio, nenhuma probabilidade para validar.")
+            logger.info("Grafo vazio, nenhuma probabilidade para validar.")
             return True
 
         for node_name in sorted(self.nodes.keys()):
@@ -94,18 +361,19 @@ class Graph:
                     total_prob += edge.get_weight()
 
                 if not math.isclose(total_prob, 1.0, rel_tol=tolerance):
-                    print(f"AVISO: A soma das probabilidades de saída do nó '{node.get_name().capitalize()}' é {total_prob:.4f}, deveria ser 1.0.")
+                    logger.warning("AVISO: A soma das probabilidades de saída do nó '%s' é %.4f, deveria ser 1.0.",
+                                   node.get_name().capitalize(), total_prob)
                     is_valid = False
             # else: # Noção terminal, não precisa somar 1.0
             #     print(f"Nó '{node.get_name().capitalize()}': Não tem transições de saída (nó terminal).")
 
         if is_valid:
-            print("Todas as probabilidades de saída dos nós são válidas (soma ~1.0).")
+            logger.info("Todas as probabilidades de saída dos nós são válidas (soma ~1.0).")
         else:
-            print("Problemas de validação encontrados. Verifique os avisos acima.")
-        print("----------------------------------")
+            logger.warning("Problemas de validação encontrados. Verifique os avisos acima.")
         return is_valid
 
+    @instrumentation.timed("query")
     def calculate_path_probability(self, path: List[str]) -> float:
         """
         Calcula a probabilidade total de seguir uma rota específica em uma cadeia de Markov.
@@ -116,30 +384,263 @@ class Graph:
             ou impossível.
         """
         if len(path) < 2:
-            print("Erro: O caminho deve conter pelo menos dois nós (origem e destino).")
+            logger.warning("Erro: O caminho deve conter pelo menos dois nós (origem e destino).")
             return 0.0
+        if self._cache is not None:
+            return self._cached_path_probability(path)
 
         total_prob = 1.0
 
         for i in range(len(path) - 1):
-            origin_name = path[i].lower()
-            dest_name = path[i+1].lower()
-
-            origin_node = self.get_node(origin_name)
-            if origin_node is None:
-                print(f"Erro: Nó de origem '{origin_name.capitalize()}' não foi encontrado no grafo.")
-                return 0.0
-
-            step_prob = origin_node.get_transition_probability(dest_name)
-
+            step_prob = self._step_probability(path[i].lower(), path[i+1].lower())
             if step_prob == 0.0:
-                print(f"Atenção: Transição de '{origin_name.capitalize()}' para '{dest_name.capitalize()}' não existe ou tem probabilidade zero. Caminho impossível.")
                 return 0.0
 
             total_prob *= step_prob
 
         return total_prob
 
+    def _step_probability(self, origin_name: str, dest_name: str) -> float:
+        """Probabilidade de um passo do caminho; avisa quando a transição não existe."""
+        origin_node = self.get_node(origin_name)
+        if origin_node is None:
+            logger.warning("Erro: Nó de origem '%s' não foi encontrado no grafo.", origin_name.capitalize())
+            return 0.0
+
+        step_prob = origin_node.get_transition_probability(dest_name)
+
+        if step_prob == 0.0:
+            logger.info("Atenção: Transição de '%s' para '%s' não existe ou tem probabilidade zero. Caminho impossível.",
+                        origin_name.capitalize(), dest_name.capitalize())
+        return step_prob
+
+    def _cached_path_probability(self, path: List[str]) -> float:
+        """
+        `calculate_path_probability` com o cache de produtos de prefixos, guardados como uma
+        trie (um nó por estado, ver `QueryCache.walk`): parte do maior prefixo já calculado e
+        guarda a probabilidade de cada prefixo novo, em O(len(path)) no total.
+        """
+        cache = self._cache
+        cache.sync(self._version)
+        key = [name.lower() for name in path]
+        # Um prefixo impossível (probabilidade 0) já responde pelo caminho inteiro.
+        known, node, total_prob = cache.walk("probability", key, absorbing=0.0)
+        if known == len(key) or total_prob == 0.0:
+            return total_prob
+        if known == 0:
+            known, total_prob = 1, 1.0
+            node = cache.extend("probability", None, key[0], total_prob)
+
+        for i in range(known - 1, len(key) - 1):
+            total_prob *= self._step_probability(key[i], key[i+1])
+            node = cache.extend("probability", node, key[i+1], total_prob)
+            if total_prob == 0.0:
+                break
+        return total_prob
+
+    @instrumentation.timed("query")
+    def calculate_path_probabilities(self, paths, lengths=None) -> PathBatchResult:
+        """
+        Versão em lote de `calculate_path_probability`, para pontuar muitos trajetos de uma vez.
+        Não imprime nada: transições inexistentes são indicadas pelas máscaras do resultado.
+
+        Args:
+            paths: Lista de caminhos (listas de nomes) ou matriz inteira (n_paths, max_len) com
+                   índices de estados da forma compilada (ver `compile().index`).
+            lengths: Comprimento de cada caminho quando `paths` é uma matriz de índices.
+        Returns:
+            PathBatchResult: Probabilidades (lineares e em log) e máscaras de validade.
+        """
+        return path_probabilities(self.compile(), paths, lengths)
+
+    @instrumentation.timed("stationary")
+    def stationary_distribution(self, method: str = "power", tol: float = 1e-10, max_iter: int = 10000,
+                                warm_start: bool = False, x0=None, laziness: float = 0.0) -> StationaryResult:
+        """
+        Calcula o estado estacionário da cadeia (π tal que π @ P = π) sobre a forma compilada.
+        Args:
+            method (str): "power", "gauss-seidel", "solve" ou "eigen"
+                          (ver `stationary.stationary_distribution`).
+            tol (float): Tolerância de convergência.
+            max_iter (int): Número máximo de iterações dos métodos iterativos.
+            warm_start (bool): Parte da última solução calculada por este grafo, se houver.
+            x0: Vetor inicial explícito (tem prioridade sobre `warm_start`).
+            laziness (float): Peso da cadeia preguiçosa, útil em cadeias periódicas.
+        Returns:
+            StationaryResult: A distribuição estacionária e os diagnósticos de convergência.
+        """
+        if x0 is None and warm_start:
+            x0 = self._last_stationary
+        result = stationary_distribution(self.compile(), method=method, tol=tol, max_iter=max_iter,
+                                         x0=x0, laziness=laziness)
+        self._last_stationary = result
+        return result
+
+    @instrumentation.timed("convergence")
+    def convergence_report(self, starts: Optional[List[str]] = None, n_steps: int = 100,
+                           epsilon: float = 0.25, n_eigenvalues: int = 2) -> ConvergenceReport:
+        """
+        Analisa a convergência ao estado estacionário: SLEM e gap espectral por iteração de
+        Arnoldi esparsa (sem `np.linalg.eig` denso) e a distância de variação total até π a cada
+        passo, partindo dos estados escolhidos (ver `convergence.convergence_report`).
+        Args:
+            starts (Optional[List[str]]): Estados de início; uma amostra uniforme se None.
+            n_steps (int): Número de passos acompanhados.
+            epsilon (float): Limiar de variação total usado para o tempo de mistura.
+            n_eigenvalues (int): Quantos autovalores de maior módulo calcular.
+        Returns:
+            ConvergenceReport: Vetores prontos para gráficos e os indicadores espectrais.
+        """
+        stationary = self.stationary_distribution(warm_start=True)
+        return convergence_report(self.compile(), starts=starts, n_steps=n_steps, epsilon=epsilon,
+                                  n_eigenvalues=n_eigenvalues, stationary=stationary)
+
+    @instrumentation.timed("query")
+    def reach_probability(self, start_node_name: str, end_node_name: str, max_steps: int) -> ReachResult:
+        """
+        Calcula a probabilidade de ir de um nó a outro em até `max_steps` transições, sem
+        enumerar caminhos: a massa de probabilidade é propagada passo a passo sobre a
+        matriz compilada, em O(max_steps * arestas) em vez de O(ramificação^max_steps).
+
+        Args:
+            start_node_name (str): Nome do nó de início.
+            end_node_name (str): Nome do nó de destino.
+            max_steps (int): Número máximo de transições (equivale a `max_depth - 1`
+                             em `find_all_paths`).
+        Returns:
+            ReachResult: A probabilidade total e a distribuição do passo de primeira chegada.
+        """
+        return reach_probability(self.compile(), start_node_name, end_node_name, max_steps)
+
+    @instrumentation.timed("query")
+    def top_k_paths(self, start_node_name: str, end_node_name: str, k: int, max_depth: Optional[int] = None,
+                    min_prob: Optional[float] = None, log_space: bool = False) -> List[Tuple[List[str], float]]:
+        """
+        Retorna apenas os K caminhos mais prováveis entre dois nós, sem construir todos eles.
+        A busca é feita em espaço logarítmico (ver `paths.top_k_paths`).
+
+        Args:
+            start_node_name (str): Nome do nó de início.
+            end_node_name (str): Nome do nó de destino.
+            k (int): Quantidade de caminhos desejada.
+            max_depth (Optional[int]): Número máximo de nós por caminho; sem limite se None.
+            min_prob (Optional[float]): Probabilidade mínima de um caminho para ser considerado.
+            log_space (bool): Retorna log(probabilidade) em vez da probabilidade.
+        Returns:
+            List[Tuple[List[str], float]]: Os caminhos, do mais provável para o menos provável.
+        """
+        return top_k_paths(self.compile(), start_node_name, end_node_name, k,
+                           max_depth=max_depth, min_prob=min_prob, log_space=log_space)
+
+    def iter_paths(self, start_node_name: str, end_node_name: str, max_depth: int = 7,
+                   min_prob: float = 0.0, limit: Optional[int] = None) -> Iterator[Tuple[List[str], float]]:
+        """
+        Versão preguiçosa de `find_all_paths`: gera os pares (caminho, probabilidade) um a um,
+        sem recursão e sem montar a lista completa, permitindo parar a qualquer momento.
+
+        Args:
+            start_node_name (str): Nome do nó de início.
+            end_node_name (str): Nome do nó de destino.
+            max_depth (int): Número máximo de nós por caminho.
+            min_prob (float): Corta ramos cuja probabilidade acumulada fique abaixo deste valor.
+            limit (Optional[int]): Número máximo de caminhos gerados.
+        Yields:
+            Tuple[List[str], float]: Pares (caminho, probabilidade).
+        """
+        return iter_paths(self.compile(), start_node_name, end_node_name, max_depth=max_depth,
+                          min_prob=min_prob, limit=limit)
+
+    def batch_query(self, pairs: Iterable[Tuple[str, str]], query: str = "reach", workers: Optional[int] = None,
+                    chunk_size: int = 64, **options) -> Iterator[Tuple[str, str, object]]:
+        """
+        Executa `reach_probability`, `iter_paths` ou `top_k_paths` para muitos pares
+        (origem, destino) em paralelo, em vez de um laço de consultas individuais.
+        Os processos trabalhadores mapeiam em memória uma cópia binária da forma compilada
+        (ver `parallel.run_batch`). Para consultar todos os pares entre dois conjuntos,
+        use `itertools.product(origens, destinos)`.
+
+        Args:
+            pairs: Pares (nome_de_origem, nome_de_destino).
+            query (str): "reach", "paths" ou "top_k".
+            workers (Optional[int]): Número de processos; o padrão é o número de CPUs.
+            chunk_size (int): Número máximo de pares por tarefa.
+            **options: Parâmetros da consulta (ex.: max_steps, max_depth, min_prob, k).
+        Yields:
+            Tuple[str, str, object]: (origem, destino, resultado), na ordem em que terminam.
+        """
+        return run_batch(self.compile(), list(pairs), query=query, workers=workers,
+                         chunk_size=chunk_size, **options)
+
+    @instrumentation.timed("simulate")
+    def simulate(self, n_walkers: int, n_steps: int, start=None, seed: Optional[int] = None,
+                 record: bool = True, out=None) -> SimulationResult:
+        """
+        Simula `n_walkers` veículos percorrendo a cadeia por `n_steps` transições, todos em paralelo
+        (ver `simulation.simulate`).
+        Args:
+            n_walkers (int): Número de caminhantes.
+            n_steps (int): Número de transições por caminhante.
+            start: Nome ou índice do estado inicial, um estado por caminhante ou uma distribuição.
+            seed (Optional[int]): Semente do gerador aleatório.
+            record (bool): Se as trajetórias devem ser guardadas.
+            out: Arquivo `.npy` para gravar as trajetórias em disco.
+        Returns:
+            SimulationResult: Trajetórias, estados finais e contagem de visitas.
+        """
+        return simulate(self.compile(), n_walkers, n_steps, start=start, seed=seed, record=record, out=out)
+
+    @instrumentation.timed("query")
+    def absorbing_analysis(self) -> AbsorbingAnalysis:
+        """
+        Análise de absorção da cadeia: estados transientes e absorventes, probabilidades de
+        absorção, número esperado de passos e de visitas (matriz fundamental N = (I - Q)^-1).
+        A fatoração LU esparsa de (I - Q) é feita uma vez e guardada na forma compilada, então
+        chamadas seguintes (e consultas por origem) reaproveitam-na até a cadeia mudar.
+        Returns:
+            AbsorbingAnalysis: Objeto que responde às consultas por origem.
+        """
+        chain = self.compile()
+        analysis = chain.cache.get("absorbing")
+        if analysis is None:
+            analysis = chain.cache["absorbing"] = AbsorbingAnalysis(chain)
+        return analysis
+
+    @instrumentation.timed("query")
+    def structure(self) -> ChainStructure:
+        """
+        Decompõe a cadeia em classes comunicantes: componentes fortemente conexas (busca
+        iterativa sobre a matriz compilada, sem limite de recursão), classes fechadas e
+        transientes e o período de cada classe. Útil para verificar se a cadeia é irredutível
+        e aperiódica antes de confiar no estado estacionário. Fica em cache na forma compilada.
+        Returns:
+            ChainStructure: A decomposição (ver `ChainStructure.subchain` para resolver cada
+                            classe fechada separadamente).
+        """
+        chain = self.compile()
+        structure = chain.cache.get("structure")
+        if structure is None:
+            structure = chain.cache["structure"] = ChainStructure(chain)
+        return structure
+
+    @instrumentation.timed("lump")
+    def lump(self, tol: float = 1e-9, keep: Iterable[str] = (), stationary_weights: bool = False) -> LumpedChain:
+        """
+        Reduz a cadeia agrupando estados que se comportam de forma idêntica (ou quase, dentro de
+        `tol`), por refinamento de partição sobre as linhas da matriz compilada (ver `lumping.lump`).
+        Use `LumpedChain.to_graph()` para consultar a cadeia reduzida e `lift_distribution` /
+        `lift_values` para levar os resultados de volta aos estados originais.
+        Args:
+            tol (float): Tolerância na comparação das probabilidades; valores maiores agrupam mais
+                         estados, com o erro limitado por `LumpedChain.error`.
+            keep (Iterable[str]): Estados que não podem ser agrupados (ex.: origens e destinos).
+            stationary_weights (bool): Pondera as linhas de cada bloco pela distribuição
+                                       estacionária, em vez da média simples.
+        Returns:
+            LumpedChain: A cadeia quociente e o mapeamento de estados.
+        """
+        weights = self.stationary_distribution(warm_start=True).distribution if stationary_weights else None
+        return lump(self.compile(), tol=tol, keep=list(keep), weights=weights)
+
     def find_all_paths(self, start_node_name: str, end_node_name: str, max_depth: int = 7) -> List[Tuple[List[str], float]]:
         """
         Encontra todos os caminhos possíveis de um nó de início para um nó de destino
@@ -156,12 +657,25 @@ class Graph:
                                             - Uma lista de strings representando o caminho (nomes dos nós).
                                             - A probabilidade acumulada desse caminho.
         """
+        if self._cache is not None:
+            self._cache.sync(self._version)
+            key = ("paths", start_node_name.lower(), end_node_name.lower(), max_depth)
+            found = self._cache.get(key)
+            if found is None:
+                found = self._search_paths(start_node_name, end_node_name, max_depth)
+                self._cache.put(key, found, size=max(1, sum(len(path) for path, _ in found)))
+            # Cópias, para que o chamador possa ordenar ou alterar o resultado à vontade.
+            return [(list(path), prob) for path, prob in found]
+        return self._search_paths(start_node_name, end_node_name, max_depth)
+
+    def _search_paths(self, start_node_name: str, end_node_name: str, max_depth: int) -> List[Tuple[List[str], float]]:
+        """Busca em profundidade de `find_all_paths`, sem o cache."""
         start_node_name_lower = start_node_name.lower()
         end_node_name_lower = end_node_name.lower()
 
         start_node = self.get_node(start_node_name_lower)
         if not start_node:
-            print(f"Erro: Nó de início '{start_node_name.capitalize()}' não encontrado no grafo.")
+            logger.warning("Erro: Nó de início '%s' não encontrado no grafo.", start_node_name.capitalize())
             return []
         
         # O nó de destino não precisa existir no grafo se for um "caminho" que termina nele
@@ -169,27 +683,35 @@ class Graph:
         # No entanto, a lógica do DFS já cobre isso ao tentar obter a próxima aresta.
 
         all_paths: List[Tuple[List[str], float]] = []
+        stats = [0, 0] # Expansões e ramos podados, publicados uma única vez ao final
         # Inicia a busca DFS. current_path_names começa com o nó inicial.
         # current_path_prob começa em 1.0 porque é a probabilidade do caminho até o nó inicial.
-        self._dfs_find_paths(
-            current_node=start_node,
-            target_node_name=end_node_name_lower,
-            current_path_names=[start_node_name_lower], # Caminho atual (lista de nomes)
-            current_path_prob=1.0,                       # Probabilidade acumulada do caminho
-            found_paths=all_paths,                       # Lista para armazenar caminhos encontrados
-            max_depth=max_depth                          # Profundidade máxima
-        )
+        try:
+            self._dfs_find_paths(
+                current_node=start_node,
+                target_node_name=end_node_name_lower,
+                current_path_names=[start_node_name_lower], # Caminho atual (lista de nomes)
+                current_path_prob=1.0,                       # Probabilidade acumulada do caminho
+                found_paths=all_paths,                       # Lista para armazenar caminhos encontrados
+                max_depth=max_depth,                         # Profundidade máxima
+                stats=stats
+            )
+        finally:
+            instrumentation.count("dfs_expansions", stats[0])
+            instrumentation.count("pruned_branches", stats[1])
         return all_paths
 
     def _dfs_find_paths(self, current_node: Node, target_node_name: str,
                        current_path_names: List[str], current_path_prob: float,
-                       found_paths: List[Tuple[List[str], float]], max_depth: int):
+                       found_paths: List[Tuple[List[str], float]], max_depth: int, stats: List[int]):
         """
         Método auxiliar recursivo para busca em profundidade (DFS) de caminhos.
+        `stats` acumula [expansões, ramos podados] sem passar pela instrumentação a cada nó.
         """
         # Se o caminho atual atingiu a profundidade máxima, pare de explorar este ramo.
         # Usa ">=" porque o `max_depth` inclui o nó de início.
         if len(current_path_names) > max_depth:
+            stats[1] += 1
             return
 
         # Se o nó atual é o nó de destino, encontramos um caminho válido.
@@ -204,6 +726,7 @@ class Graph:
             return
 
         # Explora as transições (arestas de saída) do nó atual.
+        stats[0] += 1
         for dest_node_name, edge in current_node.transitions.items():
             next_node = edge.get_to_state()
             edge_weight = edge.get_weight()
@@ -222,7 +745,8 @@ class Graph:
                 current_path_names=current_path_names + [next_node.get_name()], # Adiciona o próximo nó ao caminho
                 current_path_prob=next_path_prob,
                 found_paths=found_paths,
-                max_depth=max_depth
+                max_depth=max_depth,
+                stats=stats
             )
 
 
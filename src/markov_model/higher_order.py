@@ -0,0 +1,202 @@
+# src/markov_model/higher_order.py
+from __future__ import annotations
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+import numpy as np
+
+DEFAULT_BATCH_SIZE = 100_000 # Trajetórias processadas por passada vetorizada
+STATE_BITS = 31 # Bits por estado na chave empacotada: até 2**31 estados distintos
+STATES_PER_WORD = 2 # Estados por palavra int64 (62 bits usados, sem o bit de sinal)
+
+
+def _unique_rows(keys: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Linhas distintas de `keys` (n, n_words) e a soma exata (inteira) das contagens de cada uma."""
+    if not len(keys):
+        return keys, counts
+    order = np.lexsort(keys.T[::-1])
+    keys, counts = keys[order], counts[order]
+    first = np.ones(len(keys), dtype=bool)
+    first[1:] = (keys[1:] != keys[:-1]).any(axis=1)
+    starts = np.flatnonzero(first)
+    return keys[starts], np.add.reduceat(counts, starts)
+
+
+class HigherOrderEstimator:
+    """Estimador de cadeias de Markov de ordem k a partir de trajetórias brutas.
+
+    Cada k-grama (k estados de contexto seguidos do próximo estado) é empacotado em uma
+    linha de `n_words` inteiros de 64 bits, com 31 bits por estado (dois estados por
+    palavra: uma palavra para k = 1, duas para k = 2 ou 3), e as contagens são agregadas
+    ordenando essas linhas sobre lotes inteiros de trajetórias. A memória cresce com o
+    número de k-gramas distintos, não com o número de trajetórias.
+
+    A cadeia de ordem k é expandida em uma cadeia de primeira ordem sobre estados de contexto
+    (ex.: "a|b" para k = 2), em que o contexto (a, b) vai para (b, c) com a contagem do
+    trigrama (a, b, c). O `Graph` resultante aceita todas as consultas existentes.
+
+    Atributos:
+        order (int): Ordem k da cadeia.
+        separator (str): Separador dos estados no nome de um contexto.
+        states (List[str]): Estados originais (em minúsculas), na ordem de seus identificadores.
+        n_words (int): Palavras int64 por k-grama empacotado.
+        n_trajectories (int): Número de trajetórias processadas.
+    """
+    def __init__(self, order: int = 2, separator: str = "|"):
+        if order < 1:
+            raise ValueError("A ordem da cadeia deve ser pelo menos 1.")
+        if not separator:
+            raise ValueError("O separador não pode ser vazio.")
+        self.order = order
+        self.separator = separator
+        self.n_words = -(-(order + 1) // STATES_PER_WORD)
+        self.states: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.n_trajectories = 0
+        self._keys = np.zeros((0, self.n_words), dtype=np.int64)
+        self._counts = np.zeros(0, dtype=np.int64)
+
+    @property
+    def max_states(self) -> int:
+        """Número máximo de estados distintos representáveis."""
+        return 1 << STATE_BITS
+
+    @property
+    def n_kgrams(self) -> int:
+        """Número de k-gramas (transições da cadeia expandida) distintos observados."""
+        return len(self._keys)
+
+    def _encode(self, names: np.ndarray) -> np.ndarray:
+        """Converte nomes em identificadores, registrando os novos; só os nomes distintos passam pelo Python."""
+        uniques, inverse = np.unique(names, return_inverse=True)
+        ids = np.empty(len(uniques), dtype=np.int64)
+        for i, name in enumerate(uniques.tolist()):
+            name = str(name).lower()
+            state = self.index.get(name)
+            if state is None:
+                if self.separator in name:
+                    raise ValueError(f"O estado '{name}' contém o separador '{self.separator}'.")
+                if len(self.states) >= self.max_states:
+                    raise ValueError(f"Mais de {self.max_states} estados distintos não cabem na chave empacotada.")
+                state = self.index[name] = len(self.states)
+                self.states.append(name)
+            ids[i] = state
+        return ids[inverse.ravel()]
+
+    def add_arrays(self, states: np.ndarray, lengths: np.ndarray):
+        """
+        Conta os k-gramas de um lote de trajetórias concatenadas, em uma única passada vetorizada.
+        Args:
+            states (np.ndarray): Estados de todas as trajetórias, uma após a outra (nomes, ou
+                                 inteiros já indexados em `states` quando o dtype é inteiro).
+            lengths (np.ndarray): Comprimento de cada trajetória.
+        """
+        lengths = np.asarray(lengths, dtype=np.int64)
+        states = np.asarray(states)
+        if len(states) != int(lengths.sum()):
+            raise ValueError("A soma de lengths deve ser igual ao número de estados.")
+        codes = states.astype(np.int64) if states.dtype.kind in "iu" else self._encode(states)
+        if len(codes) and (codes.min() < 0 or codes.max() >= len(self.states)):
+            raise ValueError("Identificador de estado fora do intervalo registrado.")
+        self.n_trajectories += len(lengths)
+
+        k = self.order
+        # Posição de cada estado dentro da sua trajetória: só há k-grama a partir da posição k.
+        starts = np.cumsum(lengths) - lengths
+        position = np.arange(len(codes)) - np.repeat(starts, lengths)
+        ends = np.flatnonzero(position >= k)
+        if not len(ends):
+            return
+        keys = np.zeros((len(ends), self.n_words), dtype=np.int64)
+        for position in range(k + 1):
+            word, shift = self._slot(position)
+            keys[:, word] |= codes[ends - k + position] << shift
+        self._merge(*_unique_rows(keys, np.ones(len(ends), dtype=np.int64)))
+
+    @staticmethod
+    def _slot(position: int) -> Tuple[int, int]:
+        """Palavra e deslocamento em bits do estado na posição `position` do k-grama."""
+        return position // STATES_PER_WORD, STATE_BITS * (position % STATES_PER_WORD)
+
+    def _merge(self, keys: np.ndarray, counts: np.ndarray):
+        """Soma contagens (chaves já únicas) às acumuladas."""
+        self._keys, self._counts = _unique_rows(np.concatenate([self._keys, keys]),
+                                                np.concatenate([self._counts, counts]))
+
+    def add_trajectories(self, trajectories: Iterable[Sequence[str]], batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Conta os k-gramas de um fluxo de trajetórias (sequências de nomes de estados), processando
+        `batch_size` trajetórias por vez. Trajetórias com até k estados não geram transições.
+        """
+        batch: List[Sequence[str]] = []
+        for trajectory in trajectories:
+            batch.append(trajectory)
+            if len(batch) >= batch_size:
+                self._add_batch(batch)
+                batch = []
+        if batch:
+            self._add_batch(batch)
+
+    def _add_batch(self, batch: List[Sequence[str]]):
+        lengths = np.fromiter((len(trajectory) for trajectory in batch), dtype=np.int64, count=len(batch))
+        flat = np.array([name for trajectory in batch for name in trajectory], dtype=str)
+        self.add_arrays(flat, lengths)
+
+    def kgrams(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Decodifica os k-gramas acumulados.
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Matriz (n_kgrams, k + 1) de identificadores de estados
+                                           (contexto seguido do próximo estado) e as contagens.
+        """
+        mask = (1 << STATE_BITS) - 1
+        grams = np.empty((len(self._keys), self.order + 1), dtype=np.int64)
+        for position in range(self.order + 1):
+            word, shift = self._slot(position)
+            grams[:, position] = (self._keys[:, word] >> shift) & mask
+        return grams, self._counts.copy()
+
+    def context_name(self, states: Sequence[str]) -> str:
+        """Nome do estado de contexto da cadeia expandida para os últimos k estados de `states`."""
+        if len(states) < self.order:
+            raise ValueError(f"Um contexto precisa de {self.order} estados.")
+        return self.separator.join(name.lower() for name in states[len(states) - self.order:])
+
+    def observations(self) -> Iterator[Tuple[str, str, int]]:
+        """Gera as transições da cadeia expandida como (contexto, próximo contexto, contagem)."""
+        grams, counts = self.kgrams()
+        names = np.array(self.states, dtype=object)
+        # Os nomes dos contextos são montados uma única vez por contexto distinto.
+        contexts, inverse = np.unique(np.concatenate([grams[:, :-1], grams[:, 1:]]), axis=0, return_inverse=True)
+        labels = [self.separator.join(row) for row in names[contexts].tolist()]
+        inverse = inverse.ravel()
+        n = len(grams)
+        for origin, dest, count in zip(inverse[:n].tolist(), inverse[n:].tolist(), counts.tolist()):
+            yield labels[origin], labels[dest], count
+
+    def build(self, graph=None, compact: bool = True):
+        """
+        Constrói (ou completa) um `Graph` de primeira ordem sobre os estados de contexto.
+        Args:
+            graph (Optional[Graph]): Grafo a ser preenchido; um novo é criado se None.
+            compact (bool): Usa o armazenamento compacto ao criar o grafo.
+        Returns:
+            Graph: O grafo da cadeia expandida.
+        """
+        from .graph import Graph # Importação tardia: graph.py também importa este módulo
+        graph = graph if graph is not None else Graph(compact=compact)
+        graph.build_from_observations(self.observations())
+        return graph
+
+    def marginal(self, distribution: Dict[str, float]) -> Dict[str, float]:
+        """
+        Converte uma distribuição sobre contextos (ex.: `StationaryResult.as_dict()`) em uma
+        distribuição sobre os estados originais, somando a massa pelo estado mais recente.
+        """
+        totals: Dict[str, float] = {}
+        for context, prob in distribution.items():
+            state = context.rsplit(self.separator, 1)[-1]
+            totals[state] = totals.get(state, 0.0) + prob
+        return totals
+
+    def __repr__(self) -> str:
+        return (f"HigherOrderEstimator(order={self.order}, states={len(self.states)}, "
+                f"kgrams={self.n_kgrams}, trajectories={self.n_trajectories})")
@@ -0,0 +1,215 @@
+# src/markov_model/instrumentation.py
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+import functools
+import logging
+import time
+
+LOGGER_NAME = "markov_model"
+
+# Por padrão o pacote é silencioso: as mensagens vão para o `logging` e só aparecem
+# se a aplicação configurar um handler (ver `enable_logging`).
+logger = logging.getLogger(LOGGER_NAME)
+logger.addHandler(logging.NullHandler())
+
+TimingHook = Callable[[str, float], None]
+
+
+class TimingStats:
+    """Estatísticas acumuladas de uma operação cronometrada.
+    Atributos:
+        calls (int): Número de chamadas.
+        total (float): Tempo total em segundos.
+        max (float): Maior duração de uma chamada, em segundos.
+    """
+    __slots__ = ("calls", "total", "max")
+
+    def __init__(self, calls: int = 0, total: float = 0.0, max: float = 0.0):
+        self.calls = calls
+        self.total = total
+        self.max = max
+
+    def __repr__(self) -> str:
+        return f"TimingStats(calls={self.calls}, total={self.total:.6f}s, max={self.max:.6f}s)"
+
+
+class ProfileReport:
+    """Relatório de um trecho perfilado com `Instrumentation.profile()`.
+    Atributos:
+        counters (Dict[str, int]): Quanto cada contador cresceu durante o trecho.
+        timings (Dict[str, TimingStats]): Operações cronometradas durante o trecho.
+        elapsed (float): Duração total do trecho, em segundos.
+    """
+    def __init__(self):
+        self.counters: Dict[str, int] = {}
+        self.timings: Dict[str, TimingStats] = {}
+        self.elapsed: float = 0.0
+
+    def as_dict(self) -> Dict[str, object]:
+        """Retorna o relatório como dicionário (útil para exportar em JSON)."""
+        return {
+            "elapsed": self.elapsed,
+            "counters": dict(self.counters),
+            "timings": {name: {"calls": stats.calls, "total": stats.total, "max": stats.max}
+                        for name, stats in self.timings.items()},
+        }
+
+    def __str__(self) -> str:
+        lines = [f"Perfil ({self.elapsed:.6f}s)"]
+        for name in sorted(self.timings):
+            stats = self.timings[name]
+            lines.append(f"  {name}: {stats.calls} chamada(s), {stats.total:.6f}s (máx {stats.max:.6f}s)")
+        for name in sorted(self.counters):
+            lines.append(f"  {name}: {self.counters[name]}")
+        return "\n".join(lines)
+
+
+class _Timer:
+    """Cronômetro devolvido por `Instrumentation.timed`: serve como bloco `with` e como decorador."""
+    __slots__ = ("_owner", "_name", "_started")
+
+    def __init__(self, owner: Instrumentation, name: str):
+        self._owner = owner
+        self._name = name
+        self._started: Optional[float] = None
+
+    def __enter__(self) -> None:
+        self._started = time.perf_counter() if self._owner.active else None
+
+    def __exit__(self, *exc_info) -> bool:
+        if self._started is not None:
+            self._owner.record(self._name, time.perf_counter() - self._started)
+        return False
+
+    def __call__(self, func: Callable) -> Callable:
+        owner, name = self._owner, self._name
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not owner.active: # Caminho rápido: instrumentação desligada
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                owner.record(name, time.perf_counter() - started)
+        return wrapper
+
+
+class Instrumentation:
+    """Camada de instrumentação dos caminhos críticos do modelo.
+
+    Mantém contadores (nós e arestas criados, expansões de busca, ramos podados) e
+    estatísticas de tempo das operações principais (construção, validação e consultas).
+    Desligada por padrão: sem coleta, contadores e cronômetros custam uma única verificação
+    de atributo. A coleta é ligada com `enabled = True`, enquanto houver um hook de tempo
+    registrado ou dentro de um bloco `profile()`. Hooks de tempo permitem enviar as
+    medições para sistemas externos, e `profile()` coleta um relatório por trecho de código.
+
+    Atributos:
+        active (bool): Se a coleta está ligada agora (somente leitura; ver `enabled`).
+    """
+    def __init__(self, enabled: bool = False):
+        self.counters: Dict[str, int] = {}
+        self.timings: Dict[str, TimingStats] = {}
+        self._hooks: List[TimingHook] = []
+        self._profiles: List[ProfileReport] = []
+        self._enabled = enabled
+        self.active = enabled
+
+    @property
+    def enabled(self) -> bool:
+        """Liga a coleta permanente de contadores e tempos em `counters` e `timings`."""
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value: bool):
+        self._enabled = bool(value)
+        self._refresh()
+
+    def _refresh(self):
+        self.active = self._enabled or bool(self._hooks) or bool(self._profiles)
+
+    def count(self, name: str, amount: int = 1):
+        """Incrementa o contador `name`."""
+        if not self.active:
+            return
+        self.counters[name] = self.counters.get(name, 0) + amount
+        for report in self._profiles:
+            report.counters[name] = report.counters.get(name, 0) + amount
+
+    def add_hook(self, hook: TimingHook):
+        """Registra uma função chamada como hook(nome_da_operacao, segundos) a cada medição."""
+        self._hooks.append(hook)
+        self._refresh()
+
+    def remove_hook(self, hook: TimingHook):
+        """Remove um hook registrado com `add_hook`."""
+        self._hooks.remove(hook)
+        self._refresh()
+
+    def record(self, name: str, seconds: float):
+        """Registra a duração de uma chamada da operação `name`."""
+        if not self.active:
+            return
+        targets = [self.timings] + [report.timings for report in self._profiles]
+        for timings in targets:
+            stats = timings.get(name)
+            if stats is None:
+                stats = timings[name] = TimingStats()
+            stats.calls += 1
+            stats.total += seconds
+            if seconds > stats.max:
+                stats.max = seconds
+        for hook in self._hooks:
+            hook(name, seconds)
+
+    def timed(self, name: str) -> _Timer:
+        """Cronometra um bloco (também pode ser usado como decorador: `@instrumentation.timed("build")`)."""
+        return _Timer(self, name)
+
+    @contextmanager
+    def profile(self) -> Iterator[ProfileReport]:
+        """
+        Coleta os contadores e tempos gerados dentro do bloco em um `ProfileReport`.
+        Exemplo:
+            with instrumentation.profile() as report:
+                graph.build_from_observations(observations)
+            print(report)
+        """
+        report = ProfileReport()
+        self._profiles.append(report)
+        self._refresh()
+        started = time.perf_counter()
+        try:
+            yield report
+        finally:
+            report.elapsed = time.perf_counter() - started
+            self._profiles.remove(report)
+            self._refresh()
+
+    def reset(self):
+        """Zera os contadores e as estatísticas de tempo acumulados."""
+        self.counters.clear()
+        self.timings.clear()
+
+
+# Instância compartilhada por todos os módulos do pacote.
+instrumentation = Instrumentation()
+
+
+def enable_logging(level: int = logging.INFO, handler: Optional[logging.Handler] = None) -> logging.Handler:
+    """
+    Ativa a saída das mensagens do pacote (avisos de validação, erros de consulta etc.).
+    Args:
+        level (int): Nível mínimo das mensagens (ex.: logging.INFO, logging.DEBUG).
+        handler (Optional[logging.Handler]): Destino das mensagens; stderr se None.
+    Returns:
+        logging.Handler: O handler instalado, para remoção posterior se desejado.
+    """
+    handler = handler if handler is not None else logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    return handler
@@ -0,0 +1,312 @@
+# src/markov_model/lumping.py
+from __future__ import annotations
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+import scipy.sparse as sp
+from .compiled import CompiledChain
+from .instrumentation import instrumentation
+
+_HASH_SEED = 0x5EED # Semente fixa: a mesma cadeia sempre gera a mesma partição
+_MAX_GAP_SPLITS = 64 # Rodadas de divisão pela maior lacuna antes de recorrer às janelas
+
+
+def _first_above(values: np.ndarray, lo: np.ndarray, hi: np.ndarray, limits: np.ndarray) -> np.ndarray:
+    """Primeira posição em [lo, hi) com valor maior que `limits`, em trechos ordenados (busca binária vetorizada)."""
+    lo, hi = lo.copy(), hi.copy()
+    while True:
+        open_ = lo < hi
+        if not open_.any():
+            return lo
+        mid = (lo + hi) // 2
+        above = values[np.minimum(mid, len(values) - 1)] > limits
+        hi = np.where(open_ & above, mid, hi)
+        lo = np.where(open_ & ~above, mid + 1, lo)
+
+
+def _wide(values: np.ndarray, with_zeros: np.ndarray, lo: np.ndarray, hi: np.ndarray,
+          tol: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Os trechos ordenados [lo, hi) que ocupam mais que `tol` (a partir de 0 quando começam com zeros)."""
+    # Mesma expressão dos limites das janelas em `_tolerance_hashes`, para comparações de float coerentes.
+    wide = values[hi - 1] > np.where(with_zeros[lo], 0.0, values[lo]) + tol
+    return lo[wide], hi[wide]
+
+
+def _tolerance_hashes(matrix: sp.csr_matrix, labels: np.ndarray, tol: float, weights: np.ndarray) -> np.ndarray:
+    """
+    Resume cada linha de `matrix` em um inteiro de 64 bits para dividir os blocos de `labels`
+    por tolerância. Em cada bloco A e coluna B, os valores dos membros (zeros implícitos
+    incluídos) são ordenados e cortados nas lacunas maiores que `tol`; trechos que ainda
+    ocupam mais que `tol` são divididos na sua maior lacuna interna, repetidamente, até
+    caberem em `tol`. Assim, dois membros no mesmo grupo diferem em no máximo `tol` (sem o
+    encadeamento de um corte só por lacunas) e valores quase iguais não são separados por
+    uma fronteira arbitrária, como a de uma grade ou de uma janela ancorada no menor valor.
+    O resumo de uma linha combina, com pesos aleatórios por coluna, os índices dos grupos em
+    que ela caiu; linhas do mesmo bloco nos mesmos grupos em todas as colunas têm o mesmo
+    resumo, e linhas em grupos diferentes colidem com probabilidade desprezível (~2^-64).
+    """
+    n = matrix.shape[0]
+    hashes = np.zeros(n, dtype=np.int64)
+    if not matrix.nnz:
+        return hashes
+    rows = np.repeat(np.arange(n), np.diff(matrix.indptr))
+    cols = matrix.indices.astype(np.int64)
+    values = matrix.data
+    blocks = labels[rows]
+    order = np.lexsort((values, cols, blocks))
+    rows, cols, values, blocks = rows[order], cols[order], values[order], blocks[order]
+
+    first = np.ones(len(values), dtype=bool)
+    first[1:] = (blocks[1:] != blocks[:-1]) | (cols[1:] != cols[:-1])
+    starts = np.flatnonzero(first)
+    group_sizes = np.diff(np.append(starts, len(values)))
+    # Membros do bloco sem entrada na coluna valem 0: o grupo 0 fica reservado para eles e
+    # recebe os valores até `tol`.
+    has_zeros = group_sizes < np.bincount(labels)[blocks[starts]]
+    with_zeros = np.zeros(len(values), dtype=bool)
+    with_zeros[starts[has_zeros & (values[starts] <= tol)]] = True
+
+    # Lacunas maiores que `tol` sempre separam. `gaps[p]` é a lacuna que um corte na posição p
+    # abriria (-1 se p já inicia um trecho); no início de uma coluna com zeros, é a lacuna até 0.
+    cuts = first.copy()
+    cuts[1:] |= np.diff(values) > tol
+    gaps = np.empty(len(values))
+    gaps[1:] = np.diff(values)
+    gaps[cuts] = np.where(with_zeros[cuts], values[cuts], -1.0)
+    segments = np.flatnonzero(cuts)
+    ends = np.append(segments[1:], len(values))
+    lo, hi = _wide(values, with_zeros, segments, ends, tol)
+
+    # Trechos mais largos que `tol` são divididos na maior lacuna interna (a mais central,
+    # em caso de empate), todos juntos a cada rodada.
+    for _ in range(_MAX_GAP_SPLITS):
+        if not len(lo):
+            break
+        lengths = hi - lo
+        owner = np.repeat(np.arange(len(lo)), lengths)
+        positions = np.arange(int(lengths.sum())) - np.repeat(np.cumsum(lengths) - lengths, lengths) + lo[owner]
+        centrality = np.abs(2 * positions - (lo + hi)[owner])
+        order = np.lexsort((centrality, -gaps[positions], owner))
+        cut = positions[order[np.cumsum(lengths) - lengths]]
+        gaps[cut] = -1.0
+        # Um corte no início separa os membros com entrada na coluna dos zeros implícitos.
+        at_zero = cut == lo
+        with_zeros[cut[at_zero]] = False
+        cuts[cut[~at_zero]] = True
+        inner = ~at_zero
+        lo, hi = _wide(values, with_zeros, np.concatenate([lo[inner], cut[inner], lo[at_zero]]),
+                       np.concatenate([cut[inner], hi[inner], hi[at_zero]]), tol)
+
+    # Espaçamentos adversariais (ex.: lacunas em progressão geométrica) esgotam as rodadas acima;
+    # os trechos restantes são divididos em janelas de largura `tol` a partir do menor valor.
+    limits = np.where(with_zeros[lo], 0.0, values[lo]) + tol
+    while len(lo):
+        cut = _first_above(values, lo, hi, limits)
+        cuts[cut] = True
+        limits = values[cut] + tol
+        wide = values[hi - 1] > limits
+        lo, hi, limits = cut[wide], hi[wide], limits[wide]
+
+    groups = np.cumsum(cuts)
+    groups -= np.repeat(groups[starts] - (has_zeros & ~with_zeros[starts]), group_sizes)
+
+    terms = groups * weights[cols] # Transbordamento intencional (aritmética mod 2^64)
+    order = np.argsort(rows, kind="stable")
+    rows, terms = rows[order], terms[order]
+    row_starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+    hashes[rows[row_starts]] = np.add.reduceat(terms, row_starts)
+    return hashes
+
+
+def _profile_matrix(chain: CompiledChain) -> sp.csr_matrix:
+    """
+    O perfil de saída de cada estado (o multiconjunto das suas probabilidades de transição,
+    independente dos destinos): a linha s tem as probabilidades de s em ordem decrescente,
+    nas colunas 0..grau-1. Estados com o mesmo perfil, como cruzamentos com as mesmas
+    proporções de conversão, têm linhas iguais.
+    """
+    order = np.lexsort((-chain.data, chain.rows))
+    positions = np.arange(chain.n_edges) - np.repeat(chain.indptr[:-1], chain.out_degree())
+    width = int(chain.out_degree().max(initial=0))
+    return sp.csr_matrix((chain.data[order], positions, chain.indptr), shape=(chain.n_states, max(width, 1)))
+
+
+def _refine(matrix: sp.csr_matrix, labels: np.ndarray, tol: float, rng: np.random.Generator) -> np.ndarray:
+    """Uma rodada de divisão dos blocos de `labels` pelas linhas de `matrix` (ver `_tolerance_hashes`)."""
+    weights = rng.integers(1, np.iinfo(np.int64).max, matrix.shape[1], dtype=np.int64)
+    return _relabel(labels, _tolerance_hashes(matrix, labels, tol, weights))
+
+
+def _relabel(*keys: np.ndarray) -> np.ndarray:
+    """Rótulos consecutivos para as combinações distintas das chaves, na ordem de primeira ocorrência."""
+    stacked = np.column_stack(keys)
+    _, first, inverse = np.unique(stacked, axis=0, return_index=True, return_inverse=True)
+    order = np.argsort(first, kind="stable")
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    return rank[inverse.ravel()]
+
+
+class LumpedChain:
+    """Cadeia quociente obtida ao agrupar estados equivalentes (lumping).
+
+    Uma partição é (fortemente) agrupável quando todos os estados de um bloco têm a mesma
+    probabilidade de ir para cada bloco; então o processo agregado também é uma cadeia de
+    Markov, com P̂[A, B] = P(s, B) para qualquer s em A. Com tolerância, quaisquer dois
+    membros de um bloco têm P(s, B) a menos de `tol` um do outro, para todo bloco B. A
+    linha do quociente é a média (ponderada por `weights`) das linhas dos membros.
+
+    Limite de erro: seja δ = `error`, o maior desvio L1 entre a linha agregada de um estado e
+    a linha do seu bloco no quociente. Como matrizes estocásticas não aumentam a norma L1,
+    partindo da mesma distribuição agregada, a distribuição agregada da cadeia original e a
+    do quociente diferem em no máximo t·δ (norma L1) após t passos. Para o estado
+    estacionário de uma cadeia ergódica, o erro é da ordem de δ vezes o tempo de relaxação
+    do quociente (ver `convergence_report`). Com δ = 0 o agrupamento é exato.
+
+    Atributos:
+        chain (CompiledChain): A cadeia quociente; cada bloco leva o nome do seu primeiro membro.
+        labels (np.ndarray): Bloco de cada estado da cadeia original.
+        original (CompiledChain): A cadeia original.
+        tol (float): Maior diferença entre as probabilidades por bloco de dois membros de um bloco.
+        error (float): δ, o desvio L1 máximo descrito acima (0 para agrupamento exato).
+        iterations (int): Número de rodadas de refinamento.
+    """
+    def __init__(self, original: CompiledChain, labels: np.ndarray, tol: float, iterations: int,
+                 weights: Optional[np.ndarray] = None):
+        self.original = original
+        self.labels = labels
+        self.tol = tol
+        self.iterations = iterations
+        n, n_blocks = original.n_states, int(labels.max()) + 1 if len(labels) else 0
+        self.sizes = np.bincount(labels, minlength=n_blocks)
+        weights = np.ones(n) if weights is None else np.asarray(weights, dtype=np.float64)
+        if weights.shape != (n,) or np.any(weights < 0):
+            raise ValueError("Os pesos devem ser um vetor não negativo com um valor por estado.")
+        block_weight = np.bincount(labels, weights=weights, minlength=n_blocks)
+        # Blocos de peso nulo usam a média simples dos membros.
+        weights = np.where(block_weight[labels] > 0, weights, 1.0)
+        block_weight = np.bincount(labels, weights=weights, minlength=n_blocks)
+        self.weights = weights / block_weight[labels]
+
+        indicator = sp.csr_matrix((np.ones(n), (np.arange(n), labels)), shape=(n, n_blocks))
+        aggregated = (original.to_scipy() @ indicator).tocsr() # P(s, B) para cada estado e bloco
+        quotient = (sp.csr_matrix((self.weights, (labels, np.arange(n))), shape=(n_blocks, n)) @ aggregated).tocsr()
+        quotient.sum_duplicates()
+        quotient.sort_indices()
+        deviation = aggregated - quotient[labels]
+        self.error = float(np.abs(deviation).sum(axis=1).max()) if n else 0.0
+
+        first = np.full(n_blocks, n, dtype=np.int64)
+        np.minimum.at(first, labels, np.arange(n))
+        names = [original.names[i] for i in first]
+        self.chain = CompiledChain(names, quotient.indptr.astype(np.int64), quotient.indices, quotient.data,
+                                   version=original.version)
+
+    @property
+    def n_blocks(self) -> int:
+        """Número de blocos (estados da cadeia quociente)."""
+        return self.chain.n_states
+
+    @property
+    def reduction(self) -> float:
+        """Razão entre o número de estados original e o do quociente."""
+        return self.original.n_states / self.n_blocks if self.n_blocks else 1.0
+
+    def members(self, block: int) -> List[str]:
+        """Nomes dos estados originais do bloco `block`."""
+        return [self.original.names[i] for i in np.flatnonzero(self.labels == block)]
+
+    def block_of(self, name: str) -> str:
+        """Nome, na cadeia quociente, do bloco que contém o estado original `name`."""
+        return self.chain.names[self.labels[self.original.index_of(name)]]
+
+    def aggregate(self, distribution: np.ndarray) -> np.ndarray:
+        """Soma uma distribuição sobre os estados originais por bloco."""
+        return np.bincount(self.labels, weights=np.asarray(distribution, dtype=np.float64), minlength=self.n_blocks)
+
+    def lift_distribution(self, distribution: np.ndarray) -> np.ndarray:
+        """Reparte a massa de cada bloco entre seus membros, na proporção dos pesos do agrupamento."""
+        return np.asarray(distribution)[self.labels] * self.weights
+
+    def lift_values(self, values: np.ndarray) -> np.ndarray:
+        """Atribui a cada estado original o valor do seu bloco (ex.: passos esperados até a absorção)."""
+        return np.asarray(values)[self.labels]
+
+    def to_graph(self):
+        """Um `Graph` somente leitura sobre a cadeia quociente, com todas as consultas disponíveis."""
+        from .graph import Graph # Importação tardia: graph.py também importa este módulo
+        return Graph.from_compiled(self.chain)
+
+    def __repr__(self) -> str:
+        return (f"LumpedChain(states={self.original.n_states} -> blocks={self.n_blocks}, "
+                f"error={self.error:.2e}, iterations={self.iterations})")
+
+
+def lump(chain: CompiledChain, tol: float = 1e-9, keep: Sequence[str] = (), initial: Optional[np.ndarray] = None,
+         weights: Optional[np.ndarray] = None, max_iter: int = 1000) -> LumpedChain:
+    """
+    Encontra a partição agrupável mais grossa que refina a partição inicial, por refinamento
+    sucessivo: a cada rodada, calcula-se a probabilidade de cada estado ir para cada bloco
+    atual (um produto esparso P @ E) e, em cada bloco e coluna, os membros são ordenados por
+    esse valor e divididos nas maiores lacunas até cada grupo caber em `tol` (tudo
+    vetorizado, ver `_tolerance_hashes`), até a partição se estabilizar.
+
+    A partição com um único bloco é sempre agrupável, então o ponto de partida define o que
+    se quer distinguir. Sem `initial`, os estados começam agrupados pelo perfil de saída (o
+    multiconjunto das suas probabilidades de transição): só estados com o mesmo comportamento
+    local podem acabar no mesmo bloco.
+
+    Args:
+        chain (CompiledChain): A cadeia compilada.
+        tol (float): Maior diferença entre as probabilidades por bloco de dois membros de um
+                     mesmo bloco; um valor pequeno (padrão) só absorve erros de arredondamento
+                     (agrupamento exato). O erro resultante é medido em `LumpedChain.error`.
+        keep (Sequence[str]): Estados que devem permanecer sozinhos no seu bloco (ex.: origens e
+                              destinos de consultas de caminhos).
+        initial (Optional[np.ndarray]): Rótulos de uma partição inicial (ex.: uma grandeza
+                                        observada por estado); estados com rótulos diferentes
+                                        nunca são agrupados. Substitui o perfil de saída.
+        weights (Optional[np.ndarray]): Pesos dos estados na média que define as linhas do
+                                        quociente (ex.: a distribuição estacionária).
+        max_iter (int): Número máximo de rodadas de refinamento.
+    Returns:
+        LumpedChain: A cadeia quociente, o mapeamento de estados e o limite de erro.
+    """
+    if tol <= 0:
+        raise ValueError("A tolerância deve ser positiva.")
+    n = chain.n_states
+    if initial is not None and np.shape(initial) != (n,):
+        raise ValueError(f"A partição inicial deve ter {n} rótulos.")
+    # Estados terminais nunca se agrupam com estados que têm saída.
+    separate = chain.terminal_states().astype(np.int64)
+    if len(keep):
+        singles = np.zeros(n, dtype=np.int64)
+        singles[chain.indices_of(keep)] = np.arange(1, len(keep) + 1)
+        separate = separate * (len(keep) + 1) + singles
+    if not n:
+        return LumpedChain(chain, separate, tol, 0, weights)
+
+    rng = np.random.default_rng(_HASH_SEED)
+    if initial is not None:
+        labels = _relabel(np.asarray(initial, dtype=np.int64), separate)
+    else:
+        # Perfis de saída próximos (a menos de `tol`, pelo mesmo critério) formam a partição inicial.
+        labels = _relabel(separate)
+        profiles = _profile_matrix(chain)
+        while True:
+            refined = _refine(profiles, labels, tol, rng)
+            if refined.max() == labels.max():
+                break
+            labels = refined
+
+    matrix = chain.to_scipy()
+    iterations = 0
+    while iterations < max_iter:
+        iterations += 1
+        n_blocks = int(labels.max()) + 1
+        indicator = sp.csr_matrix((np.ones(n), (np.arange(n), labels)), shape=(n, n_blocks))
+        refined = _refine((matrix @ indicator).tocsr(), labels, tol, rng)
+        if int(refined.max()) + 1 == n_blocks:
+            break
+        labels = refined
+    instrumentation.count("lumping_rounds", iterations)
+    return LumpedChain(chain, labels, tol, iterations, weights)
@@ -1,6 +1,11 @@
 # src/markov_model/node.py
 from __future__ import annotations
 from typing import List, Optional, Dict
+import sys
+from .edge import Edge
+from .instrumentation import instrumentation, logger
+
+_COUNT_EPSILON = 1e-9 # Contagens menores que isso (relativas ao desconto) são tratadas como zero
 
 class Node:
     """Classe que representa um nó em um grafo.
@@ -9,7 +14,10 @@ class Node:
         name (str): Nome/identificador único do nó.
         transitions (Dict[str, Edge]): Dicionário que mapeia nomes de nós
                                         para suas transições.
+        total_count (float): Soma das contagens das transições de saída baseadas em contagens.
     """
+    __slots__ = ("name", "transitions", "total_count")
+
     def __init__(self, name: str):
         """Inicializa um nó com um nome único."""
         if not name:
@@ -17,12 +25,13 @@ class Node:
         if not isinstance(name, str):
             raise TypeError("O nome do nó deve ser uma string.")
         
-        name = name.lower()#padronizacao
+        name = sys.intern(name.lower())#padronizacao; nomes internados são compartilhados pelas chaves
 
         self.name: str = name
         self.transitions: Dict[str, Edge] = {}
-        #debug
-        print(f"Instância de Node '{name}' criada.")
+        self.total_count: float = 0
+        instrumentation.count("nodes_created")
+        logger.debug("Instância de Node '%s' criada.", name)
 
     def add_edge(self, edge: Edge) -> None:
         """Adiciona uma transição ao nó.
@@ -31,14 +40,54 @@ class Node:
         """
         if edge is None:
             raise ValueError("A transição não pode ser nula.")
-        if edge.get_to_state().get_name() in self.transitions:
-            print(f"Transição de '{self.name}' para '{edge.get_to_state().get_name()}' já existe.")
+        existing = self.transitions.get(edge.get_to_state().get_name())
+        if existing is not None:
+            # Duas observações da mesma transição: as contagens são somadas.
+            if existing.get_count() is not None and edge.get_count() is not None:
+                self.add_count(existing.get_to_state(), edge.get_count())
+                return
+            logger.warning("Transição de '%s' para '%s' já existe.", self.name, edge.get_to_state().get_name())
             return
         
         self.transitions[edge.get_to_state().get_name()] = edge
-        #debug
-        print(f"Transição de '{self.name}' para '{edge.get_to_state().get_name()}' adicionada.")
+        if edge.get_count() is not None:
+            self.total_count += edge.get_count()
+        instrumentation.count("edges_created")
+        logger.debug("Transição de '%s' para '%s' adicionada.", self.name, edge.get_to_state().get_name())
+
+
+    def add_count(self, to_state: Node, count: float) -> Optional[Edge]:
+        """Soma `count` observações à transição para `to_state`, criando-a se necessário.
+        Contagens negativas descontam observações; a transição é removida quando sua
+        contagem chega a zero.
+        Args:
+            to_state (Node): O nó de destino.
+            count (float): Número de observações a somar (ou descontar, se negativo).
+        Returns:
+            Optional[Edge]: A transição atualizada, ou None se ela foi removida.
+        """
+        edge = self.transitions.get(to_state.get_name())
+        if edge is None:
+            if count <= 0:
+                return None
+            edge = Edge(from_state=self, to_state=to_state, count=count)
+            self.transitions[to_state.get_name()] = edge
+            instrumentation.count("edges_created")
+        elif edge.get_count() is None:
+            raise ValueError(f"A transição de '{self.name}' para '{to_state.get_name()}' tem peso fixo, sem contagens.")
+        else:
+            edge.count += count
+        self.total_count += count
+
+        if edge.count <= _COUNT_EPSILON * max(1.0, abs(count)):
+            self.total_count -= edge.count
+            del self.transitions[to_state.get_name()]
+            return None
+        return edge
 
+    def get_total_count(self) -> float:
+        """Retorna a soma das contagens das transições de saída."""
+        return self.total_count
 
     def get_name(self) -> str:
         """Retorna o nome do nó."""
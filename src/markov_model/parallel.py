@@ -0,0 +1,121 @@
+# src/markov_model/parallel.py
+from __future__ import annotations
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import os
+import tempfile
+from .compiled import CompiledChain
+from .persistence import load_chain, save_chain
+from .paths import ReachResult, first_passage_matrix, iter_paths, top_k_paths
+
+QUERIES = ("reach", "paths", "top_k")
+
+# Cadeia compartilhada por todas as tarefas de um processo trabalhador (ver `_attach`).
+_worker_chain: Optional[CompiledChain] = None
+
+
+def _attach(path: str):
+    """Inicializador dos trabalhadores: mapeia em memória a cadeia gravada pelo processo principal."""
+    global _worker_chain
+    _worker_chain, _ = load_chain(path, mmap=True)
+
+
+def _run_task(task: Tuple) -> List[Tuple[int, int, object]]:
+    """Executa uma tarefa sobre a cadeia do processo e devolve (início, destino, resultado) por par."""
+    return _execute(_worker_chain, task)
+
+
+def _execute(chain: CompiledChain, task: Tuple) -> List[Tuple[int, int, object]]:
+    query, pairs, options = task
+    if query == "reach":
+        # Todos os pares de uma tarefa "reach" têm o mesmo destino: uma única propagação
+        # avança todas as origens juntas, como colunas de uma mesma matriz.
+        target = pairs[0][1]
+        starts = [start for start, _ in pairs]
+        matrix = first_passage_matrix(chain, starts, target, options["max_steps"])
+        return [(start, target, row) for start, row in zip(starts, matrix)]
+    names = chain.names
+    if query == "paths":
+        return [(start, end, list(iter_paths(chain, names[start], names[end], **options)))
+                for start, end in pairs]
+    return [(start, end, top_k_paths(chain, names[start], names[end], **options)) for start, end in pairs]
+
+
+def _make_tasks(chain: CompiledChain, pairs: Sequence[Tuple[str, str]], query: str,
+                options: Dict[str, object], chunk_size: int) -> List[Tuple]:
+    """Converte os pares em índices (validando os nomes) e os divide em tarefas."""
+    encoded = [(chain.index_of(start), chain.index_of(end)) for start, end in pairs]
+    if query == "reach":
+        by_target: Dict[int, List[Tuple[int, int]]] = {}
+        for pair in encoded:
+            by_target.setdefault(pair[1], []).append(pair)
+        groups = list(by_target.values())
+    else:
+        groups = [encoded]
+    return [(query, group[i:i + chunk_size], options)
+            for group in groups for i in range(0, len(group), chunk_size)]
+
+
+def _format(chain: CompiledChain, query: str, start: int, end: int, result) -> Tuple[str, str, object]:
+    if query == "reach":
+        result = ReachResult(chain.names[start], chain.names[end], result)
+    return chain.names[start], chain.names[end], result
+
+
+def run_batch(chain: CompiledChain, pairs: Sequence[Tuple[str, str]], query: str = "reach",
+              workers: Optional[int] = None, chunk_size: int = 64,
+              **options) -> Iterator[Tuple[str, str, object]]:
+    """
+    Executa uma consulta para muitos pares (origem, destino) em um pool de processos.
+
+    A cadeia é gravada uma única vez no formato binário de `persistence` e cada trabalhador
+    a mapeia em memória ao iniciar, então nenhum objeto Node/Edge é serializado e todos os
+    processos compartilham as mesmas páginas do arquivo. Os pares são agrupados em tarefas
+    de até `chunk_size` pares; em "reach", pares com o mesmo destino são resolvidos por
+    uma única propagação vetorizada. Os resultados são entregues à medida que as tarefas
+    terminam, portanto fora da ordem de `pairs`.
+
+    Args:
+        chain (CompiledChain): A cadeia compilada.
+        pairs: Pares (nome_de_origem, nome_de_destino).
+        query (str): "reach" (ver `reach_probability`, exige `max_steps`), "paths"
+                     (ver `iter_paths`) ou "top_k" (ver `top_k_paths`, exige `k`).
+        workers (Optional[int]): Número de processos; o padrão é o número de CPUs.
+                                 Com 1 trabalhador, as tarefas rodam no próprio processo.
+        chunk_size (int): Número máximo de pares por tarefa.
+        **options: Parâmetros repassados à consulta (ex.: max_steps, max_depth, min_prob, k).
+    Yields:
+        Tuple[str, str, object]: (origem, destino, resultado) com o resultado da consulta
+                                 correspondente (`ReachResult` ou lista de caminhos).
+    """
+    if query not in QUERIES:
+        raise ValueError(f"Consulta desconhecida '{query}'. Use uma de: {', '.join(QUERIES)}.")
+    if query == "reach" and "max_steps" not in options:
+        raise ValueError("A consulta 'reach' exige o parâmetro max_steps.")
+    if chunk_size < 1:
+        raise ValueError("O tamanho das tarefas deve ser pelo menos 1.")
+    tasks = _make_tasks(chain, pairs, query, options, chunk_size)
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    return _stream(chain, query, tasks, workers)
+
+
+def _stream(chain: CompiledChain, query: str, tasks: List[Tuple], workers: int) -> Iterator[Tuple[str, str, object]]:
+    """Gerador que executa as tarefas (no processo atual ou no pool) e entrega os resultados."""
+    if workers <= 1:
+        for task in tasks:
+            for start, end, result in _execute(chain, task):
+                yield _format(chain, query, start, end, result)
+        return
+
+    with tempfile.TemporaryDirectory(prefix="markov_batch_") as directory:
+        path = os.path.join(directory, "chain.bin")
+        save_chain(chain, path)
+        executor: Executor = ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(path,))
+        try:
+            futures = [executor.submit(_run_task, task) for task in tasks]
+            for future in as_completed(futures):
+                for start, end, result in future.result():
+                    yield _format(chain, query, start, end, result)
+        finally:
+            # Se o consumidor parar antes do fim, as tarefas pendentes são descartadas.
+            executor.shutdown(wait=True, cancel_futures=True)
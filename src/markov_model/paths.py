@@ -0,0 +1,349 @@
+# src/markov_model/paths.py
+from __future__ import annotations
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+import heapq
+import math
+import numpy as np
+from .compiled import CompiledChain
+from .instrumentation import instrumentation
+
+# Máximo de entradas float64 (n_states x inícios) da matriz de massa propagada de uma vez
+# em `first_passage_matrix` (~64 MB); mais inícios são processados em blocos de colunas.
+PROPAGATION_BUDGET = 8_000_000
+
+
+class ReachResult:
+    """Probabilidade de alcançar um estado de destino em até k passos.
+    Atributos:
+        start (str): Nome do estado de início.
+        end (str): Nome do estado de destino.
+        first_passage (np.ndarray): Vetor (max_steps + 1,) em que a posição t é a
+                                    probabilidade de chegar ao destino pela primeira vez
+                                    exatamente no passo t.
+        probability (float): Probabilidade total de chegar ao destino em até max_steps passos.
+    """
+    def __init__(self, start: str, end: str, first_passage: np.ndarray):
+        self.start = start
+        self.end = end
+        self.first_passage = first_passage
+        self.probability = float(first_passage.sum())
+
+    @property
+    def cumulative(self) -> np.ndarray:
+        """Probabilidade acumulada de já ter alcançado o destino até cada passo."""
+        return np.cumsum(self.first_passage)
+
+    def __repr__(self) -> str:
+        return (f"ReachResult({self.start} -> {self.end}, steps={len(self.first_passage) - 1}, "
+                f"P={self.probability:.6f})")
+
+
+class PathBatchResult:
+    """Probabilidades de um lote de caminhos, calculadas de forma vetorizada.
+    Atributos:
+        probabilities (np.ndarray): Probabilidade de cada caminho (0.0 se inválido).
+        log_probabilities (np.ndarray): Log da probabilidade de cada caminho (-inf se inválido).
+        valid (np.ndarray): Máscara dos caminhos possíveis (pelo menos dois nós e todas as
+                            transições existentes).
+        invalid_steps (np.ndarray): Máscara (n_paths, max_len - 1) das transições inexistentes
+                                    ou com estados desconhecidos.
+        lengths (np.ndarray): Número de nós de cada caminho.
+    """
+    def __init__(self, log_probabilities: np.ndarray, valid: np.ndarray, invalid_steps: np.ndarray,
+                 lengths: np.ndarray):
+        self.log_probabilities = log_probabilities
+        self.probabilities = np.exp(log_probabilities)
+        self.valid = valid
+        self.invalid_steps = invalid_steps
+        self.lengths = lengths
+
+    def __len__(self) -> int:
+        return len(self.log_probabilities)
+
+    def __repr__(self) -> str:
+        return f"PathBatchResult(n_paths={len(self)}, valid={int(self.valid.sum())})"
+
+
+def encode_paths(chain: CompiledChain, paths: Sequence[Sequence[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Converte uma lista de caminhos (listas de nomes) em uma matriz de índices preenchida com -1.
+    Cada nome distinto é normalizado e buscado uma única vez; nomes desconhecidos viram -1.
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: A matriz (n_paths, max_len) e o comprimento de cada caminho.
+    """
+    lengths = np.fromiter((len(path) for path in paths), dtype=np.int64, count=len(paths))
+    max_len = int(lengths.max()) if len(paths) else 0
+    memo = {}
+    for path in paths:
+        for name in path:
+            if name not in memo:
+                memo[name] = chain.index.get(name.lower(), -1)
+    flat = np.fromiter((memo[name] for path in paths for name in path), dtype=np.int64, count=int(lengths.sum()))
+    encoded = np.full((len(paths), max_len), -1, dtype=np.int64)
+    encoded[np.arange(max_len) < lengths[:, None]] = flat
+    return encoded, lengths
+
+
+def path_probabilities(chain: CompiledChain, paths: Union[Sequence[Sequence[str]], np.ndarray],
+                       lengths: Optional[np.ndarray] = None) -> PathBatchResult:
+    """
+    Calcula a probabilidade de muitos caminhos de uma só vez.
+    Os nomes são convertidos em índices uma única vez e todos os pesos de transição são
+    obtidos com uma busca vetorizada na matriz CSR; a soma dos logs evita underflow.
+
+    Args:
+        chain (CompiledChain): A cadeia compilada.
+        paths: Lista de caminhos (listas de nomes) ou matriz inteira (n_paths, max_len) de
+               índices de estados, preenchida à direita.
+        lengths (Optional[np.ndarray]): Comprimento de cada linha de `paths` quando ela é uma
+                                        matriz de índices; se None, todas as colunas são usadas.
+    Returns:
+        PathBatchResult: Probabilidades lineares e logarítmicas e as máscaras de validade.
+    """
+    if isinstance(paths, np.ndarray) and paths.dtype.kind in "iu":
+        if paths.ndim != 2:
+            raise ValueError("A matriz de caminhos deve ter formato (n_paths, max_len).")
+        encoded = paths.astype(np.int64, copy=False)
+        lengths = (np.full(len(encoded), encoded.shape[1], dtype=np.int64) if lengths is None
+                   else np.asarray(lengths, dtype=np.int64))
+        if lengths.shape != (len(encoded),) or np.any(lengths > encoded.shape[1]):
+            raise ValueError("O vetor lengths deve ter um comprimento válido para cada caminho.")
+    else:
+        encoded, lengths = encode_paths(chain, paths)
+
+    n_steps = max(encoded.shape[1] - 1, 0)
+    active = np.arange(n_steps) < (lengths[:, None] - 1)
+    step_probs = chain.lookup(encoded[:, :-1], encoded[:, 1:]) if n_steps else np.zeros((len(encoded), 0))
+    invalid_steps = active & (step_probs <= 0.0)
+
+    valid = (lengths >= 2) & ~invalid_steps.any(axis=1)
+    with np.errstate(divide="ignore"):
+        log_steps = np.where(active, np.log(np.where(active, step_probs, 1.0)), 0.0)
+    log_probabilities = np.where(valid, log_steps.sum(axis=1), -np.inf)
+    return PathBatchResult(log_probabilities, valid, invalid_steps, lengths)
+
+
+def first_passage_matrix(chain: CompiledChain, starts: Sequence[int], target: int, max_steps: int) -> np.ndarray:
+    """
+    Distribuição do tempo de primeira passagem até `target` para vários estados de início.
+    A massa é propagada por produtos matriz-vetor esparsos, com os inícios avançando juntos
+    como colunas de uma mesma matriz: custo O(max_steps * E) por bloco. Para limitar a
+    memória em cadeias grandes, os inícios são divididos em blocos de colunas com no máximo
+    `PROPAGATION_BUDGET` entradas (n_states x colunas) cada.
+
+    Args:
+        chain (CompiledChain): A cadeia compilada.
+        starts (Sequence[int]): Índices dos estados de início.
+        target (int): Índice do estado de destino.
+        max_steps (int): Número máximo de transições.
+    Returns:
+        np.ndarray: Matriz (len(starts), max_steps + 1); a entrada [s, t] é a probabilidade
+                    de, partindo de starts[s], alcançar o destino pela primeira vez no passo t.
+    """
+    if max_steps < 0:
+        raise ValueError("O número máximo de passos não pode ser negativo.")
+    starts = np.asarray(starts, dtype=np.int64)
+    result = np.zeros((len(starts), max_steps + 1))
+    chunk = max(1, PROPAGATION_BUDGET // max(chain.n_states, 1))
+    for begin in range(0, len(starts), chunk):
+        columns = slice(begin, begin + chunk)
+        _propagate_first_passage(chain, starts[columns], target, result[columns])
+    return result
+
+
+def _propagate_first_passage(chain: CompiledChain, starts: np.ndarray, target: int, result: np.ndarray):
+    """Preenche `result` (len(starts), max_steps + 1) com uma única propagação em colunas."""
+    mass = np.zeros((chain.n_states, len(starts)))
+    mass[starts, np.arange(len(starts))] = 1.0
+    # Quem já começa no destino chega nele no passo 0.
+    result[:, 0] = mass[target]
+    mass[target] = 0.0
+
+    for step in range(1, result.shape[1]):
+        if not mass.any():
+            break
+        mass = chain.propagate(mass)
+        result[:, step] = mass[target]
+        mass[target] = 0.0 # O caminho termina ao alcançar o destino
+
+
+def reach_probability(chain: CompiledChain, start: str, end: str, max_steps: int) -> ReachResult:
+    """
+    Calcula a probabilidade de sair de `start` e alcançar `end` em até `max_steps` transições,
+    junto com a distribuição do passo de primeira chegada.
+    Equivale à soma das probabilidades de todos os caminhos de `find_all_paths` com
+    max_depth = max_steps + 1, sem enumerá-los.
+    """
+    start_idx = chain.index_of(start)
+    end_idx = chain.index_of(end)
+    first_passage = first_passage_matrix(chain, [start_idx], end_idx, max_steps)[0]
+    return ReachResult(chain.names[start_idx], chain.names[end_idx], first_passage)
+
+
+def top_k_paths(chain: CompiledChain, start: str, end: str, k: int, max_depth: Optional[int] = None,
+                min_prob: Optional[float] = None, log_space: bool = False) -> List[Tuple[List[str], float]]:
+    """
+    Encontra os K caminhos mais prováveis de `start` até `end` por busca de melhor-primeiro
+    (k caminhos mais curtos) sobre os custos -log(p) das transições.
+
+    Os prefixos de caminho ficam em um heap ordenado pelo custo acumulado; como todos os
+    custos são não negativos, os caminhos completos saem do heap em ordem decrescente de
+    probabilidade e a busca termina assim que K caminhos são conhecidos. Cada estado é
+    expandido no máximo K vezes (por profundidade, quando há `max_depth`), pois um prefixo
+    pior que K outros já expandidos no mesmo estado não pode gerar um caminho do top K.
+    Assim como em `find_all_paths`, os caminhos terminam ao alcançar o destino e podem
+    revisitar estados.
+
+    Args:
+        chain (CompiledChain): A cadeia compilada.
+        start (str): Nome do estado de início.
+        end (str): Nome do estado de destino.
+        k (int): Quantidade de caminhos desejada.
+        max_depth (Optional[int]): Número máximo de nós por caminho (como em `find_all_paths`).
+        min_prob (Optional[float]): Descarta prefixos com probabilidade abaixo deste limite.
+        log_space (bool): Retorna log(probabilidade) em vez da probabilidade, evitando
+                          underflow em caminhos muito longos.
+    Returns:
+        List[Tuple[List[str], float]]: Até K pares (caminho, probabilidade), do mais provável
+                                       para o menos provável.
+    """
+    if k <= 0:
+        raise ValueError("O número de caminhos k deve ser positivo.")
+    if max_depth is not None and max_depth < 1:
+        raise ValueError("A profundidade máxima deve ser pelo menos 1.")
+    start_idx = chain.index_of(start)
+    end_idx = chain.index_of(end)
+    max_cost = math.inf if not min_prob else -math.log(min_prob)
+
+    indptr, indices, costs = chain.indptr, chain.indices, chain.costs
+    expansions = {}
+    found: List[Tuple[List[str], float]] = []
+    # Entradas do heap: (custo, desempate, estado, profundidade, prefixo encadeado).
+    # O prefixo é uma tupla (estado, prefixo_anterior), compartilhada entre os ramos.
+    counter = 0
+    pruned = 0
+    heap = [(0.0, counter, start_idx, 1, (start_idx, None))]
+
+    while heap and len(found) < k:
+        cost, _, state, depth, prefix = heapq.heappop(heap)
+
+        if state == end_idx:
+            path: List[str] = []
+            while prefix is not None:
+                path.append(chain.names[prefix[0]])
+                prefix = prefix[1]
+            path.reverse()
+            found.append((path, -cost if log_space else math.exp(-cost)))
+            continue
+        if max_depth is not None and depth >= max_depth:
+            continue
+
+        key = (state, depth) if max_depth is not None else state
+        seen = expansions.get(key, 0)
+        if seen >= k:
+            pruned += 1
+            continue
+        expansions[key] = seen + 1
+
+        begin, finish = indptr[state], indptr[state + 1]
+        for next_state, step_cost in zip(indices[begin:finish].tolist(), costs[begin:finish].tolist()):
+            next_cost = cost + step_cost
+            if next_cost > max_cost or step_cost == math.inf:
+                pruned += 1
+                continue
+            counter += 1
+            heapq.heappush(heap, (next_cost, counter, next_state, depth + 1, (next_state, prefix)))
+    instrumentation.count("search_expansions", sum(expansions.values()))
+    instrumentation.count("pruned_branches", pruned)
+    return found
+
+
+def iter_paths(chain: CompiledChain, start: str, end: str, max_depth: int = 7, min_prob: float = 0.0,
+               limit: Optional[int] = None) -> Iterator[Tuple[List[str], float]]:
+    """
+    Gera, sob demanda, os caminhos de `start` até `end` com suas probabilidades.
+
+    É uma busca em profundidade iterativa: uma pilha explícita guarda, para cada nível,
+    as transições ainda não visitadas, e um único buffer de caminho é reaproveitado por
+    todos os ramos (só é copiado quando um caminho completo é entregue). Ramos cuja
+    probabilidade acumulada já está abaixo de `min_prob` são cortados, pois a
+    probabilidade só diminui ao longo do caminho.
+
+    Args:
+        chain (CompiledChain): A cadeia compilada.
+        start (str): Nome do estado de início.
+        end (str): Nome do estado de destino.
+        max_depth (int): Número máximo de nós por caminho (como em `find_all_paths`).
+        min_prob (float): Probabilidade mínima de um caminho (e de seus prefixos).
+        limit (Optional[int]): Para após gerar este número de caminhos.
+    Yields:
+        Tuple[List[str], float]: Pares (caminho, probabilidade).
+    """
+    if limit is not None and limit <= 0:
+        return
+    start_idx = chain.index_of(start)
+    end_idx = chain.index_of(end)
+    # Como em `find_all_paths`, `max_depth` conta o nó de início: com menos de um nó não há caminho.
+    if max_depth < 1:
+        return
+    if start_idx == end_idx:
+        yield [chain.names[start_idx]], 1.0
+        return
+    if max_depth < 2:
+        return
+
+    indptr, indices, data, names = chain.indptr, chain.indices, chain.data, chain.names
+
+    def edges_of(state: int) -> Tuple[List[int], List[float]]:
+        begin, finish = indptr[state], indptr[state + 1]
+        return indices[begin:finish].tolist(), data[begin:finish].tolist()
+
+    # Buffers compartilhados: o caminho atual, a probabilidade de cada prefixo e,
+    # por nível, as transições de saída e a posição da próxima a explorar.
+    path = [start_idx]
+    probs = [1.0]
+    frontier = [edges_of(start_idx)]
+    cursor = [0]
+    produced = 0
+    expanded = 0
+    pruned = 0
+
+    try:
+        while path:
+            level = len(path) - 1
+            targets, weights = frontier[level]
+            position = cursor[level]
+            if position == len(targets):
+                path.pop()
+                probs.pop()
+                frontier.pop()
+                cursor.pop()
+                continue
+            cursor[level] = position + 1
+
+            next_state = targets[position]
+            next_prob = probs[level] * weights[position]
+            if next_prob == 0.0 or next_prob < min_prob:
+                pruned += 1
+                continue
+
+            if next_state == end_idx:
+                yield [names[state] for state in path] + [names[end_idx]], next_prob
+                produced += 1
+                if limit is not None and produced >= limit:
+                    return
+                continue
+
+            # Só vale descer se ainda couber pelo menos mais um nó depois de `next_state`.
+            if level + 2 < max_depth:
+                path.append(next_state)
+                probs.append(next_prob)
+                frontier.append(edges_of(next_state))
+                cursor.append(0)
+                expanded += 1
+            else:
+                pruned += 1
+    finally:
+        # Os contadores são acumulados localmente e publicados uma única vez.
+        instrumentation.count("dfs_expansions", expanded)
+        instrumentation.count("pruned_branches", pruned)
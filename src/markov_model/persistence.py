@@ -0,0 +1,121 @@
+# src/markov_model/persistence.py
+from __future__ import annotations
+from typing import List, Optional, Tuple, Union
+import os
+import struct
+import numpy as np
+from .compiled import CompiledChain
+
+# Layout do arquivo (little-endian), versão 1:
+#   cabeçalho  | magic (8s) | versão (H) | bytes por índice (H) | flags (I) |
+#              | n_states (Q) | n_edges (Q) | bytes da tabela de nomes (Q)
+#   seções, cada uma alinhada em 64 bytes e nesta ordem:
+#     nomes    UTF-8, separados por '\0'
+#     indptr   int64[n_states + 1]
+#     indices  int32 ou int64[n_edges]
+#     data     float64[n_edges]
+#     totals   float64[n_states] (apenas com FLAG_TOTALS)
+MAGIC = b"MKVCHAIN"
+FORMAT_VERSION = 1
+FLAG_TOTALS = 1 # O arquivo guarda o total de observações de saída de cada estado
+HEADER = struct.Struct("<8sHHIQQQ")
+ALIGNMENT = 64
+
+PathLike = Union[str, os.PathLike]
+
+
+def _aligned(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _section_offsets(n_states: int, n_edges: int, index_size: int, names_nbytes: int) -> List[int]:
+    """Calcula o deslocamento de cada seção a partir dos tamanhos declarados no cabeçalho."""
+    sizes = [names_nbytes, 8 * (n_states + 1), index_size * n_edges, 8 * n_edges, 8 * n_states]
+    offsets = []
+    position = HEADER.size
+    for size in sizes:
+        position = _aligned(position)
+        offsets.append(position)
+        position += size
+    return offsets
+
+
+def save_chain(chain: CompiledChain, path: PathLike, totals: Optional[np.ndarray] = None):
+    """
+    Grava uma cadeia compilada no formato binário versionado.
+    O arquivo é escrito em um temporário e renomeado ao final, para que leitores
+    concorrentes nunca vejam um arquivo pela metade.
+
+    Args:
+        chain (CompiledChain): A cadeia a ser gravada.
+        path: Caminho do arquivo de destino.
+        totals (Optional[np.ndarray]): Total de observações de saída de cada estado, para que
+                                       as contagens possam ser reconstruídas na leitura.
+    """
+    if any("\0" in name for name in chain.names):
+        raise ValueError("Os nomes dos estados não podem conter o caractere nulo.")
+    names_blob = "\0".join(chain.names).encode("utf-8")
+    index_size = chain.indices.dtype.itemsize if chain.indices.dtype.itemsize in (4, 8) else 8
+    flags = FLAG_TOTALS if totals is not None else 0
+    offsets = _section_offsets(chain.n_states, chain.n_edges, index_size, len(names_blob))
+
+    sections = [
+        names_blob,
+        np.ascontiguousarray(chain.indptr, dtype="<i8").tobytes(),
+        np.ascontiguousarray(chain.indices, dtype=f"<i{index_size}").tobytes(),
+        np.ascontiguousarray(chain.data, dtype="<f8").tobytes(),
+    ]
+    if totals is not None:
+        sections.append(np.ascontiguousarray(totals, dtype="<f8").tobytes())
+
+    temp_path = f"{os.fspath(path)}.tmp"
+    with open(temp_path, "wb") as handle:
+        handle.write(HEADER.pack(MAGIC, FORMAT_VERSION, index_size, flags,
+                                 chain.n_states, chain.n_edges, len(names_blob)))
+        for offset, payload in zip(offsets, sections):
+            handle.write(b"\0" * (offset - handle.tell()))
+            handle.write(payload)
+    os.replace(temp_path, path)
+
+
+def load_chain(path: PathLike, mmap: bool = True) -> Tuple[CompiledChain, Optional[np.ndarray]]:
+    """
+    Lê uma cadeia gravada com `save_chain`.
+    Com `mmap=True` os vetores CSR são mapeados direto do arquivo (somente leitura): a
+    abertura é praticamente instantânea e processos que leem o mesmo arquivo compartilham
+    as páginas pelo cache do sistema operacional em vez de manter cópias próprias.
+
+    Args:
+        path: Caminho do arquivo.
+        mmap (bool): Mapeia os vetores em memória em vez de copiá-los.
+    Returns:
+        Tuple[CompiledChain, Optional[np.ndarray]]: A cadeia e os totais por estado (se gravados).
+    """
+    with open(path, "rb") as handle:
+        header = handle.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"Arquivo '{path}' truncado: cabeçalho incompleto.")
+        magic, version, index_size, flags, n_states, n_edges, names_nbytes = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"Arquivo '{path}' não é uma cadeia de Markov compilada.")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Versão de formato {version} não suportada (máximo {FORMAT_VERSION}).")
+        offsets = _section_offsets(n_states, n_edges, index_size, names_nbytes)
+        handle.seek(offsets[0])
+        names_blob = handle.read(names_nbytes)
+
+    def section(position: int, dtype: str, count: int) -> np.ndarray:
+        if count == 0:
+            return np.zeros(0, dtype=dtype)
+        if mmap:
+            return np.memmap(path, dtype=dtype, mode="r", offset=offsets[position], shape=(count,))
+        return np.fromfile(path, dtype=dtype, count=count, offset=offsets[position])
+
+    names = names_blob.decode("utf-8").split("\0") if n_states else []
+    if len(names) != n_states:
+        raise ValueError(f"Arquivo '{path}' corrompido: tabela de nomes inconsistente.")
+    indptr = section(1, "<i8", n_states + 1)
+    indices = section(2, f"<i{index_size}", n_edges)
+    data = section(3, "<f8", n_edges)
+    totals = section(4, "<f8", n_states) if flags & FLAG_TOTALS else None
+    return CompiledChain(names, indptr, indices, data), totals
@@ -0,0 +1,398 @@
+# src/markov_model/service.py
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+import asyncio
+import json
+import time
+import numpy as np
+from .compiled import CompiledChain
+from .instrumentation import instrumentation, logger
+from .paths import first_passage_matrix, path_probabilities, top_k_paths
+from .stationary import StationaryResult, stationary_distribution
+
+ENDPOINTS = ("path_probability", "reach", "top_k", "stationary")
+LATENCY_SAMPLES = 2048 # Latências recentes guardadas por endpoint para os percentis
+MAX_BODY = 16 * 1024 * 1024 # Tamanho máximo do corpo de uma requisição HTTP
+MAX_STEPS = 10_000 # Horizonte máximo de "reach": a matriz de primeira passagem tem inícios x passos
+MAX_TOP_K = 1_000 # Número máximo de caminhos por consulta "top_k"
+
+BatchHandler = Callable[[List[Dict[str, Any]]], List[Any]]
+
+
+class ServiceOverloaded(Exception):
+    """Levantada quando um endpoint já tem `max_pending` requisições em espera."""
+
+
+class EndpointMetrics:
+    """Métricas de um endpoint do serviço.
+    Atributos:
+        requests (int): Requisições atendidas (com sucesso ou erro).
+        errors (int): Requisições que terminaram em erro.
+        rejected (int): Requisições recusadas por sobrecarga.
+        batches (int): Lotes executados.
+        latencies (Deque[float]): Latências recentes, em segundos.
+    """
+    __slots__ = ("requests", "errors", "rejected", "batches", "latencies")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0
+        self.batches = 0
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def as_dict(self) -> Dict[str, float]:
+        """Resumo das métricas, com latências em milissegundos."""
+        summary: Dict[str, float] = {
+            "requests": self.requests, "errors": self.errors, "rejected": self.rejected,
+            "batches": self.batches,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+        }
+        if self.latencies:
+            samples = np.fromiter(self.latencies, dtype=np.float64) * 1000.0
+            p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+            summary.update(latency_ms_mean=float(samples.mean()), latency_ms_p50=float(p50),
+                           latency_ms_p95=float(p95), latency_ms_p99=float(p99),
+                           latency_ms_max=float(samples.max()))
+        return summary
+
+
+class _Batcher:
+    """Agrupa as requisições de um endpoint que chegam dentro de uma janela curta em um único lote."""
+    def __init__(self, name: str, handler: BatchHandler, executor: ThreadPoolExecutor, window: float,
+                 max_batch: int, max_pending: int):
+        self.name = name
+        self.metrics = EndpointMetrics()
+        self._handler = handler
+        self._executor = executor
+        self._window = window
+        self._max_batch = max_batch
+        self._max_pending = max_pending
+        self._items: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._pending = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def submit(self, payload: Dict[str, Any]):
+        if self._pending >= self._max_pending:
+            self.metrics.rejected += 1
+            raise ServiceOverloaded(f"Endpoint '{self.name}' sobrecarregado; tente novamente.")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._items.append((payload, future))
+        self._pending += 1
+        started = time.perf_counter()
+        if len(self._items) >= self._max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window, self._flush)
+        try:
+            return await future
+        except Exception:
+            self.metrics.errors += 1
+            raise
+        finally:
+            self._pending -= 1
+            elapsed = time.perf_counter() - started
+            self.metrics.requests += 1
+            self.metrics.latencies.append(elapsed)
+            instrumentation.record(f"service.{self.name}", elapsed)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        items, self._items = self._items, []
+        if items:
+            self.metrics.batches += 1
+            asyncio.ensure_future(self._run(items))
+
+    async def _run(self, items: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self._executor, self._handler, [payload for payload, _ in items])
+        except Exception as error: # Falha do lote inteiro: todas as requisições recebem o erro
+            results = [error] * len(items)
+        for (_, future), result in zip(items, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+def _state(payload: Dict[str, Any], field: str) -> str:
+    """Valida um campo obrigatório com o nome de um estado."""
+    value = payload.get(field)
+    if not isinstance(value, str):
+        raise ValueError(f"O campo '{field}' deve ser o nome de um estado.")
+    return value
+
+
+def _integer(payload: Dict[str, Any], field: str, default: Optional[int], low: int, high: int) -> Optional[int]:
+    """Valida um campo inteiro opcional no intervalo [low, high]."""
+    value = payload.get(field, default)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or not low <= value <= high:
+        raise ValueError(f"O campo '{field}' deve ser um inteiro entre {low} e {high}.")
+    return value
+
+
+def _grouped(payloads: List[Dict[str, Any]], key: Callable[[Dict[str, Any]], Any]) -> Dict[Any, List[int]]:
+    groups: Dict[Any, List[int]] = {}
+    for position, payload in enumerate(payloads):
+        try:
+            group = key(payload)
+        except (AttributeError, KeyError, TypeError, ValueError) as error:
+            group = ("error", position, error)
+        groups.setdefault(group, []).append(position)
+    return groups
+
+
+class QueryService:
+    """Serviço de consultas sobre uma única cadeia compilada, compartilhada por todos os clientes.
+
+    Cada endpoint tem um agrupador: as requisições que chegam dentro de `window` segundos
+    (ou até `max_batch` delas) viram uma única chamada vetorizada, executada em uma thread
+    dedicada para não bloquear o laço de eventos. Com `max_pending` requisições à espera,
+    novas requisições do endpoint são recusadas (`ServiceOverloaded`, HTTP 503).
+
+    Endpoints e corpos JSON:
+        path_probability  {"path": ["a", "b", ...]}
+        reach             {"start": "a", "end": "b", "max_steps": 10} (max_steps <= MAX_STEPS)
+        top_k             {"start": "a", "end": "b", "k": 3, "max_depth": 8, "min_prob": 0.0} (k <= MAX_TOP_K)
+        stationary        {"states": ["a", "b"]} (opcional; todos os estados se ausente)
+
+    Requisições malformadas recebem um erro individual (HTTP 400) sem afetar as demais do lote.
+
+    Atributos:
+        chain (CompiledChain): A cadeia servida.
+    """
+    def __init__(self, chain: CompiledChain, window: float = 0.002, max_batch: int = 512,
+                 max_pending: int = 4096):
+        if window < 0 or max_batch < 1 or max_pending < 1:
+            raise ValueError("Parâmetros de agrupamento inválidos.")
+        self.chain = chain
+        self._stationary: Optional[StationaryResult] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="markov-service")
+        handlers: Dict[str, BatchHandler] = {
+            "path_probability": self._path_probability,
+            "reach": self._reach,
+            "top_k": self._top_k,
+            "stationary": self._stationary_batch,
+        }
+        self._batchers = {name: _Batcher(name, handler, self._executor, window, max_batch, max_pending)
+                          for name, handler in handlers.items()}
+
+    async def call(self, endpoint: str, payload: Optional[Dict[str, Any]] = None):
+        """
+        Executa uma consulta no próprio processo (sem HTTP), passando pelo mesmo agrupamento.
+        Args:
+            endpoint (str): Um de `ENDPOINTS`.
+            payload (Optional[Dict[str, Any]]): O corpo da consulta.
+        Returns:
+            O resultado JSON-serializável da consulta.
+        """
+        batcher = self._batchers.get(endpoint)
+        if batcher is None:
+            raise KeyError(endpoint)
+        return await batcher.submit(payload or {})
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """Métricas por endpoint (requisições, lotes, rejeições e percentis de latência)."""
+        return {name: batcher.metrics.as_dict() for name, batcher in self._batchers.items()}
+
+    def close(self):
+        """Encerra a thread de execução dos lotes."""
+        self._executor.shutdown(wait=False)
+
+    # Manipuladores de lote: recebem os corpos das requisições e devolvem um resultado
+    # (ou uma exceção) por requisição, na mesma ordem.
+
+    def _path_probability(self, payloads: List[Dict[str, Any]]) -> List[Any]:
+        results: List[Any] = [None] * len(payloads)
+        paths, positions = [], []
+        for position, payload in enumerate(payloads):
+            path = payload.get("path")
+            if not isinstance(path, list) or not all(isinstance(name, str) for name in path):
+                results[position] = ValueError("O campo 'path' deve ser uma lista de nomes.")
+                continue
+            paths.append(path)
+            positions.append(position)
+        if paths:
+            batch = path_probabilities(self.chain, paths)
+            for position, prob, valid in zip(positions, batch.probabilities.tolist(), batch.valid.tolist()):
+                results[position] = {"probability": prob, "valid": valid}
+        return results
+
+    def _reach(self, payloads: List[Dict[str, Any]]) -> List[Any]:
+        # Requisições com o mesmo destino e horizonte compartilham uma única propagação.
+        results: List[Any] = [None] * len(payloads)
+        groups = _grouped(payloads, lambda payload: (self.chain.index_of(_state(payload, "end")),
+                                                     _integer(payload, "max_steps", None, 0, MAX_STEPS)))
+        for group, positions in groups.items():
+            if group[0] == "error":
+                results[group[1]] = ValueError(str(group[2]))
+                continue
+            target, max_steps = group
+            if max_steps is None:
+                for position in positions:
+                    results[position] = ValueError("O campo 'max_steps' é obrigatório.")
+                continue
+            starts, valid_positions = [], []
+            for position in positions:
+                try:
+                    starts.append(self.chain.index_of(_state(payloads[position], "start")))
+                    valid_positions.append(position)
+                except ValueError as error:
+                    results[position] = ValueError(str(error))
+            if not starts:
+                continue
+            try:
+                matrix = first_passage_matrix(self.chain, starts, target, max_steps)
+            except ValueError as error:
+                for position in valid_positions:
+                    results[position] = error
+                continue
+            for position, row in zip(valid_positions, matrix):
+                results[position] = {"probability": float(row.sum()), "first_passage": row.tolist()}
+        return results
+
+    def _top_k(self, payloads: List[Dict[str, Any]]) -> List[Any]:
+        results: List[Any] = []
+        for payload in payloads:
+            try:
+                min_prob = payload.get("min_prob")
+                if min_prob is not None and (isinstance(min_prob, bool) or not isinstance(min_prob, (int, float))):
+                    raise ValueError("O campo 'min_prob' deve ser um número.")
+                found = top_k_paths(self.chain, _state(payload, "start"), _state(payload, "end"),
+                                    _integer(payload, "k", 1, 1, MAX_TOP_K),
+                                    max_depth=_integer(payload, "max_depth", None, 1, MAX_STEPS),
+                                    min_prob=min_prob)
+                results.append({"paths": [{"path": path, "probability": prob} for path, prob in found]})
+            except (AttributeError, KeyError, TypeError, ValueError) as error:
+                results.append(ValueError(str(error)))
+        return results
+
+    def _stationary_batch(self, payloads: List[Dict[str, Any]]) -> List[Any]:
+        if self._stationary is None:
+            self._stationary = stationary_distribution(self.chain)
+        distribution = self._stationary.distribution
+        results: List[Any] = []
+        for payload in payloads:
+            states = payload.get("states")
+            try:
+                if states is not None and (not isinstance(states, list)
+                                           or not all(isinstance(name, str) for name in states)):
+                    raise ValueError("O campo 'states' deve ser uma lista de nomes.")
+                names = self.chain.names if states is None else [name.lower() for name in states]
+                values = distribution if states is None else distribution[self.chain.indices_of(states)]
+                results.append({"distribution": dict(zip(names, values.tolist())),
+                                "converged": self._stationary.converged})
+            except (AttributeError, TypeError, ValueError) as error:
+                results.append(ValueError(str(error)))
+        return results
+
+    # Camada HTTP/1.1 mínima (JSON), suficiente para uso local.
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, body: Any, keep_alive: bool):
+        reasons = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                   413: "Payload Too Large", 503: "Service Unavailable"}
+        payload = json.dumps(body).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {reasons.get(status, 'Error')}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + payload)
+        await writer.drain()
+
+    async def _dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, Any]:
+        endpoint = target.split("?", 1)[0].strip("/")
+        if endpoint == "health":
+            return 200, {"status": "ok", "n_states": self.chain.n_states, "n_edges": self.chain.n_edges}
+        if endpoint == "metrics":
+            return 200, self.metrics()
+        if endpoint not in self._batchers:
+            return 404, {"error": f"Endpoint '{endpoint}' desconhecido."}
+        if method not in ("GET", "POST"):
+            return 405, {"error": "Use GET ou POST."}
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            return 400, {"error": "Corpo JSON inválido."}
+        if not isinstance(payload, dict):
+            return 400, {"error": "O corpo deve ser um objeto JSON."}
+        try:
+            return 200, await self.call(endpoint, payload)
+        except ServiceOverloaded as error:
+            return 503, {"error": str(error)}
+        except ValueError as error:
+            return 400, {"error": str(error)}
+        except Exception as error: # Falha de uma requisição não derruba a conexão
+            logger.exception("Falha ao atender '%s'", endpoint)
+            return 400, {"error": f"{type(error).__name__}: {error}"}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Atende as requisições HTTP de uma conexão (com keep-alive) até o cliente fechá-la."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split(" ", 2)
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                keep_alive = headers.get("connection", "").lower() != "close" and version.strip() == "HTTP/1.1"
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, {"error": "Corpo grande demais."}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                status, response = await self._dispatch(method.upper(), target, body)
+                await self._respond(writer, status, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError) as error:
+            logger.debug("Conexão encerrada: %s", error)
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.AbstractServer:
+        """Inicia o servidor HTTP (porta 0 escolhe uma porta livre; ver `server.sockets`)."""
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+
+async def request_json(host: str, port: int, endpoint: str, payload: Optional[Dict[str, Any]] = None,
+                       method: str = "POST") -> Tuple[int, Any]:
+    """
+    Cliente HTTP mínimo para o serviço, útil em testes e scripts.
+    Returns:
+        Tuple[int, Any]: O código de status e o corpo JSON da resposta.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        writer.write((f"{method} /{endpoint} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                      f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+        status_line = await reader.readline()
+        status = int(status_line.split()[1])
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value.strip())
+        return status, json.loads(await reader.readexactly(length))
+    finally:
+        writer.close()
@@ -0,0 +1,188 @@
+# src/markov_model/simulation.py
+from __future__ import annotations
+from typing import List, Optional, Union
+import os
+import numpy as np
+import scipy.sparse as sp
+from .compiled import CompiledChain
+
+
+class SimulationResult:
+    """Resultado de uma simulação de Monte Carlo com vários caminhantes.
+    Atributos:
+        names (List[str]): Nomes dos estados, na ordem dos índices.
+        trajectories (Optional[np.ndarray]): Matriz (n_steps + 1, n_walkers) com o estado de cada
+                                             caminhante a cada passo (None se não foi gravada).
+                                             Pode ser um `np.memmap` quando gravada em disco.
+        final_states (np.ndarray): Estado de cada caminhante ao final da simulação.
+        visit_counts (np.ndarray): Número de visitas a cada estado, somando todos os passos.
+        n_transitions (int): Total de transições simuladas (n_walkers * n_steps).
+    """
+    def __init__(self, names: List[str], trajectories: Optional[np.ndarray], final_states: np.ndarray,
+                 visit_counts: np.ndarray, n_transitions: int):
+        self.names = names
+        self.trajectories = trajectories
+        self.final_states = final_states
+        self.visit_counts = visit_counts
+        self.n_transitions = n_transitions
+
+    def occupancy(self) -> np.ndarray:
+        """Fração do tempo passada em cada estado (estimativa da distribuição de longo prazo)."""
+        total = self.visit_counts.sum()
+        return self.visit_counts / total if total else self.visit_counts.astype(np.float64)
+
+    def __repr__(self) -> str:
+        return f"SimulationResult(n_walkers={len(self.final_states)}, n_transitions={self.n_transitions})"
+
+
+class TransitionSampler:
+    """Amostrador vetorizado de transições sobre uma cadeia compilada.
+
+    As probabilidades de cada linha são acumuladas em uma CDF (`cdf`, que termina em 1.0
+    em toda linha). Para sortear o próximo estado de todos os caminhantes com u ~ U(0, 1),
+    cada um parte da primeira transição da sua linha e avança enquanto cdf < u; em redes
+    viárias, com poucas saídas por estado, isso termina em poucas iterações vetorizadas.
+    Os caminhantes que ainda não terminaram após `SCAN_STEPS` iterações (linhas com muitas
+    saídas) são resolvidos por busca binária em `keys = linha + cdf`, que é crescente em
+    toda a cadeia. Estados sem saída são absorventes.
+    """
+    SCAN_STEPS = 8
+
+    def __init__(self, chain: CompiledChain):
+        self.chain = chain
+        rows = chain.rows
+        sums = chain.row_sums()
+        cumulative = np.cumsum(chain.data)
+        row_start = np.concatenate(([0.0], cumulative))[chain.indptr[:-1]]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            within = (cumulative - row_start[rows]) / sums[rows]
+        self.cdf = np.minimum(np.nan_to_num(within, nan=1.0), 1.0)
+        # Garante que u próximo de 1 nunca ultrapasse a última transição da linha.
+        self.cdf[chain.indptr[1:][chain.out_degree() > 0] - 1] = 1.0
+        self.keys = rows + self.cdf
+        self.terminal = chain.terminal_states() | (sums <= 0.0)
+
+    def step(self, states: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """Avança cada caminhante um passo e retorna os novos estados."""
+        n_edges = len(self.cdf)
+        if n_edges == 0:
+            return states.copy()
+        u = rng.random(len(states))
+        indptr = self.chain.indptr
+        positions = indptr[states]
+        last = indptr[states + 1] - 1
+
+        for _ in range(self.SCAN_STEPS):
+            advance = (self.cdf[np.minimum(positions, n_edges - 1)] < u) & (positions < last)
+            if not advance.any():
+                break
+            positions += advance
+        else:
+            pending = (self.cdf[np.minimum(positions, n_edges - 1)] < u) & (positions < last)
+            if pending.any():
+                positions[pending] = np.searchsorted(self.keys, states[pending] + u[pending])
+
+        next_states = self.chain.indices[np.minimum(positions, n_edges - 1)].astype(states.dtype, copy=False)
+        return np.where(self.terminal[states], states, next_states)
+
+
+def _as_chain(model) -> CompiledChain:
+    """Aceita um Graph, uma CompiledChain, uma matriz densa ou uma matriz esparsa do SciPy."""
+    if isinstance(model, CompiledChain):
+        return model
+    if hasattr(model, "compile"):
+        return model.compile()
+    matrix = sp.csr_matrix(model) if not sp.issparse(model) else model.tocsr()
+    matrix.sum_duplicates()
+    matrix.sort_indices()
+    return CompiledChain([str(i) for i in range(matrix.shape[0])], matrix.indptr, matrix.indices, matrix.data)
+
+
+def _state_dtype(n_states: int) -> np.dtype:
+    if n_states <= np.iinfo(np.uint16).max:
+        return np.dtype(np.uint16)
+    return np.dtype(np.uint32)
+
+
+def _initial_states(chain: CompiledChain, start, n_walkers: int, rng: np.random.Generator) -> np.ndarray:
+    n = chain.n_states
+    if start is None:
+        return rng.integers(0, n, n_walkers)
+    if isinstance(start, str):
+        return np.full(n_walkers, chain.index_of(start))
+    if isinstance(start, (int, np.integer)):
+        if not 0 <= start < n:
+            raise ValueError(f"Índice de estado inicial fora do intervalo: {start}.")
+        return np.full(n_walkers, int(start))
+    start = np.asarray(start)
+    if start.dtype.kind == "f":
+        # Distribuição inicial sobre os estados.
+        if start.shape != (n,) or start.sum() <= 0:
+            raise ValueError(f"A distribuição inicial deve ter tamanho {n} e massa positiva.")
+        return rng.choice(n, size=n_walkers, p=start / start.sum())
+    if len(start) != n_walkers:
+        raise ValueError("Informe um estado inicial por caminhante.")
+    if start.dtype.kind in "iu":
+        return start.astype(np.int64)
+    return chain.indices_of([str(name) for name in start])
+
+
+def simulate(model, n_walkers: int, n_steps: int, start=None, seed: Optional[int] = None,
+             record: bool = True, out: Optional[Union[str, os.PathLike]] = None,
+             chunk_steps: int = 1024) -> SimulationResult:
+    """
+    Simula muitos caminhantes independentes na cadeia, todos avançando juntos a cada passo.
+
+    Args:
+        model: Um `Graph`, uma `CompiledChain`, uma matriz de transição densa (NumPy)
+               ou esparsa (SciPy).
+        n_walkers (int): Número de caminhantes simultâneos.
+        n_steps (int): Número de transições de cada caminhante.
+        start: Estado inicial: nome, índice, um estado por caminhante (nomes ou índices) ou
+               uma distribuição de probabilidade sobre os estados. Se None, é uniforme.
+        seed (Optional[int]): Semente do gerador aleatório, para resultados reproduzíveis.
+        record (bool): Se False, não guarda as trajetórias (apenas estados finais e visitas).
+        out: Caminho de um arquivo `.npy` onde as trajetórias são gravadas (via memmap), em vez
+             de ficarem na memória do processo.
+        chunk_steps (int): A cada quantos passos as trajetórias em disco são descarregadas.
+    Returns:
+        SimulationResult: Trajetórias em inteiros compactos (uint16/uint32), estados finais
+                          e contagem de visitas por estado.
+    """
+    if n_walkers <= 0 or n_steps < 0:
+        raise ValueError("Informe um número positivo de caminhantes e um número não negativo de passos.")
+    chain = _as_chain(model)
+    if chain.n_states == 0:
+        raise ValueError("A cadeia está vazia.")
+    rng = np.random.default_rng(seed)
+    sampler = TransitionSampler(chain)
+    dtype = _state_dtype(chain.n_states)
+
+    states = _initial_states(chain, start, n_walkers, rng).astype(np.int64)
+    visit_counts = np.zeros(chain.n_states, dtype=np.int64)
+    # Com poucos caminhantes em uma cadeia grande, np.add.at evita um bincount O(n_states) por passo.
+    dense_counting = n_walkers >= chain.n_states
+
+    trajectories = None
+    if out is not None:
+        trajectories = np.lib.format.open_memmap(out, mode="w+", dtype=dtype, shape=(n_steps + 1, n_walkers))
+    elif record:
+        trajectories = np.empty((n_steps + 1, n_walkers), dtype=dtype)
+
+    for step in range(n_steps + 1):
+        if step > 0:
+            states = sampler.step(states, rng)
+        if dense_counting:
+            visit_counts += np.bincount(states, minlength=chain.n_states)
+        else:
+            np.add.at(visit_counts, states, 1)
+        if trajectories is not None:
+            trajectories[step] = states
+            # Descarrega no disco a cada bloco, limitando as páginas sujas em memória.
+            if out is not None and (step + 1) % chunk_steps == 0:
+                trajectories.flush()
+
+    if out is not None:
+        trajectories.flush()
+    return SimulationResult(list(chain.names), trajectories, states.astype(dtype), visit_counts,
+                            n_walkers * n_steps)
@@ -0,0 +1,198 @@
+# src/markov_model/stationary.py
+from __future__ import annotations
+from typing import Dict, List, Optional, Union
+import time
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+from .compiled import CompiledChain
+
+METHODS = ("power", "gauss-seidel", "solve", "eigen")
+DENSE_EIGEN_LIMIT = 5000 # Acima disso a decomposição densa é proibitiva
+UNIT_EIGENVALUE_TOL = 1e-9 # Autovalores a menos disso de 1 contam como unitários no método "eigen"
+
+
+class StationaryResult:
+    """Resultado do cálculo do estado estacionário e seus diagnósticos de convergência.
+    Atributos:
+        distribution (np.ndarray): Vetor π com π @ P = π e soma 1.
+        names (List[str]): Nomes dos estados, na mesma ordem de `distribution`.
+        method (str): Método utilizado ("power", "gauss-seidel", "solve" ou "eigen").
+        iterations (int): Número de iterações realizadas (1 para métodos diretos).
+        residual (float): Norma L1 de π @ P - π ao final do cálculo.
+        converged (bool): Se o resíduo ficou abaixo da tolerância.
+        elapsed (float): Tempo de execução em segundos.
+        history (List[float]): Variação L1 a cada iteração (apenas nos métodos iterativos).
+    """
+    def __init__(self, distribution: np.ndarray, names: List[str], method: str, iterations: int,
+                 residual: float, converged: bool, elapsed: float, history: Optional[List[float]] = None):
+        self.distribution = distribution
+        self.names = names
+        self.method = method
+        self.iterations = iterations
+        self.residual = residual
+        self.converged = converged
+        self.elapsed = elapsed
+        self.history = history if history is not None else []
+
+    def as_dict(self) -> Dict[str, float]:
+        """Retorna a distribuição como um dicionário nome -> probabilidade."""
+        return dict(zip(self.names, self.distribution.tolist()))
+
+    def __repr__(self) -> str:
+        return (f"StationaryResult(method={self.method!r}, iterations={self.iterations}, "
+                f"residual={self.residual:.2e}, converged={self.converged})")
+
+
+def _absorbing_operator(chain: CompiledChain) -> sp.csr_matrix:
+    """
+    Retorna P^T com laços nos estados terminais (sem saída), tornando-os absorventes.
+    Assim a massa que chega a um estado terminal permanece nele em vez de desaparecer.
+    """
+    operator = chain.transposed()
+    terminal = chain.terminal_states()
+    if terminal.any():
+        operator = (operator + sp.diags(terminal.astype(np.float64))).tocsr()
+    return operator
+
+
+def _initial_vector(chain: CompiledChain, x0) -> np.ndarray:
+    """Monta o vetor inicial: uniforme, um array explícito ou um resultado anterior (warm start)."""
+    n = chain.n_states
+    if x0 is None:
+        return np.full(n, 1.0 / n)
+    if isinstance(x0, StationaryResult):
+        # Reaproveita a solução anterior casando os estados pelo nome;
+        # estados novos recebem uma fatia uniforme da massa.
+        x = np.full(n, 1.0 / n)
+        for name, prob in zip(x0.names, x0.distribution):
+            idx = chain.index.get(name)
+            if idx is not None:
+                x[idx] = prob
+    else:
+        x = np.array(x0, dtype=np.float64)
+        if x.shape != (n,):
+            raise ValueError(f"O vetor inicial deve ter tamanho {n}.")
+    total = x.sum()
+    if total <= 0:
+        raise ValueError("O vetor inicial deve ter massa positiva.")
+    return x / total
+
+
+def _residual(operator: sp.csr_matrix, x: np.ndarray) -> float:
+    return float(np.abs(operator @ x - x).sum())
+
+
+def _power(operator, x, tol, max_iter, laziness):
+    history: List[float] = []
+    for iteration in range(1, max_iter + 1):
+        x_next = operator @ x
+        if laziness:
+            x_next = (1.0 - laziness) * x_next + laziness * x
+        x_next /= x_next.sum()
+        delta = float(np.abs(x_next - x).sum())
+        history.append(delta)
+        x = x_next
+        if delta < tol:
+            return x, iteration, history
+    return x, max_iter, history
+
+
+def _gauss_seidel(operator, x, tol, max_iter):
+    # Divide A = I - P^T em (D + L) + U e itera (D + L) x_{k+1} = -U x_k.
+    # Cada varredura é uma única solução triangular esparsa, feita em código compilado.
+    n = operator.shape[0]
+    system = (sp.identity(n, format="csr") - operator).tocsr()
+    lower = sp.tril(system, format="csr")
+    upper = sp.triu(system, k=1, format="csr")
+    if np.any(lower.diagonal() == 0.0):
+        raise ValueError("O método 'gauss-seidel' não suporta estados absorventes; use 'power' ou 'solve'.")
+    history: List[float] = []
+    for iteration in range(1, max_iter + 1):
+        x_next = spla.spsolve_triangular(lower, -(upper @ x), lower=True)
+        x_next /= x_next.sum()
+        delta = float(np.abs(x_next - x).sum())
+        history.append(delta)
+        x = x_next
+        if delta < tol:
+            return x, iteration, history
+    return x, max_iter, history
+
+
+def _solve(operator):
+    # Resolve (P^T - I) π = 0 substituindo a última equação pela normalização sum(π) = 1.
+    n = operator.shape[0]
+    system = (operator - sp.identity(n, format="csr")).tocsr()
+    system = sp.vstack([system[:n - 1], sp.csr_matrix(np.ones((1, n)))], format="csc")
+    rhs = np.zeros(n)
+    rhs[n - 1] = 1.0
+    x = spla.spsolve(system, rhs)
+    return np.maximum(x, 0.0)
+
+
+def _eigen(operator):
+    if operator.shape[0] > DENSE_EIGEN_LIMIT:
+        raise ValueError(f"O método 'eigen' é denso e limitado a {DENSE_EIGEN_LIMIT} estados.")
+    values, vectors = np.linalg.eig(operator.toarray())
+    unit = np.flatnonzero(np.abs(values - 1.0) < UNIT_EIGENVALUE_TOL)
+    if len(unit) > 1:
+        # Várias classes fechadas: cada combinação dos seus vetores é estacionária e o
+        # autovetor devolvido pode misturar sinais, então não há uma resposta única.
+        raise ValueError(f"A cadeia tem {len(unit)} autovalores iguais a 1 (várias classes fechadas); "
+                         "a distribuição estacionária não é única. Use `structure()` e resolva cada classe.")
+    x = np.real(vectors[:, np.argmin(np.abs(values - 1.0))])
+    # O vetor de Perron tem um único sinal; o sinal global do autovetor é arbitrário.
+    return np.maximum(x if x.sum() >= 0 else -x, 0.0)
+
+
+def stationary_distribution(chain: CompiledChain, method: str = "power", tol: float = 1e-10,
+                            max_iter: int = 10000, x0: Union[None, np.ndarray, StationaryResult] = None,
+                            laziness: float = 0.0) -> StationaryResult:
+    """
+    Calcula a distribuição estacionária π de uma cadeia compilada.
+    Estados terminais (sem transições de saída) são tratados como absorventes.
+
+    Args:
+        chain (CompiledChain): A cadeia compilada.
+        method (str): "power" (iteração de potência esparsa), "gauss-seidel" (varreduras
+                      triangulares esparsas, em geral com bem menos iterações), "solve"
+                      (sistema linear esparso com LU; ideal para redes quase planares, como
+                      malhas viárias) ou "eigen" (autovetor denso, só para cadeias pequenas
+                      com uma única classe fechada).
+        tol (float): Tolerância na norma L1 entre iterações sucessivas.
+        max_iter (int): Número máximo de iterações dos métodos iterativos.
+        x0: Vetor inicial ou `StationaryResult` anterior para warm start (métodos iterativos).
+        laziness (float): Peso α da cadeia preguiçosa (1-α)P + αI no método "power";
+                          um valor como 0.5 garante convergência em cadeias periódicas.
+    Returns:
+        StationaryResult: A distribuição e os diagnósticos de convergência.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Método desconhecido '{method}'. Use um de: {', '.join(METHODS)}.")
+    if chain.n_states == 0:
+        raise ValueError("A cadeia está vazia.")
+    if not 0.0 <= laziness < 1.0:
+        raise ValueError("O parâmetro laziness deve estar em [0, 1).")
+
+    started = time.perf_counter()
+    operator = _absorbing_operator(chain)
+    history: Optional[List[float]] = None
+    iterations = 1
+
+    if method == "power":
+        x, iterations, history = _power(operator, _initial_vector(chain, x0), tol, max_iter, laziness)
+    elif method == "gauss-seidel":
+        x, iterations, history = _gauss_seidel(operator, _initial_vector(chain, x0), tol, max_iter)
+    elif method == "solve":
+        x = _solve(operator)
+    else:
+        x = _eigen(operator)
+
+    x = x / x.sum()
+    residual = _residual(operator, x)
+    if history is not None:
+        converged = bool(history) and history[-1] < tol
+    else:
+        converged = bool(np.isfinite(residual)) and residual < max(tol, 1e-8)
+    return StationaryResult(x, list(chain.names), method, iterations, residual, converged,
+                            time.perf_counter() - started, history)
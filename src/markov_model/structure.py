@@ -0,0 +1,108 @@
+# src/markov_model/structure.py
+from __future__ import annotations
+from typing import List
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.csgraph as csgraph
+from .compiled import CompiledChain
+
+
+class ChainStructure:
+    """Decomposição de uma cadeia em classes comunicantes (componentes fortemente conexas).
+
+    Uma classe é fechada quando nenhuma transição sai dela (classe recorrente) e transiente
+    caso contrário. O período de uma classe é o mdc dos comprimentos de seus ciclos; classes
+    de um único estado sem laço não têm ciclos e recebem período 0. Assim como em
+    `stationary_distribution`, estados terminais (sem saída) são tratados como absorventes:
+    formam uma classe fechada de período 1. Transições de probabilidade 0 são ignoradas.
+
+    Atributos:
+        labels (np.ndarray): Classe de cada estado, na ordem dos índices da cadeia compilada.
+        n_classes (int): Número de classes.
+        sizes (np.ndarray): Número de estados de cada classe.
+        closed (np.ndarray): Máscara das classes fechadas.
+        periods (np.ndarray): Período de cada classe.
+    """
+    def __init__(self, chain: CompiledChain):
+        self.chain = chain
+        n = chain.n_states
+        positive = chain.data > 0
+        rows, cols = chain.rows[positive], chain.indices[positive]
+        adjacency = sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))
+        self.n_classes, self.labels = csgraph.connected_components(adjacency, directed=True, connection="strong")
+        self.sizes = np.bincount(self.labels, minlength=self.n_classes)
+
+        source_class, target_class = self.labels[rows], self.labels[cols]
+        leaving = source_class != target_class
+        self.closed = np.ones(self.n_classes, dtype=bool)
+        self.closed[source_class[leaving]] = False
+
+        # Período: níveis de uma busca em largura dentro de cada classe, a partir de um estado
+        # raiz; cada transição interna u -> v contribui com nivel(u) + 1 - nivel(v) para o mdc.
+        inside = ~leaving
+        internal = sp.csr_matrix((np.ones(int(inside.sum())), (rows[inside], cols[inside])), shape=(n, n))
+        roots = np.unique(self.labels, return_index=True)[1]
+        levels = csgraph.dijkstra(internal, directed=True, indices=roots, unweighted=True, min_only=True) \
+            if n else np.zeros(0)
+        levels = levels.astype(np.int64)
+        self.periods = np.zeros(self.n_classes, dtype=np.int64)
+        np.gcd.at(self.periods, source_class[inside], np.abs(levels[rows[inside]] + 1 - levels[cols[inside]]))
+        self.periods[self.labels[chain.terminal_states()]] = 1
+
+    def members(self, label: int) -> np.ndarray:
+        """Índices dos estados da classe `label`."""
+        return np.flatnonzero(self.labels == label)
+
+    def class_names(self, label: int) -> List[str]:
+        """Nomes dos estados da classe `label`."""
+        return [self.chain.names[i] for i in self.members(label)]
+
+    def class_of(self, name: str) -> int:
+        """Classe do estado `name`."""
+        return int(self.labels[self.chain.index_of(name)])
+
+    @property
+    def closed_classes(self) -> np.ndarray:
+        """Rótulos das classes fechadas (recorrentes)."""
+        return np.flatnonzero(self.closed)
+
+    @property
+    def transient_classes(self) -> np.ndarray:
+        """Rótulos das classes transientes."""
+        return np.flatnonzero(~self.closed)
+
+    @property
+    def is_irreducible(self) -> bool:
+        """Se todos os estados se comunicam (uma única classe)."""
+        return self.n_classes == 1
+
+    @property
+    def is_aperiodic(self) -> bool:
+        """Se todas as classes fechadas têm período 1."""
+        return bool(np.all(self.periods[self.closed] == 1))
+
+    @property
+    def is_ergodic(self) -> bool:
+        """Irredutível e aperiódica: a distribuição estacionária existe, é única e é o limite da cadeia."""
+        return self.is_irreducible and self.is_aperiodic
+
+    def subchain(self, label: int) -> CompiledChain:
+        """
+        Restringe a cadeia a uma classe fechada, para resolvê-la isoladamente (ex.: o estado
+        estacionário de cada classe recorrente é o de um problema bem menor).
+        Args:
+            label (int): Rótulo de uma classe fechada.
+        Returns:
+            CompiledChain: A cadeia da classe, com os estados na ordem original.
+        """
+        if not self.closed[label]:
+            raise ValueError("Apenas classes fechadas formam uma cadeia estocástica por si só.")
+        states = self.members(label)
+        block = self.chain.to_scipy()[states][:, states].tocsr()
+        block.sort_indices()
+        return CompiledChain([self.chain.names[i] for i in states], block.indptr.astype(np.int64),
+                             block.indices, block.data, version=self.chain.version)
+
+    def __repr__(self) -> str:
+        return (f"ChainStructure(classes={self.n_classes}, closed={int(self.closed.sum())}, "
+                f"irreducible={self.is_irreducible}, aperiodic={self.is_aperiodic})")
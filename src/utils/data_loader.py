@@ -0,0 +1,134 @@
+# src/utils/data_loader.py
+from __future__ import annotations
+from collections import Counter
+from typing import Iterable, Iterator, Optional, Sequence, Tuple, Union
+import os
+import pandas as pd
+from ..markov_model.graph import Graph
+
+DEFAULT_CHUNK_SIZE = 500_000 # Linhas por bloco; limita a memória usada durante a leitura
+COLUMNS = ("origin", "dest", "count")
+
+PathLike = Union[str, os.PathLike]
+
+
+def detect_format(path: PathLike) -> str:
+    """
+    Identifica o formato de um arquivo de observações pela extensão (ignorando `.gz`).
+    Args:
+        path: Caminho do arquivo.
+    Returns:
+        str: "csv" ou "jsonl".
+    """
+    name = os.fspath(path).lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    if name.endswith((".csv", ".tsv", ".txt")):
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    raise ValueError(f"Formato de arquivo não reconhecido: '{path}'. Use CSV ou JSON lines.")
+
+
+def iter_observation_chunks(path: PathLike, fmt: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                            columns: Sequence[str] = COLUMNS, header: bool = True) -> Iterator[pd.DataFrame]:
+    """
+    Lê um arquivo de observações em blocos, sem carregá-lo inteiro na memória.
+    Arquivos compactados com gzip são descompactados em fluxo.
+
+    Args:
+        path: Caminho do arquivo (CSV, TSV ou JSON lines, opcionalmente `.gz`).
+        fmt (Optional[str]): "csv" ou "jsonl"; detectado pela extensão se None.
+        chunk_size (int): Número de linhas por bloco.
+        columns (Sequence[str]): Nomes das colunas de origem, destino e contagem.
+        header (bool): Se o CSV tem linha de cabeçalho. Sem cabeçalho, as três
+                       primeiras colunas são usadas, nessa ordem.
+    Yields:
+        pd.DataFrame: Blocos com as colunas "origin", "dest" e "count".
+    """
+    fmt = fmt or detect_format(path)
+    columns = list(columns)
+    if len(columns) != 3:
+        raise ValueError("Informe exatamente três colunas: origem, destino e contagem.")
+    text_columns = {columns[0]: str, columns[1]: str}
+
+    if fmt == "csv":
+        sep = "\t" if os.fspath(path).lower().replace(".gz", "").endswith(".tsv") else ","
+        if header:
+            reader = pd.read_csv(path, sep=sep, usecols=columns, dtype=text_columns,
+                                 chunksize=chunk_size, compression="infer")
+        else:
+            reader = pd.read_csv(path, sep=sep, header=None, usecols=[0, 1, 2], names=columns,
+                                 dtype=text_columns, chunksize=chunk_size, compression="infer")
+    elif fmt == "jsonl":
+        # Cada linha pode ser um objeto {"origin": ..., "dest": ..., "count": ...}
+        # ou uma lista [origem, destino, contagem].
+        reader = pd.read_json(path, lines=True, chunksize=chunk_size, compression="infer", dtype=False)
+    else:
+        raise ValueError(f"Formato desconhecido '{fmt}'. Use 'csv' ou 'jsonl'.")
+
+    with reader:
+        for chunk in reader:
+            if set(columns).issubset(chunk.columns):
+                chunk = chunk[columns]
+            else:
+                chunk = chunk.iloc[:, :3]
+            chunk.columns = list(COLUMNS)
+            yield chunk
+
+
+def aggregate_chunk(chunk: pd.DataFrame) -> pd.Series:
+    """
+    Soma as contagens de um bloco por par (origem, destino), com nomes em minúsculas.
+    Args:
+        chunk (pd.DataFrame): Bloco com as colunas "origin", "dest" e "count".
+    Returns:
+        pd.Series: Contagens indexadas por (origem, destino).
+    """
+    keys = [chunk["origin"].astype(str).str.lower(), chunk["dest"].astype(str).str.lower()]
+    return chunk["count"].groupby(keys, sort=False).sum()
+
+
+def aggregate_observations(chunks: Iterable[pd.DataFrame]) -> Counter:
+    """
+    Agrega as contagens de vários blocos em uma única passada.
+    A memória usada cresce com o número de transições distintas, não de linhas lidas.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): Blocos gerados por `iter_observation_chunks`.
+    Returns:
+        Counter: Contagens totais indexadas por (origem, destino).
+    """
+    counts: Counter = Counter()
+    for chunk in chunks:
+        aggregated = aggregate_chunk(chunk)
+        counts.update(dict(zip(aggregated.index.tolist(), aggregated.tolist())))
+    return counts
+
+
+def iter_observations(path: PathLike, **kwargs) -> Iterator[Tuple[str, str, int]]:
+    """
+    Gera as observações de um arquivo como tuplas (origem, destino, contagem), uma a uma.
+    Aceita os mesmos argumentos nomeados de `iter_observation_chunks`.
+    """
+    for chunk in iter_observation_chunks(path, **kwargs):
+        yield from zip(chunk["origin"].tolist(), chunk["dest"].tolist(), chunk["count"].tolist())
+
+
+def load_graph(path: PathLike, graph: Optional[Graph] = None, **kwargs) -> Graph:
+    """
+    Constrói um grafo a partir de um arquivo de observações, lido em blocos.
+    As contagens são agregadas por par antes da construção, de modo que a memória
+    depende do número de transições distintas e não do tamanho do arquivo.
+
+    Args:
+        path: Caminho do arquivo (CSV, TSV ou JSON lines, opcionalmente `.gz`).
+        graph (Optional[Graph]): Grafo a ser preenchido; um novo é criado se None.
+        **kwargs: Repassados para `iter_observation_chunks`.
+    Returns:
+        Graph: O grafo construído.
+    """
+    graph = graph if graph is not None else Graph()
+    counts = aggregate_observations(iter_observation_chunks(path, **kwargs))
+    graph.build_from_observations((origin, dest, count) for (origin, dest), count in counts.items())
+    return graph
@@ -0,0 +1,38 @@
+# tests/conftest.py
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Os módulos são importados a partir da raiz do repositório (ex.: `src.markov_model.graph`).
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.markov_model.graph import Graph  # noqa: E402
+
+# Cadeia irredutível e aperiódica com probabilidades conhecidas:
+#   A -> B 0.75, A -> C 0.25 | B -> C 0.5, B -> D 0.5 | C -> A 0.25, C -> D 0.75 | D -> A 1.0
+OBSERVATIONS = [
+    ("A", "B", 3), ("A", "C", 1),
+    ("B", "C", 2), ("B", "D", 2),
+    ("C", "A", 1), ("C", "D", 3),
+    ("D", "A", 4),
+]
+EXPECTED_MATRIX = np.array([
+    [0.0, 0.75, 0.25, 0.0],
+    [0.0, 0.0, 0.5, 0.5],
+    [0.25, 0.0, 0.0, 0.75],
+    [1.0, 0.0, 0.0, 0.0],
+])
+
+
+def build_graph(observations=OBSERVATIONS, compact: bool = False) -> Graph:
+    graph = Graph(compact=compact)
+    graph.build_from_observations(observations)
+    return graph
+
+
+@pytest.fixture(params=[False, True], ids=["objects", "compact"])
+def graph(request) -> Graph:
+    """A cadeia de exemplo, nos dois modos de armazenamento."""
+    return build_graph(compact=request.param)
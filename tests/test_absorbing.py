@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from conftest import build_graph
+from src.markov_model.absorbing import AbsorbingAnalysis
+from src.markov_model.simulation import _as_chain
+
+# Ruína do jogador com moeda honesta entre 0 e 4: "s0" é absorvente por não ter saídas
+# e "s4" por um laço de probabilidade 1.
+RUIN = [(f"S{i}", f"S{i + step}", 1) for i in range(1, 4) for step in (-1, 1)] + [("S4", "S4", 1)]
+
+
+def dense_reference(matrix, transient, absorbing):
+    """Matriz fundamental N = (I - Q)^-1 e B = N R, calculadas de forma densa."""
+    fundamental = np.linalg.inv(np.eye(len(transient)) - matrix[np.ix_(transient, transient)])
+    return fundamental, fundamental @ matrix[np.ix_(transient, absorbing)]
+
+
+@pytest.mark.parametrize("compact", [False, True], ids=["objects", "compact"])
+def test_gamblers_ruin_closed_form(compact):
+    analysis = build_graph(RUIN, compact=compact).absorbing_analysis()
+
+    assert sorted(analysis.absorbing_names) == ["s0", "s4"]
+    assert sorted(analysis.transient_names) == ["s1", "s2", "s3"]
+    for i in range(1, 4):
+        probabilities = analysis.absorption_probabilities(f"s{i}")
+        assert probabilities["s4"] == pytest.approx(i / 4)
+        assert probabilities["s0"] == pytest.approx(1 - i / 4)
+        assert analysis.expected_steps(f"s{i}") == pytest.approx(i * (4 - i))
+
+    assert analysis.expected_steps("s4") == 0.0
+    assert analysis.absorption_probabilities("s0") == {"s0": 1.0, "s4": 0.0}
+    assert analysis.expected_visits("s2")["s2"] == pytest.approx(2.0)
+
+
+def test_random_chain_matches_the_dense_fundamental_matrix():
+    rng = np.random.default_rng(4)
+    n, n_absorbing = 25, 3
+    matrix = rng.random((n, n)) * (rng.random((n, n)) < 0.3)
+    matrix[:, n - n_absorbing:] += 0.05
+    matrix[n - n_absorbing:] = 0.0
+    matrix /= np.where(matrix.sum(axis=1, keepdims=True) > 0, matrix.sum(axis=1, keepdims=True), 1.0)
+    chain = _as_chain(matrix)
+    analysis = AbsorbingAnalysis(chain)
+
+    transient, absorbing = np.arange(n - n_absorbing), np.arange(n - n_absorbing, n)
+    np.testing.assert_array_equal(analysis.transient, transient)
+    fundamental, absorption = dense_reference(matrix, transient, absorbing)
+    starts = [chain.names[i] for i in transient]
+
+    np.testing.assert_allclose(analysis.fundamental_rows(starts), fundamental, rtol=1e-10)
+    np.testing.assert_allclose(analysis.absorption_matrix(starts), absorption, rtol=1e-10)
+    np.testing.assert_allclose(analysis.expected_steps_all(), fundamental.sum(axis=1), rtol=1e-10)
+    np.testing.assert_allclose(analysis.absorption_matrix(starts).sum(axis=1), 1.0)
+
+
+def test_analysis_is_cached_until_the_chain_changes():
+    graph = build_graph(RUIN)
+    analysis = graph.absorbing_analysis()
+    assert graph.absorbing_analysis() is analysis
+
+    graph.update_observations([("S2", "S3", 2)])
+    updated = graph.absorbing_analysis()
+    assert updated is not analysis
+    assert updated.absorption_probabilities("s2")["s4"] > 0.5
+
+
+def test_chains_without_reachable_absorption_are_rejected(graph):
+    with pytest.raises(ValueError):
+        graph.absorbing_analysis()
+    with pytest.raises(ValueError):
+        build_graph([("A", "B", 1), ("B", "A", 1), ("C", "D", 1)]).absorbing_analysis()
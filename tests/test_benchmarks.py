@@ -0,0 +1,64 @@
+import json
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from benchmarks.generators import GENERATORS, dense, grid, power_law, random_sparse
+from benchmarks.run import format_row, main, run_case
+from src.markov_model.graph import Graph
+
+
+@pytest.mark.parametrize("name", sorted(GENERATORS))
+def test_generators_are_seeded_and_build_valid_chains(name):
+    observations = GENERATORS[name](64, seed=3)
+    assert observations == GENERATORS[name](64, seed=3)
+    assert observations != GENERATORS[name](64, seed=4)
+    assert all(count > 0 for _, _, count in observations)
+
+    graph = Graph()
+    graph.build_from_observations(observations)
+    assert graph.validate_probabilities()
+
+
+def test_generator_shapes():
+    assert Counter(origin for origin, _, _ in random_sparse(50, avg_degree=3)) == {f"s{i}": 3 for i in range(50)}
+    assert len(dense(6)) == 36
+
+    cells = {int(name[1:]) for origin, dest, _ in grid(100, drop=0.0) for name in (origin, dest)}
+    assert cells == set(range(100))
+    # Sem remoções, a grade 10 x 10 tem 4 * 10 * 9 ligações entre vizinhos.
+    assert len(grid(100, drop=0.0)) == 360
+
+    degrees = np.array(list(Counter(origin for origin, _, _ in power_law(2000, max_degree=50)).values()))
+    assert degrees.max() <= 50
+    assert np.median(degrees) < degrees.mean()
+
+
+def test_run_writes_json_results(tmp_path, capsys):
+    output = tmp_path / "results.json"
+    main(["--generators", "grid", "dense", "--sizes", "16", "--repeat", "1", "--walkers", "20",
+          "--steps", "5", "--output", str(output)])
+
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert set(report["environment"]) >= {"timestamp", "python", "numpy"}
+    operations = {row["operation"] for row in report["results"]}
+    assert {"build_from_observations", "validate_probabilities", "calculate_path_probability",
+            "find_all_paths", "simulate"} <= operations
+    assert {(row["generator"], row["backend"]) for row in report["results"]} == \
+        {(generator, backend) for generator in ("grid", "dense") for backend in ("objects", "compact")}
+    assert all(row["seconds"] >= 0 and row["peak_bytes"] >= 0 for row in report["results"])
+
+
+def test_run_case_backends_agree_on_the_chain():
+    objects = run_case("random", 30, "objects", repeat=1, n_paths=10, n_walkers=10, n_steps=2)
+    compact = run_case("random", 30, "compact", repeat=1, n_paths=10, n_walkers=10, n_steps=2)
+    assert [(row["n_states"], row["n_edges"]) for row in objects] == \
+        [(row["n_states"], row["n_edges"]) for row in compact]
+
+
+def test_summary_line_tolerates_missing_throughput():
+    row = {"generator": "grid", "size": 16, "backend": "compact", "operation": "simulate",
+           "seconds": 0.0, "peak_bytes": 0, "throughput": None, "unit": "transitions/s"}
+    assert format_row(row).split()[-2:] == ["-", "transitions/s"]
+    assert "1234.5" in format_row(dict(row, seconds=1.0, throughput=1234.5))
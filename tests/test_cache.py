@@ -0,0 +1,114 @@
+import pytest
+
+from conftest import build_graph
+from src.markov_model.cache import QueryCache
+
+
+def walk_names(graph, n_steps, seed=0):
+    trajectory = graph.simulate(1, n_steps, start="a", seed=seed).trajectories[:, 0]
+    names = graph.compile().names
+    return [names[state] for state in trajectory]
+
+
+def test_path_probability_hits_and_misses(graph):
+    stats = graph.enable_cache().stats
+    path = ["A", "B", "D", "A"]
+    expected = build_graph().calculate_path_probability(path)
+
+    assert graph.calculate_path_probability(path) == pytest.approx(expected)
+    assert (stats.hits, stats.misses) == (0, 1)
+    assert graph.calculate_path_probability(["a", "b", "d", "a"]) == pytest.approx(expected)
+    assert (stats.hits, stats.misses) == (1, 1)
+    assert graph.cache_stats() is stats
+
+
+def test_prefixes_are_shared_and_extended(graph):
+    cache = graph.enable_cache()
+    graph.calculate_path_probability(["a", "b", "d", "a"])
+    entries = len(cache)
+    assert entries == 4
+
+    # Só o novo sufixo é guardado: o prefixo a -> b -> d já está na trie.
+    assert graph.calculate_path_probability(["a", "b", "d", "a", "c"]) == pytest.approx(0.75 * 0.5 * 0.25)
+    assert len(cache) == entries + 1
+    assert graph.calculate_path_probability(["a", "b", "c"]) == pytest.approx(0.375)
+    assert len(cache) == entries + 2
+    # Um prefixo guardado também responde por si só.
+    assert graph.calculate_path_probability(["a", "b"]) == pytest.approx(0.75)
+    assert cache.stats.hits == 1
+
+
+def test_impossible_prefix_answers_longer_paths(graph):
+    cache = graph.enable_cache()
+    assert graph.calculate_path_probability(["a", "d", "a"]) == 0.0
+    hits = cache.stats.hits
+    assert graph.calculate_path_probability(["a", "d", "a", "b", "c"]) == 0.0
+    assert cache.stats.hits == hits + 1
+
+
+def test_long_paths_use_linear_space_and_match_uncached(graph):
+    path = walk_names(graph, 400)
+    expected = graph.calculate_path_probability(path)
+    cache = graph.enable_cache()
+
+    assert graph.calculate_path_probability(path) == expected
+    assert len(cache) == len(path)
+    assert graph.calculate_path_probability(path[:250]) == build_graph().calculate_path_probability(path[:250])
+    assert len(cache) == len(path)
+
+
+def test_changes_invalidate_the_cache(graph):
+    cache = graph.enable_cache()
+    assert graph.calculate_path_probability(["d", "a"]) == 1.0
+    graph.find_all_paths("a", "d", max_depth=4)
+
+    graph.add_edge("D", "B", count=4)
+    assert graph.calculate_path_probability(["d", "a"]) == pytest.approx(0.5)
+    assert cache.stats.invalidations == 1
+    assert ["c", "d", "b"] in [path for path, _ in graph.find_all_paths("c", "b", max_depth=3)]
+
+
+def test_find_all_paths_results_are_copies(graph):
+    graph.enable_cache()
+    first = graph.find_all_paths("a", "d", max_depth=4)
+    first[0][0].append("x")
+    first.clear()
+    assert graph.find_all_paths("a", "d", max_depth=4) == build_graph().find_all_paths("a", "d", max_depth=4)
+    assert graph.cache_stats().hits == 1
+
+
+def test_lru_eviction_by_entries_and_size():
+    cache = QueryCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.peek("b") is None and cache.peek("a") == 1
+    assert cache.stats.evictions == 1
+
+    sized = QueryCache(max_entries=10, max_size=5)
+    sized.put("big", "x", size=4)
+    sized.put("small", "y", size=2)
+    assert sized.peek("big") is None and sized.size == 2
+    sized.put("huge", "z", size=6)
+    assert sized.peek("huge") is None and sized.peek("small") == "y"
+
+
+def test_walk_touches_leaves_before_ancestors():
+    cache = QueryCache(max_entries=3)
+    node = cache.extend("p", None, "a", 1.0)
+    node = cache.extend("p", node, "b", 0.5)
+    cache.extend("p", node, "c", 0.25)
+    assert cache.walk("p", ["a", "b", "c"]) == (3, 3, 0.25)
+
+    cache.put("other", 0)
+    # A folha é descartada antes dos prefixos, que continuam respondendo.
+    assert cache.walk("p", ["a", "b"])[0] == 2
+    assert cache.walk("p", ["a", "b", "c"])[0] == 2
+
+
+def test_invalid_limits():
+    with pytest.raises(ValueError):
+        QueryCache(max_entries=0)
+    with pytest.raises(ValueError):
+        QueryCache(max_size=0)
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from conftest import build_graph
+from src.markov_model.compact import _INDEX_THRESHOLD, CompactStore
+
+HUB_DEGREE = 3 * _INDEX_THRESHOLD
+
+
+def hub_observations(rng, n_batches=30):
+    """Lotes aleatórios com um estado de saída muito alto grau, para exercitar o índice por linha."""
+    for _ in range(n_batches):
+        targets = rng.integers(0, HUB_DEGREE, 40)
+        yield [("hub", f"s{target}", int(count)) for target, count in zip(targets, rng.integers(1, 5, 40))] + \
+              [(f"s{target}", "hub", 1) for target in targets[:5]]
+
+
+def assert_index_consistent(store: CompactStore):
+    for source, positions in enumerate(store._positions):
+        if positions is not None:
+            assert positions == {target: pos for pos, target in enumerate(store.targets(source))}
+
+
+def test_compact_matches_object_storage_with_window_removals():
+    objects, compact = build_graph([]), build_graph([], compact=True)
+    for graph in (objects, compact):
+        graph.set_update_policy(window=3)
+        for batch in hub_observations(np.random.default_rng(11)):
+            graph.update_observations(batch)
+
+    assert list(compact.nodes["hub"].transitions) == list(objects.nodes["hub"].transitions)
+    dense_objects, dense_compact = objects.compile().to_dense(), compact.compile().to_dense()
+    assert compact.compile().names == objects.compile().names
+    np.testing.assert_allclose(dense_compact, dense_objects)
+    assert compact._store._positions[compact._store.index["hub"]] is not None
+    assert_index_consistent(compact._store)
+
+
+def test_high_degree_row_lookup_and_removal():
+    store = CompactStore()
+    hub = store.get_or_create("hub")
+    targets = [store.get_or_create(f"s{i}") for i in range(HUB_DEGREE)]
+    for i, target in enumerate(targets):
+        store.add_count(hub, target, i + 1.0)
+
+    assert store.count(hub, targets[-1]) == HUB_DEGREE
+    assert store.count(hub, hub) is None
+    for target in targets[::3]:
+        assert store.add_count(hub, target, -store.count(hub, target)) is False
+    assert_index_consistent(store)
+
+    remaining = [target for i, target in enumerate(targets) if i % 3]
+    assert list(store.targets(hub)) == remaining
+    assert store.total(hub) == pytest.approx(sum(i + 1.0 for i in range(HUB_DEGREE) if i % 3))
+    assert store.add_count(hub, targets[0], 2.0) is True
+    assert store.count(hub, targets[0]) == 2.0
+    assert_index_consistent(store)
+
+
+def test_edge_views_survive_stale_position_hints():
+    graph = build_graph([("A", f"S{i}", i + 1) for i in range(HUB_DEGREE)], compact=True)
+    edges = list(graph.nodes["a"].transitions.values())
+    total = HUB_DEGREE * (HUB_DEGREE + 1) / 2
+    assert [edge.get_weight() for edge in edges] == pytest.approx([(i + 1) / total for i in range(HUB_DEGREE)])
+
+    graph.nodes["a"].add_count(graph.nodes["s0"], -1)
+    # As posições guardadas nas visões antigas ficaram deslocadas; a busca não pode usá-las às cegas.
+    assert edges[0].get_count() is None
+    assert [edge.get_count() for edge in edges[1:]] == [float(i + 1) for i in range(1, HUB_DEGREE)]
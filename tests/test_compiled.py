@@ -0,0 +1,37 @@
+# tests/test_compiled.py
+import numpy as np
+
+from conftest import EXPECTED_MATRIX as EXPECTED, build_graph
+
+
+def test_compile_matches_node_probabilities(graph):
+    chain = graph.compile()
+    assert chain.names == ["a", "b", "c", "d"]
+    np.testing.assert_allclose(chain.to_dense(), EXPECTED)
+    for i in range(chain.n_states):
+        cols, _ = chain.row(i)
+        assert np.all(np.diff(cols) > 0)
+
+
+def test_compile_is_cached_until_the_graph_changes(graph):
+    chain = graph.compile()
+    assert graph.compile() is chain
+    graph.build_from_observations([("D", "B", 4)])
+    recompiled = graph.compile()
+    assert recompiled is not chain
+    assert recompiled.transition_probability(recompiled.index["d"], recompiled.index["b"]) == 0.5
+
+
+def test_lookup_is_vectorized_and_zero_for_missing_pairs(graph):
+    chain = graph.compile()
+    sources = np.array([0, 0, 3, -1, 7])
+    targets = np.array([1, 3, 0, 0, 0])
+    np.testing.assert_allclose(chain.lookup(sources, targets), [0.75, 0.0, 1.0, 0.0, 0.0])
+
+
+def test_propagate_advances_distributions():
+    chain = build_graph().compile()
+    x = np.array([1.0, 0.0, 0.0, 0.0])
+    np.testing.assert_allclose(chain.propagate(x), x @ EXPECTED)
+    batch = np.eye(4)
+    np.testing.assert_allclose(chain.propagate(batch), EXPECTED.T)
@@ -0,0 +1,75 @@
+import logging
+
+import numpy as np
+import pytest
+
+from src.markov_model.convergence import convergence_report, leading_eigenvalues
+from src.markov_model.simulation import _as_chain
+
+
+def random_chain(n, density, seed):
+    rng = np.random.default_rng(seed)
+    matrix = rng.random((n, n)) * (rng.random((n, n)) < density)
+    matrix[np.arange(n), (np.arange(n) + 1) % n] += 0.1 # Garante a irredutibilidade
+    return matrix / matrix.sum(axis=1, keepdims=True)
+
+
+def dense_moduli(matrix):
+    return np.sort(np.abs(np.linalg.eigvals(matrix)))[::-1]
+
+
+def test_leading_eigenvalues_match_dense_eigvals():
+    matrix = random_chain(30, 0.2, seed=1)
+    values, converged = leading_eigenvalues(_as_chain(matrix), k=4)
+
+    assert converged
+    assert values[0] == 1.0
+    np.testing.assert_allclose(np.abs(values), dense_moduli(matrix)[:4], rtol=1e-6)
+
+
+def test_report_on_the_example_chain(graph):
+    report = graph.convergence_report(starts=["a", "d"], n_steps=60)
+    expected_slem = dense_moduli(graph.compile().to_dense())[1]
+
+    assert report.converged
+    assert report.slem == pytest.approx(expected_slem, rel=1e-6)
+    assert report.spectral_gap == pytest.approx(1 - expected_slem)
+    assert report.relaxation_time == pytest.approx(1 / (1 - expected_slem))
+    pi = report.stationary.distribution
+    np.testing.assert_allclose(report.tv[:, 0], 1 - pi[[0, 3]])
+    # A distância decai geometricamente, à taxa do SLEM.
+    assert (report.tv[:, -1] < 10 * expected_slem ** 60).all()
+    assert (report.mixing_times > 0).all()
+    assert report.as_dict()["converged"] is True
+
+
+@pytest.mark.parametrize("n", [2, 6])
+def test_periodic_cycles_have_no_gap(n):
+    matrix = np.roll(np.eye(n), 1, axis=1)
+    report = convergence_report(_as_chain(matrix), n_steps=10)
+
+    assert report.slem == pytest.approx(1.0)
+    assert report.spectral_gap == pytest.approx(0.0, abs=1e-9)
+    # A distribuição oscila e nunca chega a π.
+    assert (report.mixing_times == -1).all()
+
+
+def test_non_convergence_is_reported_with_an_estimate(caplog):
+    matrix = random_chain(300, 0.02, seed=2)
+    expected = dense_moduli(matrix)[1]
+    with caplog.at_level(logging.WARNING, logger="markov_model"):
+        values, converged = leading_eigenvalues(_as_chain(matrix), k=2, tol=1e-14, max_iter=1, ncv=4)
+
+    assert not converged
+    assert "Arnoldi" in caplog.text
+    assert abs(values[1]) == pytest.approx(expected, rel=0.05)
+
+
+def test_invalid_arguments(graph):
+    chain = graph.compile()
+    with pytest.raises(ValueError):
+        convergence_report(chain, n_steps=-1)
+    with pytest.raises(ValueError):
+        convergence_report(chain, n_eigenvalues=1)
+    with pytest.raises(ValueError):
+        convergence_report(chain, starts=["missing"])
@@ -0,0 +1,76 @@
+import gzip
+import json
+
+import numpy as np
+import pytest
+
+from conftest import EXPECTED_MATRIX, OBSERVATIONS
+from src.utils.data_loader import (aggregate_observations, detect_format, iter_observation_chunks,
+                                   iter_observations, load_graph)
+
+
+def write_csv(path, rows, header="origin,dest,count", sep=","):
+    lines = ([header] if header else []) + [sep.join(map(str, row)) for row in rows]
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "wt") as handle:
+        handle.write("\n".join(lines) + "\n")
+    return path
+
+
+def split_counts(observations):
+    """Repete cada transição em linhas de contagem 1, para exercitar a agregação."""
+    return [(origin, dest, 1) for origin, dest, count in observations for _ in range(count)]
+
+
+def test_detect_format():
+    assert detect_format("obs.csv") == "csv"
+    assert detect_format("obs.tsv.gz") == "csv"
+    assert detect_format("obs.jsonl.gz") == "jsonl"
+    with pytest.raises(ValueError):
+        detect_format("obs.parquet")
+
+
+@pytest.mark.parametrize("name", ["obs.csv", "obs.csv.gz"])
+def test_load_graph_aggregates_across_chunks(tmp_path, name):
+    path = write_csv(tmp_path / name, split_counts(OBSERVATIONS))
+    graph = load_graph(path, chunk_size=3)
+    chain = graph.compile()
+
+    assert chain.names == ["a", "b", "c", "d"]
+    np.testing.assert_allclose(chain.to_dense(), EXPECTED_MATRIX)
+
+
+def test_chunks_respect_chunk_size(tmp_path):
+    path = write_csv(tmp_path / "obs.csv", split_counts(OBSERVATIONS))
+    sizes = [len(chunk) for chunk in iter_observation_chunks(path, chunk_size=4)]
+    assert max(sizes) <= 4
+    assert sum(sizes) == sum(count for _, _, count in OBSERVATIONS)
+
+
+def test_aggregate_lowercases_names(tmp_path):
+    path = write_csv(tmp_path / "obs.csv", [("A", "B", 2), ("a", "b", 3), ("A", "C", 1)])
+    counts = aggregate_observations(iter_observation_chunks(path, chunk_size=1))
+    assert counts == {("a", "b"): 5, ("a", "c"): 1}
+
+
+@pytest.mark.parametrize("as_list", [False, True], ids=["objects", "lists"])
+def test_jsonl_gzip(tmp_path, as_list):
+    path = tmp_path / "obs.jsonl.gz"
+    with gzip.open(path, "wt") as handle:
+        for origin, dest, count in OBSERVATIONS:
+            record = [origin, dest, count] if as_list else {"origin": origin, "dest": dest, "count": count}
+            handle.write(json.dumps(record) + "\n")
+    assert sorted(iter_observations(path, chunk_size=2)) == sorted(OBSERVATIONS)
+
+
+def test_tsv_without_header_and_custom_columns(tmp_path):
+    rows = [(origin, dest, count, "x") for origin, dest, count in OBSERVATIONS]
+    headless = write_csv(tmp_path / "obs.tsv", rows, header=None, sep="\t")
+    assert sorted(iter_observations(headless, header=False)) == sorted(OBSERVATIONS)
+
+    renamed = write_csv(tmp_path / "renamed.csv", [(count, dest, origin) for origin, dest, count in OBSERVATIONS],
+                        header="n,to,from")
+    assert sorted(iter_observations(renamed, columns=("from", "to", "n"))) == sorted(OBSERVATIONS)
+
+    with pytest.raises(ValueError):
+        list(iter_observation_chunks(renamed, columns=("from", "to")))
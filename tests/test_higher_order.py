@@ -0,0 +1,83 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from src.markov_model.graph import Graph
+from src.markov_model.higher_order import HigherOrderEstimator
+
+
+def count_kgrams(trajectories, order):
+    counts = Counter()
+    for trajectory in trajectories:
+        names = [name.lower() for name in trajectory]
+        for i in range(order, len(names)):
+            counts[tuple(names[i - order:i + 1])] += 1
+    return counts
+
+
+def decoded(estimator):
+    grams, counts = estimator.kgrams()
+    return Counter({tuple(estimator.states[state] for state in gram): count
+                    for gram, count in zip(grams.tolist(), counts.tolist())})
+
+
+def test_order_two_observations():
+    graph, estimator = Graph.from_trajectories([["A", "B", "C", "D"], ["a", "b", "c", "d"],
+                                                ["a", "b", "c", "e"], ["x", "b", "c"], ["b", "c"]])
+    assert sorted(estimator.observations()) == [("a|b", "b|c", 3), ("b|c", "c|d", 2), ("b|c", "c|e", 1),
+                                                ("x|b", "b|c", 1)]
+    assert estimator.n_trajectories == 5
+    assert graph.calculate_path_probability(["b|c", "c|d"]) == pytest.approx(2 / 3)
+    assert estimator.context_name(["x", "A", "B"]) == "a|b"
+
+
+@pytest.mark.parametrize("order", [1, 2, 3, 4])
+def test_kgram_counts_match_a_direct_count(order):
+    rng = np.random.default_rng(order)
+    alphabet = np.array(list("abcdefg"))
+    trajectories = [alphabet[rng.integers(0, 7, rng.integers(0, 12))].tolist() for _ in range(300)]
+    estimator = HigherOrderEstimator(order=order)
+    estimator.add_trajectories(trajectories, batch_size=37)
+
+    assert decoded(estimator) == count_kgrams(trajectories, order)
+
+
+def test_order_three_with_many_states():
+    # Mais de 2**15 estados distintos: cada estado precisa de mais de 15 bits na chave.
+    n = 40_000
+    names = np.array([f"s{i}" for i in range(n)])
+    estimator = HigherOrderEstimator(order=3)
+    estimator.add_arrays(np.concatenate([names, names[::-1]]), np.array([n, n]))
+
+    expected = count_kgrams([names.tolist(), names[::-1].tolist()], 3)
+    assert estimator.n_kgrams == len(expected)
+    grams, counts = estimator.kgrams()
+    assert grams.max() == n - 1
+    assert decoded(estimator) == expected
+
+
+def test_integer_input_and_marginal():
+    estimator = HigherOrderEstimator(order=1)
+    estimator.add_trajectories([["a", "b", "a"]])
+    estimator.add_arrays(np.array([1, 0, 1]), np.array([3]))
+    assert decoded(estimator) == {("a", "b"): 2, ("b", "a"): 2}
+    with pytest.raises(ValueError):
+        estimator.add_arrays(np.array([0, 5]), np.array([2]))
+    with pytest.raises(ValueError):
+        estimator.add_arrays(np.array([0, 1]), np.array([3]))
+
+    order_two = HigherOrderEstimator(order=2)
+    assert order_two.marginal({"a|b": 0.25, "c|b": 0.25, "b|a": 0.5}) == {"b": 0.5, "a": 0.5}
+
+
+def test_invalid_configuration_and_names():
+    with pytest.raises(ValueError):
+        HigherOrderEstimator(order=0)
+    with pytest.raises(ValueError):
+        HigherOrderEstimator(separator="")
+    estimator = HigherOrderEstimator(order=2)
+    with pytest.raises(ValueError):
+        estimator.add_trajectories([["a|b", "c", "d"]])
+    with pytest.raises(ValueError):
+        estimator.context_name(["a"])
@@ -0,0 +1,104 @@
+import pytest
+
+from conftest import OBSERVATIONS, build_graph
+from src.markov_model.instrumentation import Instrumentation, instrumentation
+
+
+@pytest.fixture
+def shared():
+    """A instância global, sempre devolvida desligada e zerada."""
+    instrumentation.reset()
+    yield instrumentation
+    instrumentation.enabled = False
+    instrumentation.reset()
+
+
+def test_disabled_by_default_collects_nothing(shared):
+    assert not shared.active
+    graph = build_graph()
+    graph.find_all_paths("a", "d", max_depth=5)
+    assert shared.counters == {}
+    assert shared.timings == {}
+
+
+def test_profile_collects_only_inside_the_block(shared):
+    with shared.profile() as report:
+        assert shared.active
+        graph = build_graph()
+        graph.calculate_path_probability(["a", "b", "d"])
+    assert not shared.active
+
+    assert report.counters["nodes_created"] == 4
+    assert report.counters["edges_created"] == len(OBSERVATIONS)
+    assert report.timings["build"].calls == 1
+    assert report.timings["query"].calls == 1
+    assert report.elapsed >= report.timings["build"].total
+    assert set(report.as_dict()) == {"elapsed", "counters", "timings"}
+
+    build_graph()
+    assert report.counters["nodes_created"] == 4
+
+
+def test_enabled_accumulates_until_reset(shared):
+    shared.enabled = True
+    build_graph()
+    build_graph(compact=True)
+    assert shared.counters["nodes_created"] == 8
+    assert shared.timings["build"].calls == 2
+
+    shared.reset()
+    assert shared.counters == {} and shared.timings == {}
+
+
+def test_hooks_receive_measurements_and_activate_collection():
+    local = Instrumentation()
+    calls = []
+    hook = lambda name, seconds: calls.append((name, seconds))  # noqa: E731
+
+    local.add_hook(hook)
+    assert local.active
+    with local.timed("block"):
+        pass
+    local.remove_hook(hook)
+    assert not local.active
+    with local.timed("block"):
+        pass
+
+    assert [name for name, _ in calls] == ["block"]
+    assert calls[0][1] >= 0.0
+    assert local.timings["block"].calls == 1
+
+
+def test_timed_decorator_preserves_the_function():
+    local = Instrumentation(enabled=True)
+
+    @local.timed("double")
+    def double(value):
+        """Dobra o valor."""
+        return 2 * value
+
+    assert double(21) == 42
+    assert double.__name__ == "double" and double.__doc__ == "Dobra o valor."
+    assert local.timings["double"].calls == 1
+
+    local.enabled = False
+    assert double(1) == 2
+    assert local.timings["double"].calls == 1
+
+
+def test_timed_records_even_when_the_block_raises():
+    local = Instrumentation(enabled=True)
+    with pytest.raises(RuntimeError):
+        with local.timed("failing"):
+            raise RuntimeError("falha")
+    assert local.timings["failing"].calls == 1
+
+
+def test_convergence_report_is_timed_under_its_own_name(shared):
+    graph = build_graph()
+    with shared.profile() as report:
+        graph.convergence_report(n_steps=5)
+
+    assert report.timings["convergence"].calls == 1
+    # A solução estacionária interna é contada uma única vez, sob o seu próprio nome.
+    assert report.timings["stationary"].calls == 1
@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+
+from conftest import build_graph
+from src.markov_model.lumping import lump
+from src.markov_model.simulation import _as_chain
+
+
+def ring(n):
+    return [(f"S{i}", f"S{(i + step) % n}", 1) for i in range(n) for step in (-1, 1)]
+
+
+def block_spread(lumped):
+    """Maior diferença entre P(s, B) de dois membros de um mesmo bloco, sobre todos os blocos B."""
+    matrix = lumped.original.to_dense()
+    indicator = np.eye(lumped.n_blocks)[lumped.labels]
+    aggregated = matrix @ indicator
+    spread = 0.0
+    for block in range(lumped.n_blocks):
+        rows = aggregated[lumped.labels == block]
+        spread = max(spread, float((rows.max(axis=0) - rows.min(axis=0)).max()))
+    return spread
+
+
+def random_chain(n, seed):
+    rng = np.random.default_rng(seed)
+    base = rng.random((4, n)) * (rng.random((4, n)) < 0.3) + 0.01
+    # Cada estado copia, com ruído pequeno, uma de 4 linhas-modelo: há blocos quase agrupáveis.
+    matrix = base[rng.integers(0, 4, n)] * (1 + 0.02 * rng.random((n, n)))
+    return matrix / matrix.sum(axis=1, keepdims=True)
+
+
+def test_symmetric_ring_lumps_exactly():
+    graph = build_graph(ring(8))
+    assert graph.lump().n_blocks == 1
+
+    lumped = graph.lump(keep=["s0"])
+    # Os blocos são as distâncias até s0: {0}, {1, 7}, {2, 6}, {3, 5}, {4}.
+    assert lumped.n_blocks == 5
+    assert sorted(lumped.members(lumped.labels[lumped.original.index_of("s1")])) == ["s1", "s7"]
+    assert lumped.block_of("s6") == "s2"
+    assert lumped.error == pytest.approx(0.0, abs=1e-12)
+    assert lumped.reduction == pytest.approx(8 / 5)
+
+    # A cadeia é periódica: a iteração de potência não converge, então resolve-se o sistema.
+    pi = graph.stationary_distribution(method="solve").distribution
+    quotient_pi = lumped.to_graph().stationary_distribution(method="solve").distribution
+    np.testing.assert_allclose(quotient_pi, lumped.aggregate(pi), atol=1e-9)
+    np.testing.assert_allclose(lumped.lift_distribution(quotient_pi), pi, atol=1e-9)
+
+
+def test_tolerance_groups_close_rows_not_grid_cells():
+    # a, b e c vão para x com 0.124, 0.126 e 0.076: a e b diferem 0.002 e ficam sempre juntos;
+    # c fica com eles só se a tolerância cobre a distância até b (0.05).
+    graph = build_graph([("A", "X", 124), ("A", "Y", 876), ("B", "X", 126), ("B", "Y", 874),
+                         ("C", "X", 76), ("C", "Y", 924), ("X", "Y", 1), ("Y", "X", 1)])
+    lumped = graph.lump(tol=0.05, keep=["x", "y"])
+
+    assert lumped.block_of("a") == lumped.block_of("b")
+    assert lumped.block_of("x") != lumped.block_of("y")
+    assert lumped.block_of("c") == lumped.block_of("a")
+    assert block_spread(lumped) <= 0.05 + 1e-12
+
+    narrower = graph.lump(tol=0.049, keep=["x", "y"])
+    assert narrower.block_of("a") == narrower.block_of("b") != narrower.block_of("c")
+    assert block_spread(narrower) <= 0.049
+    assert graph.lump(tol=0.001, keep=["x", "y"]).n_blocks == 5
+
+
+@pytest.mark.parametrize("tol", [0.002, 0.01, 0.03])
+def test_members_stay_within_tolerance(tol):
+    chain = _as_chain(random_chain(120, seed=7))
+    lumped = lump(chain, tol=tol)
+
+    assert lumped.n_blocks < chain.n_states
+    assert block_spread(lumped) <= tol + 1e-12
+
+
+def test_geometric_spacing_falls_back_to_windows():
+    # Lacunas decrescentes: cada rodada de divisão pela maior lacuna separa um único estado,
+    # então as rodadas se esgotam e o restante é dividido em janelas.
+    n = 300
+    to_x = 0.4 * 0.98 ** np.arange(n)
+    matrix = np.zeros((n + 2, n + 2))
+    matrix[:n, n], matrix[:n, n + 1] = to_x, 1 - to_x
+    matrix[n, n + 1] = matrix[n + 1, n] = 1.0
+    lumped = lump(_as_chain(matrix), tol=0.05, keep=[str(n), str(n + 1)])
+
+    assert block_spread(lumped) <= 0.05 + 1e-12
+    assert lumped.n_blocks < n
+
+
+@pytest.mark.parametrize("weights", [False, True])
+def test_error_bound_on_aggregated_distributions(weights):
+    matrix = random_chain(80, seed=3)
+    chain = _as_chain(matrix)
+    pi = np.linalg.matrix_power(matrix.T, 500)[:, 0]
+    lumped = lump(chain, tol=0.02, weights=pi if weights else None)
+    quotient = lumped.chain.to_dense()
+    assert lumped.error > 0
+
+    x = np.random.default_rng(0).dirichlet(np.ones(80))
+    original, reduced = x.copy(), lumped.aggregate(x)
+    for t in range(1, 30):
+        original, reduced = original @ matrix, reduced @ quotient
+        assert np.abs(lumped.aggregate(original) - reduced).sum() <= t * lumped.error + 1e-12
+
+
+def test_terminal_states_keep_and_initial_partitions():
+    graph = build_graph([("A", "C", 1), ("B", "D", 1)])
+    lumped = graph.lump()
+    # c e d são terminais: ficam juntos, mas nunca com a e b.
+    assert lumped.n_blocks == 2
+    assert lumped.block_of("c") == lumped.block_of("d") != lumped.block_of("a")
+
+    chain = graph.compile()
+    assert lump(chain, initial=np.array([0, 1, 0, 0])).n_blocks == 4
+    with pytest.raises(ValueError):
+        lump(chain, tol=0.0)
+    with pytest.raises(ValueError):
+        lump(chain, initial=np.zeros(3))
+    with pytest.raises(ValueError):
+        lump(chain, keep=["missing"])
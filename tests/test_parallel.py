@@ -0,0 +1,53 @@
+import itertools
+
+import pytest
+
+from conftest import build_graph
+from src.markov_model import paths
+from src.markov_model.compiled import CompiledChain
+
+STATES = "abcd"
+PAIRS = list(itertools.product(STATES, STATES))
+
+
+def by_pair(results):
+    return {(start, end): result for start, end, result in results}
+
+
+@pytest.fixture(scope="module")
+def graph():
+    return build_graph()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_reach_batch_matches_single_queries(graph, workers):
+    results = by_pair(graph.batch_query(PAIRS, "reach", workers=workers, chunk_size=3, max_steps=6))
+    assert results.keys() == set(PAIRS)
+    for (start, end), result in results.items():
+        assert result.probability == pytest.approx(graph.reach_probability(start, end, 6).probability)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_top_k_batch_matches_single_queries(graph, workers):
+    results = by_pair(graph.batch_query(PAIRS, "top_k", workers=workers, chunk_size=5, k=3, max_depth=5))
+    for (start, end), paths in results.items():
+        expected = graph.top_k_paths(start, end, 3, max_depth=5)
+        assert [prob for _, prob in paths] == pytest.approx([prob for _, prob in expected])
+
+
+def test_paths_batch_matches_iter_paths(graph):
+    results = by_pair(graph.batch_query([("a", "d"), ("c", "b")], "paths", workers=2, chunk_size=1, max_depth=5))
+    for (start, end), paths in results.items():
+        expected = {tuple(path): prob for path, prob in graph.iter_paths(start, end, max_depth=5)}
+        assert {tuple(path): prob for path, prob in paths} == pytest.approx(expected)
+
+
+def test_invalid_batches_fail_before_any_work(graph):
+    with pytest.raises(ValueError):
+        graph.batch_query(PAIRS, "reach")
+    with pytest.raises(ValueError):
+        graph.batch_query(PAIRS, "unknown", max_steps=3)
+    with pytest.raises(ValueError):
+        graph.batch_query(PAIRS, "reach", chunk_size=0, max_steps=3)
+    with pytest.raises(ValueError):
+        graph.batch_query([("a", "b"), ("a", "missing")], "reach", max_steps=3)
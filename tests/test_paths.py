@@ -0,0 +1,152 @@
+# tests/test_paths.py
+import itertools
+
+import numpy as np
+import pytest
+
+from conftest import build_graph
+from src.markov_model import paths
+
+STATES = ["a", "b", "c", "d"]
+PAIRS = [(start, end) for start, end in itertools.product(STATES, STATES) if start != end]
+
+
+@pytest.mark.parametrize("start,end", PAIRS)
+def test_reach_probability_matches_find_all_paths(graph, start, end):
+    max_steps = 6
+    paths = graph.find_all_paths(start, end, max_depth=max_steps + 1)
+    result = graph.reach_probability(start, end, max_steps)
+
+    assert result.probability == pytest.approx(sum(prob for _, prob in paths))
+    by_length = np.zeros(max_steps + 1)
+    for path, prob in paths:
+        by_length[len(path) - 1] += prob
+    np.testing.assert_allclose(result.first_passage, by_length, atol=1e-12)
+    assert result.cumulative[-1] == pytest.approx(result.probability)
+
+
+def test_reach_probability_rejects_unknown_states(graph):
+    with pytest.raises(ValueError):
+        graph.reach_probability("a", "z", 3)
+    with pytest.raises(ValueError):
+        graph.reach_probability("a", "b", -1)
+
+
+@pytest.mark.parametrize("start,end", PAIRS)
+def test_top_k_paths_are_the_most_probable_of_find_all_paths(graph, start, end):
+    max_depth, k = 6, 4
+    expected = sorted(graph.find_all_paths(start, end, max_depth=max_depth), key=lambda item: -item[1])[:k]
+    found = graph.top_k_paths(start, end, k, max_depth=max_depth)
+
+    assert [prob for _, prob in found] == pytest.approx([prob for _, prob in expected])
+    all_paths = {tuple(path): prob for path, prob in graph.find_all_paths(start, end, max_depth=max_depth)}
+    for path, prob in found:
+        assert all_paths[tuple(path)] == pytest.approx(prob)
+
+
+def test_top_k_paths_log_space_and_min_prob(graph):
+    linear = graph.top_k_paths("a", "d", 3, max_depth=5)
+    logs = graph.top_k_paths("a", "d", 3, max_depth=5, log_space=True)
+    assert [path for path, _ in logs] == [path for path, _ in linear]
+    assert [np.exp(value) for _, value in logs] == pytest.approx([prob for _, prob in linear])
+
+    threshold = linear[1][1]
+    pruned = graph.top_k_paths("a", "d", 3, max_depth=5, min_prob=threshold)
+    assert all(prob >= threshold for _, prob in pruned)
+    assert len(pruned) == 2
+
+
+def test_top_k_paths_validates_arguments(graph):
+    with pytest.raises(ValueError):
+        graph.top_k_paths("a", "d", 0)
+    with pytest.raises(ValueError):
+        graph.top_k_paths("a", "d", 1, max_depth=0)
+
+
+@pytest.mark.parametrize("start,end", PAIRS)
+def test_iter_paths_yields_the_same_paths_as_find_all_paths(graph, start, end):
+    expected = {tuple(path): prob for path, prob in graph.find_all_paths(start, end, max_depth=6)}
+    found = {tuple(path): prob for path, prob in graph.iter_paths(start, end, max_depth=6)}
+
+    assert found.keys() == expected.keys()
+    for path, prob in found.items():
+        assert prob == pytest.approx(expected[path])
+
+
+def test_iter_paths_limit_and_min_prob(graph):
+    everything = list(graph.iter_paths("a", "d", max_depth=6))
+    assert len(list(graph.iter_paths("a", "d", max_depth=6, limit=2))) == 2
+
+    threshold = 0.1
+    pruned = list(graph.iter_paths("a", "d", max_depth=6, min_prob=threshold))
+    assert all(prob >= threshold for _, prob in pruned)
+    assert len(pruned) == sum(prob >= threshold for _, prob in everything)
+
+
+def test_iter_paths_is_lazy(graph):
+    paths = graph.iter_paths("a", "d", max_depth=50)
+    path, prob = next(iter(paths))
+    assert path[0] == "a" and path[-1] == "d"
+    assert 0.0 < prob <= 1.0
+
+
+def test_path_probabilities_match_calculate_path_probability(graph):
+    paths = [list(path) for length in range(2, 6) for path in itertools.product("abcd", repeat=length)]
+    paths += [["A", "B", "D"], ["a", "x", "b"], ["a"]]
+    result = graph.calculate_path_probabilities(paths)
+
+    expected = np.array([graph.calculate_path_probability(path) for path in paths])
+    np.testing.assert_allclose(result.probabilities, expected, rtol=1e-12)
+    np.testing.assert_array_equal(result.valid, expected > 0)
+    assert result.log_probabilities[-1] == -np.inf
+    assert result.lengths.tolist()[-3:] == [3, 3, 1]
+
+
+def test_path_probabilities_flag_invalid_steps(graph):
+    result = graph.calculate_path_probabilities([["a", "b", "a", "c"], ["a", "unknown"]])
+
+    assert result.valid.tolist() == [False, False]
+    assert result.invalid_steps.tolist() == [[False, True, False], [True, False, False]]
+    assert result.probabilities.tolist() == [0.0, 0.0]
+
+
+def test_path_probabilities_accept_index_matrices(graph):
+    chain = graph.compile()
+    names = [["a", "b", "d", "a"], ["c", "d", "a", "b"], ["d", "a", "c", "c"]]
+    encoded = np.array([chain.indices_of(path) for path in names])
+    lengths = np.array([4, 3, 3])
+    result = graph.calculate_path_probabilities(encoded, lengths)
+
+    expected = [graph.calculate_path_probability(path[:length]) for path, length in zip(names, lengths)]
+    np.testing.assert_allclose(result.probabilities, expected)
+    with pytest.raises(ValueError):
+        graph.calculate_path_probabilities(encoded, np.array([5, 1, 1]))
+
+
+@pytest.mark.parametrize("max_depth", [0, 1, 3])
+def test_trivial_path_respects_max_depth(graph, max_depth):
+    expected = graph.find_all_paths("a", "a", max_depth=max_depth)
+    assert list(graph.iter_paths("a", "a", max_depth=max_depth)) == expected
+    batch = graph.batch_query([("a", "a")], "paths", workers=1, max_depth=max_depth)
+    assert [paths for _, _, paths in batch] == [expected]
+    assert (expected == []) == (max_depth < 1)
+
+
+def test_first_passage_matrix_propagates_in_column_chunks(monkeypatch):
+    chain = build_graph().compile()
+    starts = np.tile(np.arange(4), 5)
+    expected = paths.first_passage_matrix(chain, starts, 3, 8)
+
+    widths = []
+    propagate = chain.propagate
+
+    def spy(mass):
+        widths.append(mass.shape[1])
+        return propagate(mass)
+
+    monkeypatch.setattr(chain, "propagate", spy)
+    monkeypatch.setattr(paths, "PROPAGATION_BUDGET", 4 * 6) # 6 colunas de 4 estados
+    chunked = paths.first_passage_matrix(chain, starts, 3, 8)
+
+    assert max(widths) == 6 and set(widths) == {6, 2}
+    np.testing.assert_array_equal(chunked, expected)
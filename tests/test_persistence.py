@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from conftest import EXPECTED_MATRIX, build_graph
+from src.markov_model.graph import Graph
+from src.markov_model.persistence import HEADER, load_chain, save_chain
+
+
+@pytest.mark.parametrize("mmap", [True, False], ids=["mmap", "read"])
+def test_save_load_round_trip(graph, tmp_path, mmap):
+    path = tmp_path / "chain.mkv"
+    graph.save(path)
+    loaded = Graph.load(path, mmap=mmap)
+    chain, original = loaded.compile(), graph.compile()
+
+    assert chain.names == original.names
+    np.testing.assert_array_equal(chain.indptr, original.indptr)
+    np.testing.assert_array_equal(chain.indices, original.indices)
+    np.testing.assert_array_equal(chain.data, original.data)
+    # Mapeados, os vetores são visões somente leitura do arquivo, sem cópia.
+    assert isinstance(chain.data.base, np.memmap) == mmap
+    assert chain.data.flags.writeable != mmap
+
+    assert loaded.get_transition_count("a", "b") == pytest.approx(3)
+    assert loaded.calculate_path_probability(["a", "b", "d"]) == pytest.approx(0.375)
+    assert loaded.reach_probability("a", "d", 6).probability == pytest.approx(
+        graph.reach_probability("a", "d", 6).probability)
+
+
+def test_updates_after_load_resume_the_saved_counts(graph, tmp_path):
+    path = tmp_path / "chain.mkv"
+    graph.save(path)
+    loaded = Graph.load(path)
+
+    loaded.update_observations([("D", "B", 4), ("E", "A", 1)])
+    graph.update_observations([("D", "B", 4), ("E", "A", 1)])
+    assert loaded.get_transition_count("d", "b") == pytest.approx(4)
+    np.testing.assert_allclose(loaded.compile().to_dense(), graph.compile().to_dense())
+    # O arquivo original não é alterado pela cópia mutável.
+    np.testing.assert_allclose(Graph.load(path).compile().to_dense(), EXPECTED_MATRIX)
+
+
+def test_decayed_counts_are_saved_unscaled(tmp_path):
+    graph = build_graph()
+    graph.set_update_policy(decay=0.5)
+    graph.update_observations([("A", "D", 2)])
+    graph.save(tmp_path / "chain.mkv")
+
+    loaded = Graph.load(tmp_path / "chain.mkv")
+    for dest in "bcd":
+        assert loaded.get_transition_count("a", dest) == pytest.approx(graph.get_transition_count("a", dest))
+
+
+def test_chain_without_totals_and_empty_chain(tmp_path):
+    chain = build_graph().compile()
+    save_chain(chain, tmp_path / "plain.mkv")
+    loaded, totals = load_chain(tmp_path / "plain.mkv")
+    assert totals is None
+    np.testing.assert_allclose(loaded.to_dense(), EXPECTED_MATRIX)
+
+    Graph().save(tmp_path / "empty.mkv")
+    empty, _ = load_chain(tmp_path / "empty.mkv")
+    assert empty.n_states == 0 and empty.names == []
+
+
+def test_rejects_foreign_and_truncated_files(tmp_path):
+    foreign = tmp_path / "foreign.mkv"
+    foreign.write_bytes(b"\0" * HEADER.size)
+    with pytest.raises(ValueError):
+        load_chain(foreign)
+
+    truncated = tmp_path / "truncated.mkv"
+    truncated.write_bytes(b"MKVCHAIN")
+    with pytest.raises(ValueError):
+        load_chain(truncated)
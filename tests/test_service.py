@@ -0,0 +1,121 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from conftest import build_graph
+from src.markov_model import paths
+from src.markov_model.paths import reach_probability
+from src.markov_model.service import MAX_STEPS, QueryService, ServiceOverloaded, request_json
+
+
+def serve(coroutine_factory, **options):
+    """Roda `coroutine_factory(service, port)` contra um servidor em uma porta livre."""
+    async def main():
+        service = QueryService(build_graph().compile(), **options)
+        server = await service.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await coroutine_factory(service, port)
+        finally:
+            server.close()
+            await server.wait_closed()
+            service.close()
+    return asyncio.run(main())
+
+
+def test_batch_with_one_malformed_request():
+    payloads = [{"start": "a", "end": "d", "max_steps": 6}, {"start": "b", "end": "d", "max_steps": 6},
+                {"start": "a", "end": "d", "max_steps": "six"}, {"start": "c", "end": "d", "max_steps": 6},
+                {"start": "missing", "end": "d", "max_steps": 6}, {"start": "a", "end": "d"}]
+
+    async def scenario(service, port):
+        responses = await asyncio.gather(*(request_json("127.0.0.1", port, "reach", payload)
+                                           for payload in payloads))
+        return responses, service.metrics()["reach"]
+
+    responses, metrics = serve(scenario, window=0.05)
+    statuses = [status for status, _ in responses]
+    assert statuses == [200, 200, 400, 200, 400, 400]
+    chain = build_graph().compile()
+    for (status, body), payload in zip(responses, payloads):
+        if status == 200:
+            expected = reach_probability(chain, payload["start"], "d", 6)
+            assert body["probability"] == pytest.approx(expected.probability)
+            np.testing.assert_allclose(body["first_passage"], expected.first_passage)
+        else:
+            assert body["error"]
+    assert "max_steps" in responses[-1][1]["error"]
+    assert metrics["requests"] == 6 and metrics["batches"] == 1 and metrics["errors"] == 3
+
+
+def test_limits_and_malformed_bodies():
+    async def scenario(service, port):
+        return [
+            await request_json("127.0.0.1", port, "reach", {"start": "a", "end": "d", "max_steps": MAX_STEPS + 1}),
+            await request_json("127.0.0.1", port, "top_k", {"start": "a", "end": "d", "k": 10 ** 9}),
+            await request_json("127.0.0.1", port, "top_k", {"start": "a", "end": "d", "min_prob": "x"}),
+            await request_json("127.0.0.1", port, "stationary", {"states": "a"}),
+            await request_json("127.0.0.1", port, "path_probability", {"path": ["a", 1]}),
+            await request_json("127.0.0.1", port, "reach", ["not", "an", "object"]),
+            await request_json("127.0.0.1", port, "unknown", {}),
+        ]
+
+    statuses = [status for status, _ in serve(scenario)]
+    assert statuses == [400, 400, 400, 400, 400, 400, 404]
+
+
+def test_endpoints_and_metrics():
+    async def scenario(service, port):
+        return (await request_json("127.0.0.1", port, "path_probability", {"path": ["a", "b", "d"]}),
+                await request_json("127.0.0.1", port, "top_k", {"start": "a", "end": "d", "k": 2, "max_depth": 4}),
+                await request_json("127.0.0.1", port, "stationary", {"states": ["A", "d"]}),
+                await request_json("127.0.0.1", port, "health", method="GET"),
+                await request_json("127.0.0.1", port, "metrics", method="GET"))
+
+    probability, top_k, stationary, health, metrics = serve(scenario)
+    assert probability == (200, {"probability": pytest.approx(0.375), "valid": True})
+    assert [entry["path"] for entry in top_k[1]["paths"]] == [["a", "b", "d"], ["a", "b", "c", "d"]]
+    assert set(stationary[1]["distribution"]) == {"a", "d"}
+    assert health[1]["n_states"] == 4
+    status, body = metrics
+    assert status == 200 and set(body) == {"path_probability", "reach", "top_k", "stationary"}
+    assert body["top_k"]["requests"] == 1
+    assert body["top_k"]["latency_ms_p50"] >= 0
+
+
+def test_overload_is_rejected():
+    async def scenario(service, port):
+        return await asyncio.gather(*(service.call("reach", {"start": "a", "end": "d", "max_steps": 3})
+                                      for _ in range(3)), return_exceptions=True)
+
+    results = serve(scenario, window=0.05, max_pending=2)
+    assert sum(isinstance(result, ServiceOverloaded) for result in results) == 1
+    with pytest.raises(ValueError):
+        QueryService(build_graph().compile(), max_batch=0)
+
+
+def test_large_reach_group_is_propagated_in_chunks(monkeypatch):
+    starts = ["a", "b", "c"] * 4
+    widths = []
+    monkeypatch.setattr(paths, "PROPAGATION_BUDGET", 4 * 5) # 5 colunas de 4 estados
+
+    async def scenario(service, port):
+        propagate = service.chain.propagate
+
+        def spy(mass):
+            widths.append(mass.shape[1])
+            return propagate(mass)
+
+        service.chain.propagate = spy
+        responses = await asyncio.gather(*(service.call("reach", {"start": start, "end": "d", "max_steps": 6})
+                                           for start in starts))
+        return responses, service.metrics()["reach"]
+
+    responses, metrics = serve(scenario, window=0.05)
+    assert metrics["batches"] == 1 and widths and max(widths) == 5
+    chain = build_graph().compile()
+    for body, start in zip(responses, starts):
+        expected = reach_probability(chain, start, "d", 6)
+        assert body["probability"] == pytest.approx(expected.probability)
+        np.testing.assert_allclose(body["first_passage"], expected.first_passage)
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from conftest import EXPECTED_MATRIX, build_graph
+from src.markov_model.simulation import TransitionSampler, simulate
+
+
+def empirical_matrix(trajectories, n_states):
+    counts = np.zeros((n_states, n_states))
+    np.add.at(counts, (trajectories[:-1].ravel(), trajectories[1:].ravel()), 1)
+    return counts / counts.sum(axis=1, keepdims=True)
+
+
+def test_simulation_is_reproducible_with_a_seed(graph):
+    first = graph.simulate(50, 20, seed=7)
+    second = graph.simulate(50, 20, seed=7)
+    np.testing.assert_array_equal(first.trajectories, second.trajectories)
+    assert not np.array_equal(first.trajectories, graph.simulate(50, 20, seed=8).trajectories)
+
+
+def test_trajectories_and_visit_counts(graph):
+    result = graph.simulate(100, 30, start="a", seed=1)
+
+    assert result.trajectories.shape == (31, 100)
+    assert result.trajectories.dtype == np.uint16
+    assert (result.trajectories[0] == 0).all()
+    np.testing.assert_array_equal(result.final_states, result.trajectories[-1])
+    np.testing.assert_array_equal(result.visit_counts, np.bincount(result.trajectories.ravel(), minlength=4))
+    assert result.n_transitions == 3000
+    assert result.occupancy().sum() == pytest.approx(1.0)
+
+
+def test_empirical_transitions_match_the_chain(graph):
+    result = graph.simulate(2000, 100, seed=3)
+    observed = empirical_matrix(result.trajectories.astype(np.int64), 4)
+    np.testing.assert_allclose(observed, EXPECTED_MATRIX, atol=0.01)
+    # Transições inexistentes nunca são sorteadas.
+    assert (observed[EXPECTED_MATRIX == 0] == 0).all()
+
+
+def test_high_degree_rows_use_the_binary_search_fallback():
+    n = 3 * TransitionSampler.SCAN_STEPS
+    weights = np.arange(1, n + 1, dtype=np.float64)
+    matrix = np.tile(weights / weights.sum(), (n, 1))
+    result = simulate(matrix, 4000, 50, seed=5)
+
+    frequencies = np.bincount(result.trajectories[1:].ravel(), minlength=n) / (4000 * 50)
+    np.testing.assert_allclose(frequencies, matrix[0], atol=0.005)
+
+
+def test_absorbing_states_and_record_options(tmp_path):
+    graph = build_graph([("A", "B", 1), ("B", "C", 1)])
+    result = graph.simulate(10, 5, start="a", record=False)
+    assert result.trajectories is None
+    assert result.final_states.tolist() == [2] * 10
+
+    out = tmp_path / "walks.npy"
+    stored = graph.simulate(10, 5, start="a", seed=0, out=out)
+    np.testing.assert_array_equal(np.load(out), stored.trajectories)
+
+
+def test_invalid_arguments(graph):
+    with pytest.raises(ValueError):
+        graph.simulate(0, 10)
+    with pytest.raises(ValueError):
+        graph.simulate(10, 10, start=9)
+    with pytest.raises(ValueError):
+        graph.simulate(10, 10, start=np.zeros(4))
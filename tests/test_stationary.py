@@ -0,0 +1,68 @@
+# tests/test_stationary.py
+import numpy as np
+import pytest
+
+from conftest import EXPECTED_MATRIX, build_graph
+from src.markov_model.stationary import METHODS, stationary_distribution
+
+
+def reference_distribution() -> np.ndarray:
+    values, vectors = np.linalg.eig(EXPECTED_MATRIX.T)
+    pi = np.real(vectors[:, np.argmin(np.abs(values - 1.0))])
+    return pi / pi.sum()
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_all_methods_agree_with_the_dense_solution(graph, method):
+    result = graph.stationary_distribution(method=method)
+    assert result.converged
+    np.testing.assert_allclose(result.distribution, reference_distribution(), atol=1e-8)
+    assert result.names == ["a", "b", "c", "d"]
+    assert result.distribution @ EXPECTED_MATRIX == pytest.approx(result.distribution, abs=1e-8)
+
+
+def test_warm_start_reuses_the_previous_solution():
+    graph = build_graph()
+    cold = graph.stationary_distribution()
+    graph.update_observations([("A", "B", 1)])
+    warm = graph.stationary_distribution(warm_start=True)
+    assert warm.converged
+    assert warm.iterations <= cold.iterations
+
+
+def test_laziness_makes_periodic_chains_converge():
+    graph = build_graph([("A", "B", 1), ("B", "A", 1)])
+    start = np.array([1.0, 0.0])
+    assert not graph.stationary_distribution(max_iter=100, x0=start).converged
+    result = graph.stationary_distribution(laziness=0.5, x0=start)
+    assert result.converged
+    np.testing.assert_allclose(result.distribution, [0.5, 0.5])
+
+
+def test_terminal_states_absorb_the_mass():
+    result = build_graph([("A", "B", 1), ("A", "C", 1)]).stationary_distribution()
+    np.testing.assert_allclose(result.as_dict()["a"], 0.0, atol=1e-12)
+    assert result.as_dict()["b"] == pytest.approx(0.5)
+
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        stationary_distribution(build_graph().compile(), method="magic")
+
+
+def test_eigen_with_transient_states_is_non_negative_and_stationary():
+    # a é transiente; b <-> c é a única classe fechada.
+    chain = build_graph([("A", "B", 1), ("A", "A", 1), ("B", "C", 1), ("C", "B", 1), ("C", "C", 1)]).compile()
+    result = stationary_distribution(chain, method="eigen")
+    solved = stationary_distribution(chain, method="solve")
+
+    assert result.converged
+    assert (result.distribution >= 0).all()
+    np.testing.assert_allclose(result.distribution, solved.distribution, atol=1e-10)
+
+
+def test_eigen_rejects_several_closed_classes():
+    # Duas classes fechadas (a <-> b e c <-> d): qualquer mistura das duas é estacionária.
+    chain = build_graph([("A", "B", 1), ("B", "A", 1), ("C", "D", 1), ("D", "C", 1), ("C", "C", 1)]).compile()
+    with pytest.raises(ValueError, match="não é única"):
+        stationary_distribution(chain, method="eigen")
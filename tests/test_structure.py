@@ -0,0 +1,72 @@
+import math
+
+import numpy as np
+import pytest
+
+from conftest import build_graph
+from src.markov_model.simulation import _as_chain
+from src.markov_model.structure import ChainStructure
+
+
+def brute_force_period(matrix, state):
+    """mdc dos t <= 2n com P^t[i, i] > 0 (0 se o estado não está em nenhum ciclo)."""
+    reach = np.eye(len(matrix), dtype=bool)
+    period = 0
+    for t in range(1, 2 * len(matrix) + 1):
+        reach = (reach.astype(int) @ (matrix > 0).astype(int)) > 0
+        if reach[state, state]:
+            period = math.gcd(period, t)
+    return period
+
+
+def test_example_chain_is_ergodic(graph):
+    structure = graph.structure()
+    assert structure.n_classes == 1
+    assert structure.is_irreducible and structure.is_aperiodic and structure.is_ergodic
+    assert structure.periods.tolist() == [1]
+
+
+def test_classes_closed_and_transient():
+    # a <-> b é transiente (vaza para c); c -> d -> c é fechada com período 2; e é terminal.
+    graph = build_graph([("A", "B", 1), ("B", "A", 1), ("B", "C", 1), ("C", "D", 1), ("D", "C", 1),
+                         ("A", "E", 1)])
+    structure = graph.structure()
+
+    assert structure.n_classes == 3
+    assert structure.class_of("a") == structure.class_of("b")
+    assert structure.class_of("c") == structure.class_of("d")
+    cycle, ruin = structure.class_of("c"), structure.class_of("e")
+    assert sorted(structure.closed_classes.tolist()) == sorted([cycle, ruin])
+    assert structure.transient_classes.tolist() == [structure.class_of("a")]
+    assert structure.periods[cycle] == 2 and structure.periods[ruin] == 1
+    assert structure.class_names(cycle) == ["c", "d"]
+    assert not structure.is_irreducible and not structure.is_aperiodic and not structure.is_ergodic
+
+    sub = structure.subchain(cycle)
+    assert sub.names == ["c", "d"]
+    np.testing.assert_allclose(sub.to_dense(), [[0.0, 1.0], [1.0, 0.0]])
+    with pytest.raises(ValueError):
+        structure.subchain(structure.class_of("a"))
+
+
+def test_single_state_without_loop_has_period_zero():
+    structure = build_graph([("A", "B", 1), ("B", "B", 1)]).structure()
+    assert structure.periods[structure.class_of("a")] == 0
+    assert structure.periods[structure.class_of("b")] == 1
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_periods_match_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    n = 12
+    # Ciclos de comprimentos múltiplos de 3 ou 4, com alguns atalhos aleatórios.
+    step = 3 if seed % 2 else 4
+    matrix = np.zeros((n, n))
+    matrix[np.arange(n), (np.arange(n) + 1) % n] = 1.0
+    extra = rng.integers(0, n, 3)
+    matrix[extra, (extra + 1 + step * rng.integers(0, 2, 3)) % n] += 1.0
+    matrix /= matrix.sum(axis=1, keepdims=True)
+    structure = ChainStructure(_as_chain(matrix))
+
+    for state in range(n):
+        assert structure.periods[structure.labels[state]] == brute_force_period(matrix, state)
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from conftest import EXPECTED_MATRIX, build_graph
+
+
+def test_update_adds_to_existing_counts(graph):
+    graph.update_observations([("A", "B", 1), ("A", "E", 4)])
+
+    assert graph.get_transition_count("a", "b") == pytest.approx(4)
+    assert graph.get_transition_count("A", "E") == pytest.approx(4)
+    assert graph.get_transition_count("a", "d") == 0.0
+    assert graph.get_transition_count("missing", "a") == 0.0
+    assert graph.calculate_path_probability(["a", "e"]) == pytest.approx(4 / 9)
+    assert graph.calculate_path_probability(["a", "b"]) == pytest.approx(4 / 9)
+
+
+def test_update_invalidates_the_compiled_chain(graph):
+    before = graph.compile()
+    graph.update_observations([("D", "B", 4)])
+    after = graph.compile()
+
+    assert after is not before
+    d, a, b = after.indices_of(["d", "a", "b"])
+    assert after.transition_probability(d, b) == pytest.approx(0.5)
+    assert after.transition_probability(d, a) == pytest.approx(0.5)
+
+
+def test_sliding_window_forgets_old_batches(graph):
+    graph.set_update_policy(window=2)
+    graph.update_observations([("A", "D", 6)])
+    graph.update_observations([("A", "D", 2)])
+    assert graph.get_transition_count("a", "d") == pytest.approx(8)
+
+    graph.update_observations([("A", "B", 1)])
+    # O primeiro lote saiu da janela; as contagens iniciais (anteriores à política) ficam.
+    assert graph.get_transition_count("a", "d") == pytest.approx(2)
+    assert graph.get_transition_count("a", "b") == pytest.approx(4)
+
+    graph.update_observations([])
+    graph.update_observations([])
+    assert graph.get_transition_count("a", "d") == pytest.approx(0)
+    np.testing.assert_allclose(graph.compile().to_dense(), EXPECTED_MATRIX, atol=1e-12)
+
+
+def test_exponential_decay_weights_recent_batches(graph):
+    graph.set_update_policy(decay=0.5)
+    graph.update_observations([("A", "D", 4)])
+
+    # Contagens anteriores valem metade: A -> B 1.5, A -> C 0.5, A -> D 4.
+    assert graph.get_transition_count("a", "b") == pytest.approx(1.5)
+    assert graph.get_transition_count("a", "d") == pytest.approx(4)
+    assert graph.calculate_path_probability(["a", "d"]) == pytest.approx(4 / 6)
+
+    graph.update_observations([("A", "B", 2)])
+    assert graph.get_transition_count("a", "b") == pytest.approx(2.75)
+    assert graph.get_transition_count("a", "d") == pytest.approx(2)
+
+
+def test_decay_rescales_before_overflowing(graph):
+    graph.set_update_policy(decay=0.1)
+    for _ in range(120):
+        graph.update_observations([("A", "B", 1), ("A", "C", 1)])
+
+    assert np.isfinite(graph.get_transition_count("a", "b"))
+    assert graph.get_transition_count("a", "b") == pytest.approx(1 / 0.9)
+    assert graph.calculate_path_probability(["a", "c"]) == pytest.approx(0.5)
+
+
+def test_invalid_policies_and_counts(graph):
+    with pytest.raises(ValueError):
+        graph.set_update_policy(decay=0.0)
+    with pytest.raises(ValueError):
+        graph.set_update_policy(decay=1.5)
+    with pytest.raises(ValueError):
+        graph.set_update_policy(window=0)
+    with pytest.raises(ValueError):
+        graph.update_observations([("A", "B", -1)])
+
+
+@pytest.mark.parametrize("compact", [False, True], ids=["objects", "compact"])
+def test_build_rejects_negative_counts_like_update(compact):
+    # Nem uma contagem negativa compensada por outras do mesmo par é aceita.
+    for observations in ([("A", "B", 5), ("A", "C", -3)], [("A", "B", 5), ("A", "B", -2)]):
+        with pytest.raises(ValueError, match="negativa"):
+            build_graph(observations, compact=compact)